@@ -21,6 +21,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     'rest_framework',
     'rest_framework_simplejwt',
@@ -102,7 +103,7 @@ AUTH_USER_MODEL = 'users.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -111,11 +112,30 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 10,
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
-        'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
+        # ბოლოს, რომ relevance-ით დალაგება OrderingFilter-მა არ გადაფაროს
+        'users.filters.FullTextSearchFilter',
     ],
 }
 
+#ქეში: ნაგულისხმევად locmem; API ქეშის ვერსიები ბაზაშია (sports.CacheVersion), ამიტომ ინვალიდაცია ყველა worker-ს ეხება
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='mma-club'),
+    }
+}
+
+#სპორტებისა და პაკეტების GET პასუხების ქეშის ვადა (წამებში)
+API_CACHE_TIMEOUT = config('API_CACHE_TIMEOUT', default=300, cast=int)
+
+#keyset პაგინაციის (?pagination=cursor) და page_size-ის ზედა ზღვარი
+API_MAX_PAGE_SIZE = config('API_MAX_PAGE_SIZE', default=100, cast=int)
+
+#JWT-ით ავტორიზებული მომხმარებლის ქეშის ვადა (წამებში); იშლება User-ის ცვლილებისას.
+#მუშაობს მხოლოდ საერთო CACHE_BACKEND-ით (მაგ. FileBasedCache საერთო დირექტორიაში), locmem-ზე გამორთულია
+AUTH_USER_CACHE_TIMEOUT = config('AUTH_USER_CACHE_TIMEOUT', default=60, cast=int)
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=1),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
@@ -124,12 +144,26 @@ SIMPLE_JWT = {
     'UPDATE_LAST_LOGIN': True,
     'ALGORITHM': 'HS256',
     'AUTH_HEADER_TYPES': ('Bearer',),
+    # logout და rotation -> users.RevokedToken (token_blacklist აპის ნაცვლად)
+    'AUTH_TOKEN_CLASSES': ('users.tokens.AccessToken',),
+    'TOKEN_REFRESH_SERIALIZER': 'users.serializers.TokenRefreshSerializer',
 }
 
+#admin-ის CSV ატვირთვის ზედა ზღვარი: ჰეშირება (~0.17 წმ/პაროლი) gunicorn-ის 30 წმ timeout-ში უნდა ჩაეტიოს,
+#დიდი ფაილებისთვის - import_members ბრძანება
+MEMBER_IMPORT_ADMIN_MAX_ROWS = config('MEMBER_IMPORT_ADMIN_MAX_ROWS', default=100, cast=int)
+
+#გაუქმებული ტოკენების სიის სინქრონიზაცია worker-ებში (წამებში), თუ ქეში საერთო არ არის
+TOKEN_REVOCATION_SYNC_INTERVAL = config('TOKEN_REVOCATION_SYNC_INTERVAL', default=5, cast=int)
+
 #იმელის კონფიგურაციისთვის
 EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.console.EmailBackend')
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='noreply@mmaclub.ge')
 
+#პაროლის აღდგენა: True - ხელმოწერილი ტოკენები PasswordResetToken ცხრილის გარეშე
+PASSWORD_RESET_STATELESS = config('PASSWORD_RESET_STATELESS', default=False, cast=bool)
+PASSWORD_RESET_TIMEOUT = 3600
+
 #სვაგერი
 SWAGGER_SETTINGS = {
     'SECURITY_DEFINITIONS': {
@@ -1,5 +1,9 @@
 from django.contrib import admin
-from .models import Sport, Training, Enrollment, MembershipPlan, Membership
+from django.db import transaction
+from django.db.models import Count
+from .models import Sport, Training, TrainingSeries, Enrollment, MembershipPlan, Membership, WeeklyTrainingUsage
+from .views import EnrollmentExportView, MembershipExportView
+from users.exports import export_actions
 
 @admin.register(Sport)
 class SportAdmin(admin.ModelAdmin):
@@ -24,8 +28,11 @@ class SportAdmin(admin.ModelAdmin):
         }),
     )
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(all_trainings_count=Count('trainings'))
+
     def trainings_count(self, obj):
-        return obj.trainings.count()
+        return obj.all_trainings_count
 
     trainings_count.short_description = 'ვარჯიშები'
 
@@ -75,6 +82,21 @@ class TrainingAdmin(admin.ModelAdmin):
     is_full_display.boolean = True
 
 
+# ======= TRAINING SERIES ADMIN =======
+@admin.register(TrainingSeries)
+class TrainingSeriesAdmin(admin.ModelAdmin):
+    """სერიები API-ით იქმნება (ვარჯიშების გენერაცია), აქ მხოლოდ დათვალიერება"""
+
+    list_display = ['title', 'sport', 'coach', 'start_date', 'end_date', 'start_time', 'is_active']
+    list_filter = ['sport', 'is_active', 'start_date']
+    search_fields = ['title', 'coach__username', 'coach__first_name', 'coach__last_name']
+    readonly_fields = ['created_at', 'updated_at']
+    ordering = ['-created_at']
+
+    def has_add_permission(self, request):
+        return False
+
+
 # Enrollment admin
 @admin.register(Enrollment)
 class EnrollmentAdmin(admin.ModelAdmin):
@@ -91,6 +113,7 @@ class EnrollmentAdmin(admin.ModelAdmin):
     readonly_fields = ['enrolled_at', 'updated_at']
     list_editable = ['status', 'attended']
     ordering = ['-enrolled_at']
+    actions = export_actions(EnrollmentExportView.export_columns, 'enrollments')
 
     fieldsets = (
         ('ძირითადი ინფორმაცია', {
@@ -105,6 +128,26 @@ class EnrollmentAdmin(admin.ModelAdmin):
         }),
     )
 
+    # სტატუსის ცვლილება (list_editable-იც) Enrollment.save()-ით ცვლის მრიცხველს,
+    # მასობრივი წაშლა კი save/delete-ს გვერდს უვლის
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            confirmed = queryset.filter(status='confirmed').order_by().values('training').annotate(total=Count('pk'))
+            confirmed = list(confirmed)
+            for row in confirmed:
+                Training.adjust_confirmed_count(row['training'], -row['total'])
+            usage = queryset.filter(status__in=Enrollment.QUOTA_STATUSES).order_by().values(
+                'user', 'training__date'
+            ).annotate(total=Count('pk'))
+            for row in usage:
+                WeeklyTrainingUsage.decrement(row['user'], row['training__date'], row['total'])
+            super().delete_queryset(request, queryset)
+            # გათავისუფლებული ადგილები მოლოდინის რიგს
+            for row in confirmed:
+                for _ in range(row['total']):
+                    if Enrollment.objects.promote_next(row['training']) is None:
+                        break
+
 
 #Membership plan admin
 @admin.register(MembershipPlan)
@@ -137,9 +180,12 @@ class MembershipPlanAdmin(admin.ModelAdmin):
         }),
     )
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_members_count()
+
     def members_count(self, obj):
         """რამდენი წევრი იყენებს"""
-        return obj.memberships.filter(is_active=True).count()
+        return obj.active_members_count
 
     members_count.short_description = 'აქტიური წევრები'
 
@@ -159,6 +205,7 @@ class MembershipAdmin(admin.ModelAdmin):
     readonly_fields = ['created_at', 'updated_at', 'is_expired']
     list_editable = ['is_active', 'auto_renew']
     ordering = ['-start_date']
+    actions = export_actions(MembershipExportView.export_columns, 'memberships')
 
     fieldsets = (
         ('ძირითადი ინფორმაცია', {
@@ -181,4 +228,15 @@ class MembershipAdmin(admin.ModelAdmin):
         return '✓' if obj.is_expired else '✗'
 
     is_expired_display.short_description = 'ვადაგასულია'
-    is_expired_display.boolean = True
\ No newline at end of file
+    is_expired_display.boolean = True
+
+# ======= WEEKLY USAGE ADMIN =======
+@admin.register(WeeklyTrainingUsage)
+class WeeklyTrainingUsageAdmin(admin.ModelAdmin):
+    """კვირის ლიმიტის მრიცხველი (ჩაწერების ცვლილებისას ავტომატურად იცვლება)"""
+
+    list_display = ['user', 'week_start', 'trainings_count']
+    search_fields = ['user__username', 'user__first_name', 'user__last_name']
+    date_hierarchy = 'week_start'
+    readonly_fields = ['user', 'week_start', 'trainings_count']
+    ordering = ['-week_start']
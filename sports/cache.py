@@ -0,0 +1,159 @@
+#კატალოგის (სპორტები, პაკეტები) პასუხების ქეში Django-ს cache framework-ზე
+import hashlib
+import math
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+from rest_framework import status
+from rest_framework.response import Response
+
+STATS_KEY = 'api-cache:stats:{endpoint}:{kind}'
+
+cached_endpoints = []
+
+
+def get_versions(*scopes):
+    """
+    ერთი SELECT ყველა სფეროზე. ვერსიები ბაზაშია (CacheVersion), არა ქეშში: locmem ქეში
+    თითო gunicorn worker-ისაა და cron ბრძანებების ინვალიდაციას ვერ დაინახავდა.
+    """
+    from .models import CacheVersion
+    versions = dict(CacheVersion.objects.filter(scope__in=scopes).values_list('scope', 'version'))
+    return [versions.get(scope, 0) for scope in scopes]
+
+
+def request_versions(request, scopes):
+    #ConditionalGetMixin და CachedResponseMixin ერთ view-ზე - ვერსიები ერთხელ იკითხება
+    known = request.__dict__.setdefault('_cache_versions', {})
+    missing = [scope for scope in scopes if scope not in known]
+    if missing:
+        known.update(zip(missing, get_versions(*missing)))
+    return [known[scope] for scope in scopes]
+
+
+def bump_version(*scopes):
+    from .models import CacheVersion
+    now = time.time_ns() // 1000
+    updated = CacheVersion.objects.filter(scope__in=scopes).update(
+        version=Greatest(F('version') + 1, Value(now))
+    )
+    if updated < len(scopes):
+        CacheVersion.objects.bulk_create(
+            [CacheVersion(scope=scope, version=now) for scope in scopes], ignore_conflicts=True
+        )
+
+
+def invalidate(*scopes):
+    """
+    ვერსიის გაზრდა commit-ის შემდეგ (ტრანზაქციის გარეთ - ახლავე). ვერსია მონაცემებამდე იკითხება,
+    ამიტომ commit-მდე შენახული ძველი პასუხი ძველ ვერსიაზე რჩება. ტრანზაქციის შიგნით UPDATE
+    ვერსიის სტრიქონს commit-მდე დაბლოკავდა და ყველა ჩაწერას ერთმანეთის მიყოლებით გაატარებდა.
+    """
+    transaction.on_commit(lambda: bump_version(*scopes))
+
+
+def record(endpoint, kind):
+    key = STATS_KEY.format(endpoint=endpoint, kind=kind)
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # გასაღები ამასობაში გაქრა (eviction)
+        cache.set(key, 1, None)
+
+
+def get_stats():
+    stats = {}
+    for endpoint in cached_endpoints:
+        hits = cache.get(STATS_KEY.format(endpoint=endpoint, kind='hits'), 0)
+        misses = cache.get(STATS_KEY.format(endpoint=endpoint, kind='misses'), 0)
+        total = hits + misses
+        stats[endpoint] = {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / total, 3) if total else None,
+        }
+    return stats
+
+
+class CachedResponseMixin:
+    """
+    GET პასუხების read-through ქეში. გასაღები: view + cache_scopes-ის ვერსიები + URL (query params-ით).
+    ვერსიები იზრდება sports/signals.py-ში post_save/post_delete-ზე. პასუხები worker-ის ქეშშია,
+    ვერსიები ბაზაში - ამიტომ locmem/file ქეშიც სწორად ინვალიდირდება.
+    """
+    cache_scopes = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cached_endpoints.append(cls.__name__)
+
+    def get_response_cache_key(self, request):
+        versions = ':'.join(str(version) for version in request_versions(request, self.cache_scopes))
+        query = urlencode(sorted(request.query_params.lists()), doseq=True)
+        digest = hashlib.md5(f'{request.path}?{query}'.encode()).hexdigest()
+        return f'api-cache:response:{type(self).__name__}:{versions}:{digest}'
+
+    def get(self, request, *args, **kwargs):
+        endpoint = type(self).__name__
+        key = self.get_response_cache_key(request)
+
+        data = cache.get(key)
+        if data is not None:
+            record(endpoint, 'hits')
+            return Response(data)
+
+        record(endpoint, 'misses')
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, settings.API_CACHE_TIMEOUT)
+        return response
+
+
+class ConditionalGetMixin:
+    """
+    ETag / Last-Modified პირობითი GET. ვალიდატორი იგივე ვერსიებია, რასაც ქეში იყენებს
+    (etag_scopes), პლუს URL და მომხმარებელი - ამიტომ 304 query-ისა და სერიალიზაციის გარეშე ბრუნდება.
+    """
+    etag_scopes = ()
+
+    def get_etag_extra(self, request):
+        return ''
+
+    def get(self, request, *args, **kwargs):
+        versions = request_versions(request, self.etag_scopes)
+        # ზემოთ დამრგვალება: იმავე წამში მომდევნო ცვლილება წინა Last-Modified-ზე ძველი არ გამოჩნდეს.
+        # სანამ ეს წამი არ გასულა, Last-Modified არ იგზავნება (იმავე წამის ცვლილებებს ვერ განასხვავებს) - მხოლოდ ETag
+        last_modified = math.ceil(max(versions) / 1_000_000)
+        settled = last_modified <= time.time()
+        query = urlencode(sorted(request.query_params.lists()), doseq=True)
+        raw = f'{versions}:{request.user.pk}:{request.path}?{query}:{self.get_etag_extra(request)}'
+        etag = '"%s"' % hashlib.md5(raw.encode()).hexdigest()
+
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+        if if_none_match is not None:
+            not_modified = etag in parse_etags(if_none_match) or if_none_match.strip() == '*'
+        else:
+            not_modified = settled and if_modified_since is not None and last_modified <= if_modified_since
+
+        if not_modified:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = super().get(request, *args, **kwargs)
+
+        if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            response['ETag'] = etag
+            if settled:
+                response['Last-Modified'] = http_date(last_modified)
+            # პასუხი მომხმარებელზეა დამოკიდებული - shared cache-მა არ შეინახოს
+            patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ['Authorization'])
+        return response
@@ -0,0 +1,82 @@
+import statistics
+import time as clock
+import uuid
+from datetime import time, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from sports.models import Sport, Training, Enrollment, MembershipPlan, Membership
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Enrollment.objects.enroll()-ის დაყოვნება (p50/p95/p99) საწევროს და კვირის ლიმიტის '
+        'შემოწმებით და მის გარეშე. მონაცემები ტრანზაქციაში იქმნება და ბოლოს rollback-დება.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=500)
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+
+        with transaction.atomic():
+            members, trainings = self.seed(iterations)
+            results = {
+                'შემოწმების გარეშე': self.run(members, trainings[0], check_eligibility=False),
+                'საწევრო + კვირის ლიმიტი': self.run(members, trainings[1], check_eligibility=True),
+            }
+            transaction.set_rollback(True)
+
+        for title, timings in results.items():
+            self.stdout.write(self.style.SUCCESS(title))
+            self.stdout.write(
+                f'  p50={self.percentile(timings, 50):.2f}ms '
+                f'p95={self.percentile(timings, 95):.2f}ms '
+                f'p99={self.percentile(timings, 99):.2f}ms'
+            )
+
+    def run(self, members, training, check_eligibility):
+        timings = []
+        for member in members:
+            started = clock.perf_counter()
+            Enrollment.objects.enroll(member, training, check_eligibility=check_eligibility)
+            timings.append((clock.perf_counter() - started) * 1000)
+        return timings
+
+    def percentile(self, timings, percent):
+        return statistics.quantiles(timings, n=100)[percent - 1]
+
+    def seed(self, total):
+        prefix = uuid.uuid4().hex[:6]
+        today = timezone.now().date()
+
+        sport = Sport.objects.create(name=f'Benchmark {prefix}')
+        coach = User.objects.create(username=f'{prefix}_coach', password='!', role='coach')
+        plan = MembershipPlan.objects.create(
+            name=f'Benchmark {prefix}', price=100, duration_days=30, max_trainings_per_week=5
+        )
+        members = User.objects.bulk_create([
+            User(username=f'{prefix}_member_{i}', password='!', role='member')
+            for i in range(total)
+        ])
+        Membership.objects.bulk_create([
+            Membership(user=member, plan=plan, start_date=today, end_date=today + timedelta(days=30))
+            for member in members
+        ])
+        trainings = [
+            Training.objects.create(
+                sport=sport,
+                coach=coach,
+                title=f'Benchmark {i}',
+                date=today + timedelta(days=1),
+                start_time=time(10 + i, 0),
+                duration=60,
+                max_participants=total
+            )
+            for i in range(2)
+        ]
+        return members, trainings
@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from sports.cache import invalidate
+from sports.models import Training, Enrollment
+
+
+class Command(BaseCommand):
+    help = (
+        'დასრულებული ვარჯიშების დახურვა: confirmed ჩაწერები -> completed, მოლოდინის რიგი -> cancelled, '
+        'ვარჯიში -> is_active=False. ბაჩებად, cron-იდან გასაშვებად.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--dry-run', action='store_true', help='მხოლოდ დათვლა, ცვლილების გარეშე')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        # date-ის პირობა training_upcoming_idx-ს (date, start_time WHERE is_active) იყენებს
+        ended = Training.objects.filter(
+            is_active=True,
+            date__lte=timezone.localdate(now),
+            ends_at__lte=now
+        ).order_by('pk').values_list('pk', flat=True)
+
+        if options['dry_run']:
+            self.stdout.write(f'[dry-run] დასრულებული ვარჯიშები: {ended.count()}')
+            return
+
+        totals = {'trainings': 0, 'completed': 0, 'cancelled': 0}
+        last_id = 0
+        while True:
+            batch = list(ended.filter(pk__gt=last_id)[:options['batch_size']])
+            if not batch:
+                break
+            self.close_batch(batch, now, totals)
+            last_id = batch[-1]
+
+        if totals['trainings']:
+            invalidate('training', 'sport', 'enrollment')
+
+        self.stdout.write(self.style.SUCCESS(
+            f"დაიხურა {totals['trainings']} ვარჯიში, completed: {totals['completed']}, "
+            f"რიგიდან გაუქმდა: {totals['cancelled']}"
+        ))
+
+    def close_batch(self, training_ids, now, totals):
+        enrollments = Enrollment.objects.filter(training_id__in=training_ids)
+        with transaction.atomic():
+            totals['completed'] += enrollments.filter(status='confirmed').update(
+                status='completed', updated_at=now
+            )
+
+            # ადგილი ვეღარ გათავისუფლდება - რიგი უქმდება და კვირის ლიმიტი თავისუფლდება
+            totals['cancelled'] += Enrollment.objects.cancel_for_trainings(
+                training_ids, statuses=['pending'], now=now
+            )
+
+            totals['trainings'] += Training.objects.filter(pk__in=training_ids, is_active=True).update(
+                is_active=False, confirmed_count=0, updated_at=now
+            )
@@ -0,0 +1,156 @@
+import uuid
+from datetime import time, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from sports.models import Sport, Training, Enrollment, MembershipPlan, Membership
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'endpoint-ების query-ების EXPLAIN (PostgreSQL-ზე EXPLAIN ANALYZE) ინდექსების გარეშე და ინდექსებით. '
+        '--seed ამატებს სატესტო მონაცემებს. არ გაუშვათ production ბაზაზე: '
+        'ინდექსები დროებით იშლება ტრანზაქციაში.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0, help='რამდენი ვარჯიში დაემატოს')
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        if options['seed']:
+            self.seed(options['seed'], options['batch_size'])
+
+        queries = self.get_queries()
+        if not queries:
+            self.stderr.write('ბაზაში ვარჯიშები/ჩაწერები არ არის, გამოიყენეთ --seed')
+            return
+
+        # ინდექსების წაშლა და rollback - PostgreSQL-ზეც და SQLite-ზეც DDL ტრანზაქციულია
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                for index in self.get_indexes():
+                    cursor.execute(f'DROP INDEX {connection.ops.quote_name(index.name)}')
+            self.explain_all('ინდექსების გარეშე', queries)
+            transaction.set_rollback(True)
+
+        self.explain_all('ინდექსებით', queries)
+
+    def get_indexes(self):
+        for model in (Training, Enrollment, Membership):
+            yield from model._meta.indexes
+
+    def get_queries(self):
+        enrollment = Enrollment.objects.order_by('-pk').select_related('training').first()
+        membership = Membership.objects.order_by('-pk').first()
+        if enrollment is None:
+            return []
+
+        today = timezone.now().date()
+        queries = {
+            'UpcomingTrainingsView': Training.objects.filter(
+                is_active=True, date__gte=today
+            ).with_capacity().order_by('date', 'start_time')[:10],
+            'MyTrainingsView': Training.objects.filter(
+                coach_id=enrollment.training.coach_id, is_active=True
+            ).order_by('-date', '-start_time')[:10],
+            'მწვრთნელის გადაფარვა': Training.objects.overlapping(
+                enrollment.training.coach_id, enrollment.training.starts_at, enrollment.training.ends_at
+            ).order_by().values('pk')[:1],
+            'ადგილების დათვლა': Enrollment.objects.filter(
+                training_id=enrollment.training_id, status='confirmed'
+            ).order_by().values('pk'),
+            'მოლოდინის რიგის თავი': Enrollment.objects.filter(
+                training_id=enrollment.training_id, status='pending'
+            ).order_by('enrolled_at', 'id').values('pk')[:1],
+            'დუბლიკატის შემოწმება': Enrollment.objects.filter(
+                user_id=enrollment.user_id, status__in=['confirmed', 'pending']
+            ).order_by().values('pk'),
+            'MyEnrollmentsView': Enrollment.objects.filter(
+                user_id=enrollment.user_id
+            ).order_by('-enrolled_at')[:10],
+        }
+        if membership is not None:
+            queries['MyMembershipView'] = Membership.objects.filter(
+                user_id=membership.user_id, is_active=True
+            ).order_by('-start_date')[:1]
+        return queries
+
+    def explain_all(self, title, queries):
+        options = {'analyze': True} if connection.vendor == 'postgresql' else {}
+        self.stdout.write(self.style.MIGRATE_HEADING(f'===== {title} ====='))
+        for name, queryset in queries.items():
+            self.stdout.write(self.style.SUCCESS(name))
+            self.stdout.write(queryset.explain(**options))
+            self.stdout.write('')
+
+    def seed(self, trainings_total, batch_size):
+        prefix = uuid.uuid4().hex[:6]
+        members_total = max(trainings_total // 2, 10)
+        coaches_total = max(trainings_total // 500, 2)
+        today = timezone.now().date()
+
+        sport = Sport.objects.get_or_create(name='Seed MMA')[0]
+        plan = MembershipPlan.objects.get_or_create(
+            name='Seed', defaults={'price': 100, 'duration_days': 30, 'max_trainings_per_week': 5}
+        )[0]
+
+        coaches = User.objects.bulk_create([
+            User(username=f'{prefix}_coach_{i}', password='!', role='coach')
+            for i in range(coaches_total)
+        ], batch_size=batch_size)
+        members = User.objects.bulk_create([
+            User(username=f'{prefix}_member_{i}', password='!', role='member')
+            for i in range(members_total)
+        ], batch_size=batch_size)
+
+        # თითო მწვრთნელს დღეში 10 სლოტი (08:00-17:00)
+        trainings = [
+            Training(
+                sport=sport,
+                coach=coaches[i % coaches_total],
+                title=f'Seed {i}',
+                date=today + timedelta(days=(i // coaches_total) // 10 - 180),
+                start_time=time(8 + (i // coaches_total) % 10, 0),
+                duration=60,
+                max_participants=20,
+                is_active=i % 4 != 0
+            )
+            for i in range(trainings_total)
+        ]
+        for training in trainings:
+            training.set_time_range()
+        Training.objects.bulk_create(trainings, batch_size=batch_size)
+
+        enrollments = []
+        for i, training in enumerate(trainings):
+            for j in range(5):
+                enrollments.append(Enrollment(
+                    user=members[(i * 5 + j) % members_total],
+                    training=training,
+                    status='confirmed' if j < 4 else 'cancelled'
+                ))
+            if len(enrollments) >= batch_size:
+                Enrollment.objects.bulk_create(enrollments, batch_size=batch_size, ignore_conflicts=True)
+                enrollments = []
+        Enrollment.objects.bulk_create(enrollments, batch_size=batch_size, ignore_conflicts=True)
+
+        Membership.objects.bulk_create([
+            Membership(
+                user=member,
+                plan=plan,
+                start_date=today - timedelta(days=30 * k),
+                end_date=today - timedelta(days=30 * k - 30),
+                is_active=k == 0
+            )
+            for member in members
+            for k in range(3)
+        ], batch_size=batch_size)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'დაემატა: {trainings_total} ვარჯიში, {members_total} წევრი, {coaches_total} მწვრთნელი'
+        ))
+        self.stdout.write('confirmed_count-ის გასასწორებლად გაუშვით reconcile_confirmed_counts')
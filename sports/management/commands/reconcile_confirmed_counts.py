@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from sports.cache import invalidate
+from sports.models import Training, Enrollment
+
+
+class Command(BaseCommand):
+    help = 'Training.confirmed_count მრიცხველის გადათვლა იქ, სადაც ის ჩაწერებს აცდა'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true', help='მხოლოდ ჩვენება, ცვლილების გარეშე')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        actual = Coalesce(Subquery(
+            Enrollment.objects.filter(training=OuterRef('pk'), status='confirmed')
+            .order_by().values('training').annotate(total=Count('pk')).values('total')
+        ), 0)
+
+        drifted = Training.objects.annotate(actual=actual).exclude(
+            confirmed_count=F('actual')
+        ).order_by('pk').values_list('pk', flat=True)
+
+        fixed = 0
+        last_id = 0
+        while True:
+            batch = list(drifted.filter(pk__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            fixed += self._fix(batch, actual, options['dry_run'])
+            last_id = batch[-1]
+
+        if fixed and not options['dry_run']:
+            invalidate('enrollment')
+
+        prefix = '[dry-run] ' if options['dry_run'] else ''
+        self.stdout.write(self.style.SUCCESS(f'{prefix}შესწორდა {fixed} ვარჯიშის მრიცხველი'))
+
+    def _fix(self, training_ids, actual, dry_run):
+        if dry_run:
+            return len(training_ids)
+        with transaction.atomic():
+            return Training.objects.filter(pk__in=training_ids).update(confirmed_count=actual)
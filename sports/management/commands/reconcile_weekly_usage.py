@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from sports.models import Enrollment, WeeklyTrainingUsage
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'WeeklyTrainingUsage მრიცხველების გადათვლა ჩაწერებიდან (pending/confirmed/completed) '
+        'იქ, სადაც ისინი აცდა. მომხმარებლების ბაჩებად.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--dry-run', action='store_true', help='მხოლოდ ჩვენება, ცვლილების გარეშე')
+
+    def handle(self, *args, **options):
+        users = User.objects.order_by('pk').values_list('pk', flat=True)
+
+        fixed = 0
+        last_id = 0
+        while True:
+            batch = list(users.filter(pk__gt=last_id)[:options['batch_size']])
+            if not batch:
+                break
+            fixed += self._fix(batch, options['dry_run'])
+            last_id = batch[-1]
+
+        prefix = '[dry-run] ' if options['dry_run'] else ''
+        self.stdout.write(self.style.SUCCESS(f'{prefix}შესწორდა {fixed} კვირის მრიცხველი'))
+
+    def _fix(self, user_ids, dry_run):
+        with transaction.atomic():
+            # მრიცხველების lock-ის შემდეგ ჩაწერის upsert-ი ელოდება - დათვლა შუაში არ იცვლება
+            stored = {
+                (user_id, week_start): (pk, count)
+                for pk, user_id, week_start, count in WeeklyTrainingUsage.objects.select_for_update().filter(
+                    user_id__in=user_ids
+                ).values_list('pk', 'user', 'week_start', 'trainings_count')
+            }
+
+            actual = {}
+            rows = Enrollment.objects.filter(
+                user_id__in=user_ids, status__in=Enrollment.QUOTA_STATUSES
+            ).order_by().values('user', 'training__date').annotate(total=Count('pk'))
+            for row in rows:
+                key = (row['user'], WeeklyTrainingUsage.week_of(row['training__date']))
+                actual[key] = actual.get(key, 0) + row['total']
+
+            changed = [
+                WeeklyTrainingUsage(pk=pk, trainings_count=actual.get(key, 0))
+                for key, (pk, count) in stored.items() if actual.get(key, 0) != count
+            ]
+            missing = [
+                WeeklyTrainingUsage(user_id=user_id, week_start=week_start, trainings_count=count)
+                for (user_id, week_start), count in actual.items() if (user_id, week_start) not in stored
+            ]
+            if not dry_run:
+                WeeklyTrainingUsage.objects.bulk_update(changed, ['trainings_count'], batch_size=500)
+                WeeklyTrainingUsage.objects.bulk_create(missing, ignore_conflicts=True)
+        return len(changed) + len(missing)
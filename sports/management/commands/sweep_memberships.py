@@ -0,0 +1,123 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from sports.cache import invalidate
+from sports.models import Membership
+from users.authentication import invalidate_users
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'ვადაგასული საწევროების გათიშვა, auto_renew საწევროების განახლება და '
+        'User.is_active_member-ის სინქრონიზაცია. cron-იდან გასაშვებად: განმეორებით გაშვება უსაფრთხოა, '
+        'შეწყვეტის შემდეგ იქიდან გრძელდება, სადაც გაჩერდა (დამუშავებული საწევროები უკვე გათიშულია).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument('--date', type=date.fromisoformat, help='რომელი დღისთვის (YYYY-MM-DD), ნაგულისხმევად დღეს')
+        parser.add_argument('--dry-run', action='store_true', help='მხოლოდ დათვლა, ცვლილების გარეშე')
+
+    def handle(self, *args, **options):
+        self.today = options['date'] or timezone.now().date()
+        self.chunk_size = options['chunk_size']
+
+        expired = Membership.objects.filter(is_active=True, end_date__lt=self.today)
+        if options['dry_run']:
+            self.stdout.write(
+                f'[dry-run] ვადაგასული: {expired.count()}, '
+                f'მათ შორის auto_renew: {expired.filter(auto_renew=True).count()}'
+            )
+            return
+
+        totals = {'expired': 0, 'renewed': 0, 'users': 0}
+        rows = expired.order_by('pk').values_list(
+            'pk', 'user_id', 'plan_id', 'end_date', 'auto_renew', 'plan__duration_days'
+        ).iterator(chunk_size=self.chunk_size)
+
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= self.chunk_size:
+                self.process_chunk(chunk, totals)
+                chunk = []
+        if chunk:
+            self.process_chunk(chunk, totals)
+
+        totals['users'] += self.sync_drifted_users()
+        if totals['expired'] or totals['users']:
+            invalidate('membership_plan')
+
+        self.stdout.write(self.style.SUCCESS(
+            f"გაითიშა {totals['expired']} საწევრო, განახლდა {totals['renewed']}, "
+            f"is_active_member შეიცვალა {totals['users']} მომხმარებელს"
+        ))
+
+    def process_chunk(self, chunk, totals):
+        #თითო chunk ერთ ტრანზაქციაში: გათიშვა, განახლება და მომხმარებლები ერთად
+        membership_ids = [row[0] for row in chunk]
+        user_ids = {row[1] for row in chunk}
+
+        with transaction.atomic():
+            # ვისაც ახალი საწევრო უკვე აქვს (მაგ. ადმინმა დაამატა), ავტომატურად აღარ ვაახლებთ
+            covered = set(Membership.objects.filter(
+                user_id__in=user_ids, is_active=True, end_date__gte=self.today
+            ).values_list('user_id', flat=True))
+
+            renewals = []
+            for pk, user_id, plan_id, end_date, auto_renew, duration_days in chunk:
+                if not auto_renew or user_id in covered:
+                    continue
+                # დიდი ხნის წინ ამოწურული (მაგ. cron არ მუშაობდა) - განახლება დღეიდან, არა წარსულში
+                start_date = max(end_date + timedelta(days=1), self.today)
+                renewals.append(Membership(
+                    user_id=user_id,
+                    plan_id=plan_id,
+                    start_date=start_date,
+                    end_date=start_date + timedelta(days=duration_days),
+                    is_active=True,
+                    auto_renew=True
+                ))
+                covered.add(user_id)
+
+            totals['expired'] += Membership.objects.filter(
+                pk__in=membership_ids, is_active=True
+            ).update(is_active=False, updated_at=timezone.now())
+            Membership.objects.bulk_create(renewals)
+            totals['renewed'] += len(renewals)
+            totals['users'] += self.sync_users(user_ids)
+
+    def has_membership(self):
+        return Exists(Membership.objects.filter(
+            user=OuterRef('pk'), is_active=True, start_date__lte=self.today, end_date__gte=self.today
+        ))
+
+    def sync_users(self, user_ids):
+        # მხოლოდ ის სტრიქონები, სადაც მნიშვნელობა რეალურად იცვლება
+        users = User.objects.filter(pk__in=user_ids)
+        has_membership = self.has_membership()
+        activated = users.filter(is_active_member=False).filter(has_membership).update(is_active_member=True)
+        deactivated = users.filter(is_active_member=True).exclude(has_membership).update(is_active_member=False)
+        if activated or deactivated:
+            # update() სიგნალებს არ აგზავნის - ავტორიზაციის ქეში აქვე იშლება
+            invalidate_users(*user_ids)
+        return activated + deactivated
+
+    def sync_drifted_users(self):
+        """სხვა მიზეზით აცდენილი წევრები (მაგ. საწევრო არასდროს ჰქონიათ), pk-ის chunk-ებით"""
+        changed = 0
+        last_id = 0
+        members = User.objects.filter(role='member').order_by('pk').values_list('pk', flat=True)
+        while True:
+            ids = list(members.filter(pk__gt=last_id)[:self.chunk_size])
+            if not ids:
+                break
+            with transaction.atomic():
+                changed += self.sync_users(ids)
+            last_id = ids[-1]
+        return changed
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:07
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_confirmed_count(apps, schema_editor):
+    Training = apps.get_model('sports', 'Training')
+    Enrollment = apps.get_model('sports', 'Enrollment')
+    confirmed = Enrollment.objects.filter(
+        training=OuterRef('pk'), status='confirmed'
+    ).order_by().values('training').annotate(total=Count('pk')).values('total')
+    Training.objects.update(confirmed_count=Coalesce(Subquery(confirmed), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sports', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='training',
+            name='confirmed_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='დადასტურებული ჩაწერები'),
+        ),
+        migrations.RunPython(backfill_confirmed_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sports', '0003_training_confirmed_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['training', 'status'], name='enrollment_training_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['user', 'status'], name='enrollment_user_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['user', '-enrolled_at'], name='enrollment_user_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='membership',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['user', '-start_date'], name='membership_user_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='training',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['date', 'start_time'], name='training_upcoming_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='training',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['coach', '-date', '-start_time'], name='training_coach_active_idx'),
+        ),
+    ]
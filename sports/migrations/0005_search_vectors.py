@@ -0,0 +1,111 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:13
+
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+# 'simple' კონფიგურაცია: ქართულისთვის PostgreSQL-ს ლექსიკონი არ აქვს
+POSTGRES_FORWARDS = [
+    """
+    CREATE OR REPLACE FUNCTION sports_sport_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('simple', coalesce(NEW.name, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(NEW.description, '')), 'C');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql;
+    """,
+    """
+    CREATE TRIGGER sports_sport_search_vector_trigger
+    BEFORE INSERT OR UPDATE ON sports_sport
+    FOR EACH ROW EXECUTE FUNCTION sports_sport_search_vector_update();
+    """,
+    """
+    CREATE OR REPLACE FUNCTION sports_training_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('simple', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(
+                (SELECT name FROM sports_sport WHERE id = NEW.sport_id), ''
+            )), 'B') ||
+            setweight(to_tsvector('simple', coalesce(NEW.description, '')), 'C');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql;
+    """,
+    """
+    CREATE TRIGGER sports_training_search_vector_trigger
+    BEFORE INSERT OR UPDATE ON sports_training
+    FOR EACH ROW EXECUTE FUNCTION sports_training_search_vector_update();
+    """,
+    # სპორტის სახელის შეცვლისას მისი ვარჯიშების ვექტორიც ახლდება
+    """
+    CREATE OR REPLACE FUNCTION sports_sport_rename_refresh_trainings() RETURNS trigger AS $$
+    BEGIN
+        UPDATE sports_training SET sport_id = sport_id WHERE sport_id = NEW.id;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql;
+    """,
+    """
+    CREATE TRIGGER sports_sport_rename_trigger
+    AFTER UPDATE OF name ON sports_sport
+    FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+    EXECUTE FUNCTION sports_sport_rename_refresh_trainings();
+    """,
+    "UPDATE sports_sport SET id = id;",
+    "UPDATE sports_training SET id = id;",
+    "CREATE INDEX sports_sport_search_vector_gin ON sports_sport USING gin (search_vector);",
+    "CREATE INDEX sports_sport_name_trgm ON sports_sport USING gin (name gin_trgm_ops);",
+    "CREATE INDEX sports_training_search_vector_gin ON sports_training USING gin (search_vector);",
+    "CREATE INDEX sports_training_title_trgm ON sports_training USING gin (title gin_trgm_ops);",
+]
+
+POSTGRES_BACKWARDS = [
+    "DROP TRIGGER IF EXISTS sports_sport_rename_trigger ON sports_sport;",
+    "DROP FUNCTION IF EXISTS sports_sport_rename_refresh_trainings();",
+    "DROP TRIGGER IF EXISTS sports_training_search_vector_trigger ON sports_training;",
+    "DROP FUNCTION IF EXISTS sports_training_search_vector_update();",
+    "DROP TRIGGER IF EXISTS sports_sport_search_vector_trigger ON sports_sport;",
+    "DROP FUNCTION IF EXISTS sports_sport_search_vector_update();",
+    "DROP INDEX IF EXISTS sports_sport_search_vector_gin;",
+    "DROP INDEX IF EXISTS sports_sport_name_trgm;",
+    "DROP INDEX IF EXISTS sports_training_search_vector_gin;",
+    "DROP INDEX IF EXISTS sports_training_title_trgm;",
+]
+
+
+def postgres_forwards(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for statement in POSTGRES_FORWARDS:
+            schema_editor.execute(statement)
+
+
+def postgres_backwards(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for statement in POSTGRES_BACKWARDS:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sports', '0004_query_indexes'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='sport',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='training',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(postgres_forwards, postgres_backwards),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sports', '0005_search_vectors'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='enrollment',
+            name='enrollment_training_status_idx',
+        ),
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['training', 'status', 'enrolled_at'], name='enrollment_training_queue_idx'),
+        ),
+    ]
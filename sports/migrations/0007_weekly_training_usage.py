@@ -0,0 +1,48 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:22
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from collections import Counter
+from datetime import timedelta
+
+
+def backfill_weekly_usage(apps, schema_editor):
+    Enrollment = apps.get_model('sports', 'Enrollment')
+    WeeklyTrainingUsage = apps.get_model('sports', 'WeeklyTrainingUsage')
+    usage = Counter()
+    rows = Enrollment.objects.filter(
+        status__in=['pending', 'confirmed', 'completed']
+    ).values_list('user_id', 'training__date').iterator()
+    for user_id, day in rows:
+        usage[(user_id, day - timedelta(days=day.weekday()))] += 1
+    WeeklyTrainingUsage.objects.bulk_create([
+        WeeklyTrainingUsage(user_id=user_id, week_start=week_start, trainings_count=total)
+        for (user_id, week_start), total in usage.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('sports', '0006_enrollment_waitlist_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WeeklyTrainingUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('week_start', models.DateField(verbose_name='კვირის დასაწყისი')),
+                ('trainings_count', models.PositiveIntegerField(default=0, verbose_name='ვარჯიშები')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='weekly_usage', to=settings.AUTH_USER_MODEL, verbose_name='მომხმარებელი')),
+            ],
+            options={
+                'verbose_name': 'კვირის გამოყენება',
+                'verbose_name_plural': 'კვირის გამოყენება',
+                'unique_together': {('user', 'week_start')},
+            },
+        ),
+        migrations.RunPython(backfill_weekly_usage, migrations.RunPython.noop),
+    ]
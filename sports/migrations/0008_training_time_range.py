@@ -0,0 +1,108 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:30
+
+import datetime
+
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations, models
+from django.utils import timezone
+
+
+# ერთი მწვრთნელის აქტიური ვარჯიშები დროში ვერ გადაიფარება
+POSTGRES_FORWARDS = [
+    """
+    ALTER TABLE sports_training ADD CONSTRAINT training_coach_no_overlap
+    EXCLUDE USING gist (coach_id WITH =, tstzrange(starts_at, ends_at) WITH &&)
+    WHERE (is_active);
+    """,
+]
+
+# constraint-ის დამატებამდე: უკვე გადაფარული აქტიური წყვილები (მაქს. 20)
+OVERLAPS_SQL = """
+    SELECT a.id, b.id, a.coach_id
+    FROM sports_training a
+    JOIN sports_training b
+      ON b.coach_id = a.coach_id AND b.id > a.id AND b.is_active
+     AND tstzrange(a.starts_at, a.ends_at) && tstzrange(b.starts_at, b.ends_at)
+    WHERE a.is_active
+    ORDER BY a.id, b.id
+    LIMIT 20;
+"""
+
+POSTGRES_BACKWARDS = [
+    "ALTER TABLE sports_training DROP CONSTRAINT IF EXISTS training_coach_no_overlap;",
+]
+
+
+def backfill_time_range(apps, schema_editor):
+    Training = apps.get_model('sports', 'Training')
+    batch = []
+    for training in Training.objects.only('date', 'start_time', 'duration').iterator():
+        training.starts_at = timezone.make_aware(datetime.datetime.combine(training.date, training.start_time))
+        training.ends_at = training.starts_at + datetime.timedelta(minutes=training.duration)
+        batch.append(training)
+        if len(batch) >= 1000:
+            Training.objects.bulk_update(batch, ['starts_at', 'ends_at'])
+            batch = []
+    Training.objects.bulk_update(batch, ['starts_at', 'ends_at'])
+
+
+def check_overlaps(schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(OVERLAPS_SQL)
+        overlaps = cursor.fetchall()
+    if overlaps:
+        pairs = ', '.join(f"#{first}/#{second} (მწვრთნელი {coach})" for first, second, coach in overlaps)
+        raise RuntimeError(
+            f"მწვრთნელის აქტიური ვარჯიშები დროში გადაიფარება: {pairs}. "
+            f"გადაიტანეთ ან გააუქმეთ (is_active=False) ისინი და მიგრაცია თავიდან გაუშვით."
+        )
+
+
+def postgres_forwards(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        check_overlaps(schema_editor)
+        for statement in POSTGRES_FORWARDS:
+            schema_editor.execute(statement)
+
+
+def postgres_backwards(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for statement in POSTGRES_BACKWARDS:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sports', '0007_weekly_training_usage'),
+    ]
+
+    operations = [
+        BtreeGistExtension(),
+        migrations.AddField(
+            model_name='training',
+            name='starts_at',
+            field=models.DateTimeField(editable=False, null=True, verbose_name='დაწყება'),
+        ),
+        migrations.AddField(
+            model_name='training',
+            name='ends_at',
+            field=models.DateTimeField(editable=False, null=True, verbose_name='დასრულება'),
+        ),
+        migrations.RunPython(backfill_time_range, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='training',
+            name='starts_at',
+            field=models.DateTimeField(editable=False, verbose_name='დაწყება'),
+        ),
+        migrations.AlterField(
+            model_name='training',
+            name='ends_at',
+            field=models.DateTimeField(editable=False, verbose_name='დასრულება'),
+        ),
+        migrations.AddIndex(
+            model_name='training',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['coach', 'starts_at'], name='training_coach_starts_idx'),
+        ),
+        migrations.RunPython(postgres_forwards, postgres_backwards),
+    ]
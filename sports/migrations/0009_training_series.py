@@ -0,0 +1,48 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:31
+
+from django.conf import settings
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('sports', '0008_training_time_range'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrainingSeries',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200, verbose_name='სათაური')),
+                ('description', models.TextField(blank=True, verbose_name='აღწერა')),
+                ('difficulty', models.CharField(choices=[('beginner', 'დამწყები'), ('intermediate', 'საშუალო'), ('advanced', 'მოწინავე')], default='beginner', max_length=20, verbose_name='სირთულე')),
+                ('start_time', models.TimeField(verbose_name='დაწყების დრო')),
+                ('duration', models.IntegerField(help_text='წუთებში', validators=[django.core.validators.MinValueValidator(15), django.core.validators.MaxValueValidator(300)], verbose_name='ხანგრძლივობა')),
+                ('max_participants', models.IntegerField(default=20, validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(50)], verbose_name='მაქსიმალური მონაწილეები')),
+                ('weekdays', models.JSONField(help_text='0 - ორშაბათი ... 6 - კვირა', verbose_name='კვირის დღეები')),
+                ('start_date', models.DateField(verbose_name='დაწყების თარიღი')),
+                ('end_date', models.DateField(verbose_name='დასრულების თარიღი')),
+                ('exceptions', models.JSONField(blank=True, default=list, help_text='გამოტოვებული თარიღები (YYYY-MM-DD)', verbose_name='გამონაკლისები')),
+                ('is_active', models.BooleanField(default=True, verbose_name='აქტიური')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('coach', models.ForeignKey(limit_choices_to={'role__in': ['admin', 'coach']}, on_delete=django.db.models.deletion.CASCADE, related_name='training_series', to=settings.AUTH_USER_MODEL, verbose_name='მწვრთნელი')),
+                ('sport', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='training_series', to='sports.sport', verbose_name='სპორტი')),
+            ],
+            options={
+                'verbose_name': 'ვარჯიშების სერია',
+                'verbose_name_plural': 'ვარჯიშების სერიები',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='training',
+            name='series',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='trainings', to='sports.trainingseries', verbose_name='სერია'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:00
+
+from django.db import migrations
+
+
+# ვექტორი მხოლოდ საძიებო სვეტების ცვლილებაზე: confirmed_count-ის UPDATE-ებზე trigger აღარ ეშვება
+POSTGRES_FORWARDS = [
+    "DROP TRIGGER IF EXISTS sports_sport_search_vector_trigger ON sports_sport;",
+    """
+    CREATE TRIGGER sports_sport_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF name, description ON sports_sport
+    FOR EACH ROW EXECUTE FUNCTION sports_sport_search_vector_update();
+    """,
+    "DROP TRIGGER IF EXISTS sports_training_search_vector_trigger ON sports_training;",
+    # sport_id: სპორტის სახელის შეცვლისას sports_sport_rename_trigger სწორედ მას ანახლებს
+    """
+    CREATE TRIGGER sports_training_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, description, sport_id ON sports_training
+    FOR EACH ROW EXECUTE FUNCTION sports_training_search_vector_update();
+    """,
+]
+
+POSTGRES_BACKWARDS = [
+    "DROP TRIGGER IF EXISTS sports_sport_search_vector_trigger ON sports_sport;",
+    """
+    CREATE TRIGGER sports_sport_search_vector_trigger
+    BEFORE INSERT OR UPDATE ON sports_sport
+    FOR EACH ROW EXECUTE FUNCTION sports_sport_search_vector_update();
+    """,
+    "DROP TRIGGER IF EXISTS sports_training_search_vector_trigger ON sports_training;",
+    """
+    CREATE TRIGGER sports_training_search_vector_trigger
+    BEFORE INSERT OR UPDATE ON sports_training
+    FOR EACH ROW EXECUTE FUNCTION sports_training_search_vector_update();
+    """,
+]
+
+
+def postgres_forwards(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for statement in POSTGRES_FORWARDS:
+            schema_editor.execute(statement)
+
+
+def postgres_backwards(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for statement in POSTGRES_BACKWARDS:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sports', '0009_training_series'),
+    ]
+
+    operations = [
+        migrations.RunPython(postgres_forwards, postgres_backwards),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sports', '0010_search_vector_trigger_columns'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CacheVersion',
+            fields=[
+                ('scope', models.CharField(max_length=50, primary_key=True, serialize=False, verbose_name='სფერო')),
+                ('version', models.BigIntegerField(default=0, verbose_name='ვერსია')),
+            ],
+            options={
+                'verbose_name': 'ქეშის ვერსია',
+                'verbose_name_plural': 'ქეშის ვერსიები',
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sports', '0011_cache_version'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='training',
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name='training',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_active', True)), fields=('coach', 'date', 'start_time'), name='training_coach_slot_active_uniq'),
+        ),
+    ]
@@ -1,7 +1,31 @@
-from django.db import models
+from datetime import datetime, timedelta
+
+from django.db import models, transaction, connection
+from django.contrib.postgres.search import SearchVectorField
+from django.utils import timezone
+from django.db.models import Q, F, ExpressionWrapper, Count, Exists, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator, MaxValueValidator
 from users.models import User
+from .cache import invalidate
+
+
+
+def count_subquery(queryset, field):
+    #კორელირებული COUNT, რომ GROUP BY სხვა ფილტრებს/ანოტაციებს არ შეეხოს
+    return Coalesce(Subquery(
+        queryset.filter(**{field: OuterRef('pk')}).order_by()
+        .values(field).annotate(total=Count('pk')).values('total')
+    ), 0)
+
+
+class SportQuerySet(models.QuerySet):
 
+    def with_trainings_count(self):
+        return self.annotate(
+            active_trainings_count=count_subquery(Training.objects.filter(is_active=True), 'sport')
+        )
 
 
 #სპორტი
@@ -14,6 +38,10 @@ class Sport(models.Model):
     is_active = models.BooleanField(default=True, verbose_name='აქტიური')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # PostgreSQL-ზე trigger ავსებს (name + description), SQLite-ზე ცარიელია
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = SportQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'სპორტი'
@@ -24,6 +52,44 @@ class Sport(models.Model):
         return self.name
 
 
+# წუთებში; overlapping()-ის range scan-ის ქვედა ზღვარიც
+MAX_TRAINING_DURATION = 300
+
+
+class TrainingQuerySet(models.QuerySet):
+
+    def overlapping(self, coach, starts_at, ends_at):
+        """მწვრთნელის აქტიური ვარჯიშები, რომლებიც [starts_at, ends_at)-ს კვეთს"""
+        return self.overlapping_any(coach, [(starts_at, ends_at)])
+
+    def overlapping_any(self, coach, ranges):
+        """
+        იგივე ბევრი ინტერვალისთვის ერთ query-ში (სერიის ყველა ვარჯიში).
+        starts_at > პირველი - MAX_TRAINING_DURATION ზღუდავს (coach, starts_at) ინდექსის scan-ს.
+        """
+        condition = Q()
+        for starts_at, ends_at in ranges:
+            condition |= Q(starts_at__lt=ends_at, ends_at__gt=starts_at)
+        return self.filter(
+            condition,
+            coach=coach,
+            is_active=True,
+            starts_at__gt=min(start for start, _ in ranges) - timedelta(minutes=MAX_TRAINING_DURATION),
+            starts_at__lt=max(end for _, end in ranges)
+        )
+
+    def with_capacity(self):
+        #ადგილების დათვლა ერთ query-ში, თითო ვარჯიშზე COUNT-ის ნაცვლად
+        return self.select_related('sport', 'coach').annotate(
+            confirmed_enrollments=F('confirmed_count'),
+            free_spots=F('max_participants') - F('confirmed_count'),
+            full=ExpressionWrapper(
+                Q(confirmed_count__gte=F('max_participants')),
+                output_field=models.BooleanField()
+            ),
+        )
+
+
 class Training(models.Model):
 
     DIFFICULTY_CHOICES = [
@@ -47,6 +113,14 @@ class Training(models.Model):
         related_name='trainings',
         verbose_name='მწვრთნელი'
     )
+    series = models.ForeignKey(
+        'TrainingSeries',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='trainings',
+        verbose_name='სერია'
+    )
 
 
     title = models.CharField(max_length=200, verbose_name='სათაური')
@@ -61,43 +135,656 @@ class Training(models.Model):
     date = models.DateField(verbose_name='თარიღი')
     start_time = models.TimeField(verbose_name='დაწყების დრო')
     duration = models.IntegerField(
-        validators=[MinValueValidator(15), MaxValueValidator(300)],
+        validators=[MinValueValidator(15), MaxValueValidator(MAX_TRAINING_DURATION)],
         help_text='წუთებში',
         verbose_name='ხანგრძლივობა'
     )
+    # date + start_time + duration, ითვლება save()-ში (PostgreSQL-ზე exclusion constraint-ისთვის)
+    starts_at = models.DateTimeField(editable=False, verbose_name='დაწყება')
+    ends_at = models.DateTimeField(editable=False, verbose_name='დასრულება')
 
     max_participants = models.IntegerField(
         validators=[MinValueValidator(1), MaxValueValidator(50)],
         default=20,
         verbose_name='მაქსიმალური მონაწილეები'
     )
+    # დადასტურებული ჩაწერების მრიცხველი, ახლდება F() update-ით (იხ. Enrollment.save)
+    confirmed_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='დადასტურებული ჩაწერები'
+    )
 
     is_active = models.BooleanField(default=True, verbose_name='აქტიური')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # PostgreSQL-ზე trigger ავსებს (title + sport name + description), SQLite-ზე ცარიელია
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = TrainingQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'ვარჯიში'
         verbose_name_plural = 'ვარჯიშები'
         ordering = ['date', 'start_time']
-        unique_together = ['coach', 'date','start_time']
+        constraints = [
+            # მხოლოდ აქტიურებზე: გაუქმებული ვარჯიშის დრო ისევ თავისუფალია
+            models.UniqueConstraint(
+                fields=['coach', 'date', 'start_time'],
+                name='training_coach_slot_active_uniq',
+                condition=Q(is_active=True)
+            ),
+        ]
+        indexes = [
+            # UpcomingTrainingsView / სიები: is_active=True, date >= დღეს, ORDER BY date, start_time
+            models.Index(
+                fields=['date', 'start_time'],
+                name='training_upcoming_idx',
+                condition=Q(is_active=True)
+            ),
+            # MyTrainingsView: coach=..., is_active=True, ORDER BY -date, -start_time
+            models.Index(
+                fields=['coach', '-date', '-start_time'],
+                name='training_coach_active_idx',
+                condition=Q(is_active=True)
+            ),
+            # მწვრთნელის დროის გადაფარვის შემოწმება (overlapping())
+            models.Index(
+                fields=['coach', 'starts_at'],
+                name='training_coach_starts_idx',
+                condition=Q(is_active=True)
+            ),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.date} {self.start_time}"
 
+    @staticmethod
+    def time_range(day, start_time, duration):
+        starts_at = timezone.make_aware(datetime.combine(day, start_time))
+        return starts_at, starts_at + timedelta(minutes=duration)
+
+    def set_time_range(self):
+        #bulk_create save()-ს არ იძახებს, ამიტომ იქ ხელით
+        self.starts_at, self.ends_at = self.time_range(self.date, self.start_time, self.duration)
+
+    def mark_attendance(self, attended_user_ids):
+        """
+        დასწრება მთელ სიაზე ორი UPDATE-ით: მოსულები attended=True, დანარჩენები False,
+        ორივე completed სტატუსით. ვარჯიში იხურება (is_active=False, მრიცხველი 0), მოლოდინის
+        რიგი უქმდება - complete_past_trainings-ის მსგავსად.
+        """
+        now = timezone.now()
+        roster = Enrollment.objects.filter(training=self, status__in=['confirmed', 'completed'])
+        with transaction.atomic():
+            roster.filter(user_id__in=attended_user_ids).update(
+                attended=True, status='completed', updated_at=now
+            )
+            roster.exclude(user_id__in=attended_user_ids).update(
+                attended=False, status='completed', updated_at=now
+            )
+            Enrollment.objects.cancel_for_trainings([self.pk], statuses=['pending'], now=now)
+            Training.objects.filter(pk=self.pk).update(is_active=False, confirmed_count=0, updated_at=now)
+            self.is_active = False
+            self.confirmed_count = 0
+            invalidate('training', 'sport', 'enrollment')
+
+    def clean(self):
+        # admin-ის ფორმებისთვის (API-ში TrainingSerializer.validate ამოწმებს)
+        if not self.is_active or None in (self.coach_id, self.date, self.start_time, self.duration):
+            return
+        starts_at, ends_at = self.time_range(self.date, self.start_time, self.duration)
+        if Training.objects.overlapping(self.coach_id, starts_at, ends_at).exclude(pk=self.pk).exists():
+            raise ValidationError('მწვრთნელს უკვე აქვს ვარჯიში ამ დროს.')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # save()-ისთვის: ადგილების გაზრდისას რიგი წინ მიიწევს, გაუქმებისას ჩაწერები უქმდება
+        instance._loaded_max_participants = instance.__dict__.get('max_participants')
+        instance._loaded_is_active = instance.__dict__.get('is_active')
+        return instance
+
+    def save(self, *args, **kwargs):
+        self.set_time_range()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'date', 'start_time', 'duration'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'starts_at', 'ends_at'}
+        loaded_max = None if self._state.adding else getattr(self, '_loaded_max_participants', None)
+        grown = self.is_active and loaded_max is not None and self.max_participants > loaded_max
+        deactivated = not self._state.adding and getattr(self, '_loaded_is_active', False) and not self.is_active
+
+        with transaction.atomic():
+            if deactivated:
+                # cancel_following-ის მსგავსად: ჩაწერები უქმდება, კვირის ლიმიტი თავისუფლდება
+                Enrollment.objects.cancel_for_trainings([self.pk])
+                self.confirmed_count = 0
+                if kwargs.get('update_fields') is not None:
+                    kwargs['update_fields'] = {*kwargs['update_fields'], 'confirmed_count'}
+                invalidate('enrollment')
+            super().save(*args, **kwargs)
+            if grown:
+                # დამატებული ადგილები რიგს ეკუთვნის და არა ახალ ჩაწერებს
+                self.confirmed_count += len(Enrollment.objects.promote_waiting(self.pk))
+        self._loaded_max_participants = self.max_participants
+        self._loaded_is_active = self.is_active
+
     @property
     def enrolled_count(self):
-        #რეგისტრირებული ტრენერები
-        return self.enrollments.filter(status='confirmed').count()
+        #რეგისტრირებული ტრენერები (with_capacity()-ის შემთხვევაში query აღარ სჭირდება)
+        if hasattr(self, 'confirmed_enrollments'):
+            return self.confirmed_enrollments
+        return self.confirmed_count
 
     @property
     def is_full(self):
+        if hasattr(self, 'full'):
+            return self.full
         return self.enrolled_count >= self.max_participants
 
     @property
     def available_spots(self):
+        if hasattr(self, 'free_spots'):
+            return self.free_spots
         return self.max_participants - self.enrolled_count
 
+    @classmethod
+    def adjust_confirmed_count(cls, training_id, delta):
+        #ერთი UPDATE, COUNT-ის გარეშე
+        queryset = cls.objects.filter(pk=training_id)
+        if delta < 0:
+            queryset = queryset.filter(confirmed_count__gte=-delta)
+        return queryset.update(confirmed_count=F('confirmed_count') + delta)
+
+class ScheduleConflict(Exception):
+
+    def __init__(self, dates):
+        super().__init__(dates)
+        self.dates = dates
+
+
+class TrainingSeriesQuerySet(models.QuerySet):
+
+    def with_trainings_count(self):
+        return self.annotate(
+            active_trainings_count=count_subquery(Training.objects.filter(is_active=True), 'series')
+        )
+
+
+#განმეორებადი ვარჯიში
+class TrainingSeries(models.Model):
+    """
+    კვირის დღეები + თარიღების შუალედი, გამონაკლისი თარიღებით.
+    ვარჯიშები (Training) ერთი bulk_create-ით იქმნება, ცვლილებები - bulk UPDATE-ით.
+    """
+    # სერიის მაქსიმალური ხანგრძლივობა დღეებში
+    MAX_DAYS = 366
+    # მწვრთნელის შეცვლა სერიით არ ხდება
+    EDITABLE_FIELDS = ('sport', 'title', 'description', 'difficulty', 'start_time', 'duration', 'max_participants')
+
+    sport = models.ForeignKey(
+        Sport,
+        on_delete=models.CASCADE,
+        related_name='training_series',
+        verbose_name='სპორტი'
+    )
+    coach = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        limit_choices_to={'role__in': ['admin', 'coach']},
+        related_name='training_series',
+        verbose_name='მწვრთნელი'
+    )
+    title = models.CharField(max_length=200, verbose_name='სათაური')
+    description = models.TextField(blank=True, verbose_name='აღწერა')
+    difficulty = models.CharField(
+        max_length=20,
+        choices=Training.DIFFICULTY_CHOICES,
+        default='beginner',
+        verbose_name='სირთულე'
+    )
+    start_time = models.TimeField(verbose_name='დაწყების დრო')
+    duration = models.IntegerField(
+        validators=[MinValueValidator(15), MaxValueValidator(MAX_TRAINING_DURATION)],
+        help_text='წუთებში',
+        verbose_name='ხანგრძლივობა'
+    )
+    max_participants = models.IntegerField(
+        validators=[MinValueValidator(1), MaxValueValidator(50)],
+        default=20,
+        verbose_name='მაქსიმალური მონაწილეები'
+    )
+
+    weekdays = models.JSONField(help_text='0 - ორშაბათი ... 6 - კვირა', verbose_name='კვირის დღეები')
+    start_date = models.DateField(verbose_name='დაწყების თარიღი')
+    end_date = models.DateField(verbose_name='დასრულების თარიღი')
+    exceptions = models.JSONField(
+        default=list,
+        blank=True,
+        help_text='გამოტოვებული თარიღები (YYYY-MM-DD)',
+        verbose_name='გამონაკლისები'
+    )
+
+    is_active = models.BooleanField(default=True, verbose_name='აქტიური')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = TrainingSeriesQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'ვარჯიშების სერია'
+        verbose_name_plural = 'ვარჯიშების სერიები'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.title} ({self.start_date} - {self.end_date})"
+
+    def occurrence_dates(self):
+        weekdays = set(self.weekdays)
+        skipped = set(self.exceptions)
+        day = self.start_date
+        while day <= self.end_date:
+            if day.weekday() in weekdays and day.isoformat() not in skipped:
+                yield day
+            day += timedelta(days=1)
+
+    def _check_conflicts(self, trainings, exclude_from=None):
+        if not trainings:
+            return
+        conflicts = Training.objects.overlapping_any(
+            self.coach_id, [(training.starts_at, training.ends_at) for training in trainings]
+        )
+        if exclude_from is not None:
+            # სერიის ის ვარჯიშები, რომლებიც თავად იცვლება
+            conflicts = conflicts.exclude(series=self, date__gte=exclude_from)
+        dates = sorted(set(conflicts.values_list('date', flat=True)))
+        if dates:
+            raise ScheduleConflict(dates)
+
+    def materialize(self):
+        """ვარჯიშების შექმნა: გადაფარვის შემოწმება (1 query) + bulk_create"""
+        trainings = []
+        for day in self.occurrence_dates():
+            training = Training(
+                series=self,
+                sport_id=self.sport_id,
+                coach_id=self.coach_id,
+                title=self.title,
+                description=self.description,
+                difficulty=self.difficulty,
+                date=day,
+                start_time=self.start_time,
+                duration=self.duration,
+                max_participants=self.max_participants
+            )
+            training.set_time_range()
+            trainings.append(training)
+
+        with transaction.atomic():
+            self._check_conflicts(trainings)
+            Training.objects.bulk_create(trainings, batch_size=500)
+            # bulk_create სიგნალებს არ აგზავნის
+            invalidate('training', 'sport')
+        return trainings
+
+    def following(self, from_date):
+        return self.trainings.filter(date__gte=from_date, is_active=True)
+
+    def update_following(self, from_date, **changes):
+        """from_date-დან სერიის აქტიური ვარჯიშების (და თავად სერიის) ცვლილება"""
+        timing = {'start_time', 'duration'} & set(changes)
+        with transaction.atomic():
+            for field, value in changes.items():
+                setattr(self, field, value)
+            self.save()
+
+            trainings = self.following(from_date)
+            fields = {}
+            for field in set(changes) - timing:
+                attname = self._meta.get_field(field).attname
+                fields[attname] = getattr(self, attname)
+            updated = 0
+            if fields:
+                updated = trainings.update(**fields, updated_at=timezone.now())
+
+            if timing:
+                # starts_at/ends_at თარიღზეა დამოკიდებული, ამიტომ bulk_update (CASE WHEN) ერთ UPDATE-ში
+                now = timezone.now()
+                occurrences = list(trainings.only('pk', 'date', 'start_time', 'duration'))
+                for training in occurrences:
+                    training.start_time = self.start_time
+                    training.duration = self.duration
+                    training.updated_at = now
+                    training.set_time_range()
+                self._check_conflicts(occurrences, exclude_from=from_date)
+                Training.objects.bulk_update(
+                    occurrences, ['start_time', 'duration', 'starts_at', 'ends_at', 'updated_at'], batch_size=500
+                )
+                updated = len(occurrences)
+
+            invalidate('training', 'sport')
+        return updated
+
+    def cancel_following(self, from_date):
+        """
+        from_date-დან სერიის ვარჯიშების გაუქმება; სერია from_date-მდე მოკლდება.
+        ჩაწერებიც (რიგიანად) უქმდება და კვირის ლიმიტი თავისუფლდება.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            training_ids = list(self.following(from_date).values_list('pk', flat=True))
+            Enrollment.objects.cancel_for_trainings(training_ids, now=now)
+            cancelled = Training.objects.filter(pk__in=training_ids).update(
+                is_active=False, confirmed_count=0, updated_at=now
+            )
+            if from_date <= self.start_date:
+                self.is_active = False
+            else:
+                self.end_date = min(self.end_date, from_date - timedelta(days=1))
+            self.save()
+            invalidate('training', 'sport', 'enrollment')
+        return cancelled
+
+
+class TrainingFull(Exception):
+    pass
+
+
+class AlreadyEnrolled(Exception):
+    pass
+
+
+class NoActiveMembership(Exception):
+    pass
+
+
+class WeeklyLimitReached(Exception):
+    pass
+
+
+class BatchEnrollmentFailed(Exception):
+    """all-or-nothing რეჟიმში: ერთი ვარჯიშიც ვერ ჩაიწერა"""
+
+    def __init__(self, results):
+        super().__init__(results)
+        self.results = results
+
+
+class EnrollmentManager(models.Manager):
+
+    def enroll(self, user, training, waitlist=True, check_eligibility=True):
+        """
+        ადგილის დაჯავშნა პირობითი UPDATE-ით, lock-ისა და წინასწარი COUNT-ის გარეშე.
+        სავსე ვარჯიშზე, ან როცა რიგი უკვე არსებობს, (waitlist=True) იქმნება pending ჩაწერა რიგში.
+        წევრისთვის ჯერ მოწმდება აქტიური საწევრო და კვირის ლიმიტი (2 query).
+        """
+        with transaction.atomic():
+            if check_eligibility and user.is_member:
+                self._use_weekly_quota(user, training)
+
+            # თავისუფალ ადგილს ახალი ჩაწერა მხოლოდ ცარიელი რიგისას იკავებს
+            reserved = Training.objects.filter(
+                ~Exists(self.filter(training_id=OuterRef('pk'), status='pending')),
+                pk=training.pk,
+                is_active=True,
+                confirmed_count__lt=F('max_participants')
+            ).update(confirmed_count=F('confirmed_count') + 1)
+            if not reserved and not waitlist:
+                raise TrainingFull
+
+            # ადგილი უკვე დაჯავშნულია, ამიტომ save()-ის მრიცხველს გვერდს ვუვლით
+            enrollment = self._upsert(user, training, 'confirmed' if reserved else 'pending')
+            if enrollment is None:
+                raise AlreadyEnrolled
+            # upsert სიგნალებს არ აგზავნის
+            invalidate('enrollment')
+
+        return enrollment
+
+    def _use_weekly_quota(self, user, training):
+        #შეცდომისას (მაგ. AlreadyEnrolled) მრიცხველი ტრანზაქციასთან ერთად ბრუნდება
+        limit = Membership.objects.filter(
+            user=user,
+            is_active=True,
+            start_date__lte=training.date,
+            end_date__gte=max(timezone.now().date(), training.date)
+        ).order_by('-plan__max_trainings_per_week').values_list(
+            'plan__max_trainings_per_week', flat=True
+        ).first()
+        if limit is None:
+            raise NoActiveMembership
+        if not WeeklyTrainingUsage.increment(user.pk, training.date, limit):
+            raise WeeklyLimitReached
+
+    def enroll_batch(self, user, training_ids, all_or_nothing=False, waitlist=True):
+        """
+        რამდენიმე ვარჯიშზე ჩაწერა set-based query-ებით: ვარჯიშები, არსებული ჩაწერები,
+        საწევროები და კვირის მრიცხველები თითო query-ით, ადგილები - ერთი UPDATE ... RETURNING-ით,
+        ჩაწერები - ერთი upsert-ით (ON CONFLICT). აბრუნებს [(training_id, enrollment, error)] მოთხოვნის რიგით.
+        """
+        training_ids = list(dict.fromkeys(training_ids))
+        errors = {}
+        trainings = Training.objects.filter(pk__in=training_ids, is_active=True).only(
+            'pk', 'date', 'max_participants', 'confirmed_count'
+        ).in_bulk()
+        for training_id in training_ids:
+            if training_id not in trainings:
+                errors[training_id] = 'not_found'
+
+        existing = dict(self.filter(user=user, training_id__in=list(trainings)).values_list('training_id', 'status'))
+        for training_id, current in existing.items():
+            if current != 'cancelled':
+                errors[training_id] = 'already_enrolled'
+
+        candidates = [training_id for training_id in training_ids if training_id not in errors]
+        week_limits = {}
+        if user.is_member and candidates:
+            week_limits = self._allocate_weekly_quota(
+                user, [trainings[training_id] for training_id in candidates], errors
+            )
+            candidates = [training_id for training_id in candidates if training_id not in errors]
+
+        if all_or_nothing and errors:
+            raise BatchEnrollmentFailed(self._batch_results(training_ids, {}, errors))
+
+        with transaction.atomic():
+            reserved = self._reserve_seats(candidates)
+            statuses = {}
+            for training_id in candidates:
+                if training_id in reserved:
+                    statuses[training_id] = 'confirmed'
+                elif waitlist:
+                    statuses[training_id] = 'pending'
+                else:
+                    errors[training_id] = 'full'
+
+            if all_or_nothing and errors:
+                raise BatchEnrollmentFailed(self._batch_results(training_ids, {}, errors))
+
+            if user.is_member:
+                self._use_allocated_quota(user, [trainings[training_id] for training_id in statuses], week_limits)
+            enrollments, conflicts = self._write_batch(user, trainings, statuses)
+            for training_id in conflicts:
+                errors[training_id] = 'already_enrolled'
+            if all_or_nothing and conflicts:
+                raise BatchEnrollmentFailed(self._batch_results(training_ids, {}, errors))
+            if enrollments:
+                invalidate('enrollment')
+
+        return self._batch_results(training_ids, enrollments, errors)
+
+    def _batch_results(self, training_ids, enrollments, errors):
+        return [
+            (training_id, enrollments.get(training_id), errors.get(training_id))
+            for training_id in training_ids
+        ]
+
+    def _allocate_weekly_quota(self, user, trainings, errors):
+        #ვარჯიშები მოთხოვნის რიგით ავსებენ კვირის დარჩენილ ლიმიტს
+        today = timezone.now().date()
+        memberships = list(Membership.objects.filter(
+            user=user, is_active=True, end_date__gte=today
+        ).values_list('start_date', 'end_date', 'plan__max_trainings_per_week'))
+        weeks = {WeeklyTrainingUsage.week_of(training.date) for training in trainings}
+        used = dict(WeeklyTrainingUsage.objects.filter(
+            user=user, week_start__in=weeks
+        ).values_list('week_start', 'trainings_count'))
+
+        week_limits = {}
+        for training in trainings:
+            limits = [
+                limit for start_date, end_date, limit in memberships
+                if start_date <= training.date <= end_date
+            ]
+            if not limits:
+                errors[training.pk] = 'no_membership'
+                continue
+            week = WeeklyTrainingUsage.week_of(training.date)
+            if used.get(week, 0) >= max(limits):
+                errors[training.pk] = 'weekly_limit'
+                continue
+            used[week] = used.get(week, 0) + 1
+            week_limits[week] = max(limits)
+        return week_limits
+
+    def _use_allocated_quota(self, user, trainings, week_limits):
+        # პარალელური მოთხოვნა იმავე მომხმარებლისგან - ლიმიტის საბოლოო შემოწმება ბაზაში
+        per_week = {}
+        for training in trainings:
+            week = WeeklyTrainingUsage.week_of(training.date)
+            per_week[week] = per_week.get(week, 0) + 1
+        for week, amount in per_week.items():
+            if not WeeklyTrainingUsage.increment(user.pk, week, week_limits[week], amount):
+                raise WeeklyLimitReached
+
+    def _reserve_seats(self, training_ids):
+        if not training_ids:
+            return set()
+        table = connection.ops.quote_name(Training._meta.db_table)
+        enrollments = connection.ops.quote_name(self.model._meta.db_table)
+        placeholders = ', '.join(['%s'] * len(training_ids))
+        # რიგის მქონე ვარჯიშზე ადგილი არ იჯავშნება (იხ. enroll)
+        sql = (
+            f"UPDATE {table} SET confirmed_count = confirmed_count + 1 "
+            f"WHERE id IN ({placeholders}) AND is_active = %s AND confirmed_count < max_participants "
+            f"AND NOT EXISTS (SELECT 1 FROM {enrollments} e WHERE e.training_id = {table}.id AND e.status = %s) "
+            f"RETURNING id"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [*training_ids, True, 'pending'])
+            return {row[0] for row in cursor.fetchall()}
+
+    def _write_batch(self, user, trainings, statuses):
+        """
+        ახალი და გაუქმებული ჩაწერები ერთი upsert-ით. პარალელურად უკვე ჩაწერილ ვარჯიშებზე
+        დაჯავშნილი ადგილი და კვირის ლიმიტი ბრუნდება; აბრუნებს (enrollments, conflicts).
+        """
+        if not statuses:
+            return {}, []
+        enrollments = self._upsert_many(user, trainings, statuses)
+        conflicts = [training_id for training_id in statuses if training_id not in enrollments]
+
+        per_week = {}
+        for training_id in conflicts:
+            if statuses[training_id] == 'confirmed':
+                Training.adjust_confirmed_count(training_id, -1)
+            week = WeeklyTrainingUsage.week_of(trainings[training_id].date)
+            per_week[week] = per_week.get(week, 0) + 1
+        if user.is_member:
+            for week, amount in per_week.items():
+                WeeklyTrainingUsage.decrement(user.pk, week, amount)
+        return enrollments, conflicts
+
+    def promote_next(self, training_id):
+        """
+        რიგის თავის (უძველესი pending) გადაყვანა confirmed-ში გათავისუფლებულ ადგილზე.
+        3 query რიგის სიგრძის მიუხედავად; SKIP LOCKED-ით პარალელური გაუქმებები
+        სხვადასხვა ჩაწერას იღებენ. გამოძახება ტრანზაქციის შიგნით.
+        """
+        head = self.select_for_update(skip_locked=True).filter(
+            training_id=training_id, status='pending'
+        ).order_by('enrolled_at', 'id').values_list('pk', flat=True).first()
+        if head is None:
+            return None
+
+        reserved = Training.objects.filter(
+            pk=training_id,
+            is_active=True,
+            confirmed_count__lt=F('max_participants')
+        ).update(confirmed_count=F('confirmed_count') + 1)
+        if not reserved:
+            return None
+
+        # queryset.update - save()-ის მრიცხველი ორჯერ რომ არ გაიზარდოს
+        self.filter(pk=head).update(status='confirmed', updated_at=timezone.now())
+        invalidate('enrollment')
+        return head
+
+    def promote_waiting(self, training_id):
+        """ყველა თავისუფალი ადგილის შევსება რიგიდან (max_participants-ის გაზრდისას); აბრუნებს pk-ების სიას"""
+        promoted = []
+        while True:
+            head = self.promote_next(training_id)
+            if head is None:
+                return promoted
+            promoted.append(head)
+
+    def cancel_for_trainings(self, training_ids, statuses=('pending', 'confirmed'), now=None):
+        """
+        გაუქმებული/დახურული ვარჯიშების ჩაწერები -> cancelled ერთი UPDATE-ით.
+        კვირის ლიმიტი (user, თარიღი) ჯგუფებით თავისუფლდება; confirmed_count-ს გამომძახებელი ანულებს.
+        გამოძახება ტრანზაქციის შიგნით.
+        """
+        enrollments = self.filter(training_id__in=training_ids, status__in=statuses)
+        used = enrollments.order_by().values('user', 'training__date').annotate(total=Count('pk'))
+        for row in used:
+            WeeklyTrainingUsage.decrement(row['user'], row['training__date'], row['total'])
+        return enrollments.update(status='cancelled', updated_at=now or timezone.now())
+
+    def _upsert(self, user, training, status):
+        """ერთი ჩაწერა (_upsert_many). აქტიური ჩაწერის შემთხვევაში None ბრუნდება"""
+        return self._upsert_many(user, {training.pk: training}, {training.pk: status}).get(training.pk)
+
+    def _upsert_many(self, user, trainings, statuses):
+        """
+        INSERT ... ON CONFLICT DO UPDATE: გაუქმებული ჩაწერა ისევ აქტიურდება
+        იგივე სტრიქონში, აქტიური ჩაწერა (მათ შორის პარალელურად შექმნილი) არ იცვლება.
+        აბრუნებს {training_id: enrollment} მხოლოდ ჩაწერილებზე.
+        PostgreSQL-ზეც და SQLite-ზეც (3.35+) ერთი statement-ია.
+        """
+        now = timezone.now()
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        rows = ', '.join(['(%s, %s, %s, %s, %s, %s, %s)'] * len(statuses))
+        sql = (
+            f"INSERT INTO {table} (user_id, training_id, status, attended, notes, enrolled_at, updated_at) "
+            f"VALUES {rows} "
+            f"ON CONFLICT (user_id, training_id) DO UPDATE SET "
+            f"status = excluded.status, attended = excluded.attended, notes = excluded.notes, "
+            f"enrolled_at = excluded.enrolled_at, updated_at = excluded.updated_at "
+            f"WHERE {table}.status = %s "
+            f"RETURNING id, training_id"
+        )
+        db_now = connection.ops.adapt_datetimefield_value(now)
+        params = []
+        for training_id, status in statuses.items():
+            params += [user.pk, training_id, status, False, '', db_now, db_now]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [*params, 'cancelled'])
+            rows = cursor.fetchall()
+
+        enrollments = {}
+        for pk, training_id in rows:
+            enrollment = self.model(
+                id=pk, user=user, training=trainings[training_id], status=statuses[training_id],
+                attended=False, notes='', enrolled_at=now, updated_at=now
+            )
+            enrollment._state.adding = False
+            enrollment._loaded_status = statuses[training_id]
+            enrollment._loaded_training_id = training_id
+            enrollments[training_id] = enrollment
+        return enrollments
+
+
 #ვარჯიშზე რეგისტრაცია
 class Enrollment(models.Model):
 
@@ -107,6 +794,8 @@ class Enrollment(models.Model):
         ('cancelled', 'გაუქმებული'),
         ('completed', 'დასრულებული'),
     ]
+    # კვირის ლიმიტში ითვლება (მოლოდინის რიგიც)
+    QUOTA_STATUSES = ('pending', 'confirmed', 'completed')
 
     user = models.ForeignKey(
         User,
@@ -131,15 +820,112 @@ class Enrollment(models.Model):
     enrolled_at = models.DateTimeField(auto_now_add=True, verbose_name='ჩაწერის დრო')
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = EnrollmentManager()
+
     class Meta:
         verbose_name = 'ჩაწერა'
         verbose_name_plural = 'ჩაწერები'
         ordering = ['-enrolled_at']
         unique_together = ['user', 'training']
+        indexes = [
+            # ადგილების დათვლა / ვარჯიშის ჩაწერები / მოლოდინის რიგი (FIFO)
+            models.Index(fields=['training', 'status', 'enrolled_at'], name='enrollment_training_queue_idx'),
+            # მომხმარებლის აქტიური ჩაწერები
+            models.Index(fields=['user', 'status'], name='enrollment_user_status_idx'),
+            # MyEnrollmentsView: user=..., ORDER BY -enrolled_at
+            models.Index(fields=['user', '-enrolled_at'], name='enrollment_user_recent_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.get_full_name()} - {self.training.title}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # ბაზაში არსებული სტატუსი, რომ save()-მა მრიცხველი სწორად შეცვალოს
+        instance._loaded_status = instance.__dict__.get('status')
+        instance._loaded_training_id = instance.__dict__.get('training_id')
+        return instance
+
+    @property
+    def waitlist_position(self):
+        """რიგში ადგილი (1-დან), pending-ის გარდა None"""
+        if self.status != 'pending':
+            return None
+        ahead = Enrollment.objects.filter(
+            training_id=self.training_id, status='pending'
+        ).filter(
+            Q(enrolled_at__lt=self.enrolled_at) | Q(enrolled_at=self.enrolled_at, pk__lt=self.pk)
+        ).count()
+        return ahead + 1
+
+    def _counted_training_id(self):
+        if getattr(self, '_loaded_status', None) == 'confirmed':
+            return self._loaded_training_id
+        return None
+
+    def _sync_confirmed_count(self, old_training_id, new_training_id, promote=True):
+        if old_training_id == new_training_id:
+            return
+        promoted = None
+        if old_training_id is not None:
+            Training.adjust_confirmed_count(old_training_id, -1)
+            # გათავისუფლებული ადგილი რიგის თავს (გაუქმება/წაშლა; completed ადგილს არ ათავისუფლებს)
+            if promote:
+                promoted = Enrollment.objects.promote_next(old_training_id)
+        if new_training_id is not None:
+            Training.adjust_confirmed_count(new_training_id, 1)
+
+        # უკვე ჩატვირთული ვარჯიშის ობიექტიც განვაახლოთ
+        training_field = self._meta.get_field('training')
+        if training_field.is_cached(self) and self.training is not None:
+            if self.training.pk == old_training_id and promoted is None:
+                self.training.confirmed_count -= 1
+            if self.training.pk == new_training_id:
+                self.training.confirmed_count += 1
+
+    def _sync_weekly_usage(self, was_counted, is_counted):
+        if was_counted == is_counted:
+            return
+        if is_counted:
+            WeeklyTrainingUsage.increment(self.user_id, self.training.date)
+        else:
+            WeeklyTrainingUsage.decrement(self.user_id, self.training.date)
+
+    def save(self, *args, **kwargs):
+        old_training_id = None if self._state.adding else self._counted_training_id()
+        new_training_id = self.training_id if self.status == 'confirmed' else None
+        was_counted = not self._state.adding and getattr(self, '_loaded_status', None) in self.QUOTA_STATUSES
+        is_counted = self.status in self.QUOTA_STATUSES
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            self._sync_confirmed_count(old_training_id, new_training_id, promote=self.status != 'completed')
+            self._sync_weekly_usage(was_counted, is_counted)
+
+        self._loaded_status = self.status
+        self._loaded_training_id = self.training_id
+
+    def delete(self, *args, **kwargs):
+        old_training_id = self._counted_training_id()
+        was_counted = getattr(self, '_loaded_status', None) in self.QUOTA_STATUSES
+
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            self._sync_confirmed_count(old_training_id, None)
+            self._sync_weekly_usage(was_counted, False)
+
+        self._loaded_status = None
+        return result
+
+
+class MembershipPlanQuerySet(models.QuerySet):
+
+    def with_members_count(self):
+        return self.annotate(
+            active_members_count=count_subquery(Membership.objects.filter(is_active=True), 'plan')
+        )
+
 
 #საწევროს პაკეტი
 class MembershipPlan(models.Model):
@@ -167,6 +953,8 @@ class MembershipPlan(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = MembershipPlanQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'საწევროს პაკეტი'
         verbose_name_plural = 'საწევროს პაკეტები'
@@ -201,6 +989,14 @@ class Membership(models.Model):
         verbose_name = 'საწევრო'
         verbose_name_plural = 'საწევროები'
         ordering = ['-start_date']
+        indexes = [
+            # MyMembershipView: user=..., is_active=True, latest('start_date')
+            models.Index(
+                fields=['user', '-start_date'],
+                name='membership_user_active_idx',
+                condition=Q(is_active=True)
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.get_full_name()} - {self.plan.name}"
@@ -208,4 +1004,73 @@ class Membership(models.Model):
     @property
     def is_expired(self):
         from django.utils import timezone
-        return timezone.now().date() > self.end_date
\ No newline at end of file
+        return timezone.now().date() > self.end_date
+
+
+#წევრის ვარჯიშები კვირაში (max_trainings_per_week-ის შესამოწმებლად)
+class WeeklyTrainingUsage(models.Model):
+    """
+    ISO კვირის მრიცხველი: pending/confirmed/completed ჩაწერები ვარჯიშის კვირის მიხედვით.
+    ჩაწერისას COUNT-ის ნაცვლად ერთი პირობითი upsert.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='weekly_usage',
+        verbose_name='მომხმარებელი'
+    )
+    week_start = models.DateField(verbose_name='კვირის დასაწყისი')
+    trainings_count = models.PositiveIntegerField(default=0, verbose_name='ვარჯიშები')
+
+    class Meta:
+        verbose_name = 'კვირის გამოყენება'
+        verbose_name_plural = 'კვირის გამოყენება'
+        unique_together = ['user', 'week_start']
+
+    def __str__(self):
+        return f"{self.user} - {self.week_start}: {self.trainings_count}"
+
+    @staticmethod
+    def week_of(day):
+        #ორშაბათი
+        return day - timedelta(days=day.weekday())
+
+    @classmethod
+    def increment(cls, user_id, day, limit=None, amount=1):
+        """+amount, თუ limit-ს არ აჭარბებს. False - ლიმიტი ამოწურულია"""
+        table = connection.ops.quote_name(cls._meta.db_table)
+        sql = (
+            f"INSERT INTO {table} (user_id, week_start, trainings_count) VALUES (%s, %s, %s) "
+            f"ON CONFLICT (user_id, week_start) DO UPDATE SET "
+            f"trainings_count = {table}.trainings_count + %s"
+        )
+        params = [user_id, connection.ops.adapt_datefield_value(cls.week_of(day)), amount, amount]
+        if limit is not None:
+            sql += f" WHERE {table}.trainings_count + %s <= %s"
+            params += [amount, limit]
+        sql += " RETURNING trainings_count"
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchone() is not None
+
+    @classmethod
+    def decrement(cls, user_id, day, amount=1):
+        #0-ზე ქვემოთ არ ჩადის (აცდენილი მრიცხველი - reconcile_weekly_usage)
+        return cls.objects.filter(user_id=user_id, week_start=cls.week_of(day)).update(
+            trainings_count=Greatest(F('trainings_count') - amount, 0)
+        )
+
+
+#API ქეშის ვერსიები (sports/cache.py): ბაზაში, რომ ყველა worker-მა და cron ბრძანებამ ერთი და იგივე დაინახოს
+class CacheVersion(models.Model):
+    scope = models.CharField(max_length=50, primary_key=True, verbose_name='სფერო')
+    # მიკროწამები, მკაცრად მზარდი (Last-Modified-ისთვისაც)
+    version = models.BigIntegerField(default=0, verbose_name='ვერსია')
+
+    class Meta:
+        verbose_name = 'ქეშის ვერსია'
+        verbose_name_plural = 'ქეშის ვერსიები'
+
+    def __str__(self):
+        return f"{self.scope}: {self.version}"
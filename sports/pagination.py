@@ -0,0 +1,105 @@
+import base64
+import datetime
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetOrPageNumberPagination(PageNumberPagination):
+    """
+    ნაგულისხმევად ჩვეულებრივი page-number პაგინაცია.
+    ?pagination=cursor (ან ?cursor=...) ჩართავს keyset რეჟიმს view-ის
+    cursor_ordering-ის მიხედვით - COUNT(*)-ისა და OFFSET-ის გარეშე.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = settings.API_MAX_PAGE_SIZE
+    cursor_query_param = 'cursor'
+    mode_query_param = 'pagination'
+    invalid_cursor_message = 'არასწორი cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.ordering = getattr(view, 'cursor_ordering', None)
+        self.use_cursor = bool(self.ordering) and (
+            self.cursor_query_param in request.query_params
+            or request.query_params.get(self.mode_query_param) == 'cursor'
+        )
+        if not self.use_cursor:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded:
+            queryset = queryset.filter(self._after(self.decode_cursor(encoded, queryset.model)))
+
+        objects = list(queryset[:page_size + 1])
+        self.has_next = len(objects) > page_size
+        self.page_objects = objects[:page_size]
+        return self.page_objects
+
+    def get_paginated_response(self, data):
+        if not self.use_cursor:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', None),
+            ('results', data),
+        ]))
+
+    def get_next_link(self):
+        if not self.use_cursor:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.mode_query_param)
+        url = remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page_objects[-1]))
+
+    def _after(self, values):
+        # (a, b, c) > (a0, b0, c0) თითო ველის მიმართულებით
+        condition = Q()
+        equal = Q()
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def encode_cursor(self, obj):
+        values = []
+        for field in self.ordering:
+            value = getattr(obj, field.lstrip('-'))
+            if isinstance(value, (datetime.date, datetime.time)):
+                value = value.isoformat()
+            values.append(value)
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    def decode_cursor(self, encoded, model):
+        try:
+            values = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        # მნიშვნელობები ველის ტიპით - ცუდი cursor ORM-მდე (500-მდე) არ მიდის
+        try:
+            values = [
+                model._meta.get_field(field.lstrip('-')).to_python(value)
+                for field, value in zip(self.ordering, values)
+            ]
+        except (ValidationError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if None in values:
+            raise NotFound(self.invalid_cursor_message)
+        return values
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from django.utils import timezone
-from .models import Sport, Training, Enrollment, MembershipPlan, Membership
+from django.db import IntegrityError, transaction
+from .models import Sport, Training, TrainingSeries, ScheduleConflict, Enrollment, MembershipPlan, Membership
 from users.serializers import UserSerializer
 
 
@@ -14,8 +15,28 @@ class SportSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
     def get_trainings_count(self, obj):
+        # with_trainings_count()-ით ანოტირებული
+        if hasattr(obj, 'active_trainings_count'):
+            return obj.active_trainings_count
         return obj.trainings.filter(is_active=True).count()
 
+def is_enrolled_in(serializer, training):
+    #მიმდინარე იუზერი არის თუ არა ჩაწეილი
+    enrolled_ids = serializer.context.get('enrolled_training_ids')
+    if enrolled_ids is not None:
+        # view-მ გვერდის ჩაწერები ერთი query-ით უკვე ჩატვირთა
+        return training.pk in enrolled_ids
+
+    request = serializer.context.get('request')
+    if request and request.user.is_authenticated:
+        return Enrollment.objects.filter(
+            user=request.user,
+            training=training,
+            status='confirmed'
+        ).exists()
+    return False
+
+
 class TrainingSerializer(serializers.ModelSerializer):
     sport_name = serializers.CharField(source='sport.name', read_only=True)
     coach_name = serializers.CharField(source='coach.get_full_name', read_only=True)
@@ -30,20 +51,14 @@ class TrainingSerializer(serializers.ModelSerializer):
             'id', 'sport', 'sport_name', 'coach', 'coach_name',
             'title', 'description', 'difficulty', 'date', 'start_time',
             'duration', 'max_participants', 'enrolled_count', 'is_full',
-            'available_spots', 'is_enrolled', 'is_active', 'created_at'
+            'available_spots', 'is_enrolled', 'is_active', 'series', 'created_at'
         ]
-        read_only_fields = ['id', 'created_at', 'enrolled_count', 'is_full', 'available_spots']
+        read_only_fields = ['id', 'created_at', 'enrolled_count', 'is_full', 'available_spots', 'series']
 
     def get_is_enrolled(self, obj):
-        #მიმდინარე იუზერი არის თუ არა ჩაწეილი
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return Enrollment.objects.filter(
-                user=request.user,
-                training=obj,
-                status='confirmed'
-            ).exists()
-        return False
+        return is_enrolled_in(self, obj)
+
+    COACH_BUSY_MESSAGE = "მწვრთნელს უკვე აქვს ვარჯიში ამ დროს."
 
     def validate_coach(self, value):
         #ვამოწმებთ არის თუ არა მწვრთნელი
@@ -52,35 +67,132 @@ class TrainingSerializer(serializers.ModelSerializer):
         return value
 
     def validate(self, attrs):
-        date = attrs.get('date')
-        start_time = attrs.get('start_time')
-        coach = attrs.get('coach')
+        instance = self.instance
+        date = attrs.get('date', getattr(instance, 'date', None))
+        start_time = attrs.get('start_time', getattr(instance, 'start_time', None))
+        duration = attrs.get('duration', getattr(instance, 'duration', None))
+        is_active = attrs.get('is_active', getattr(instance, 'is_active', True))
 
-        if not self.instance:  # ახალი ვარჯიშის შექმნა
+        if instance is None:  # ახალი ვარჯიშის შექმნა
             # თარიღი არ უნდა იყოს წარსულში
             if date < timezone.now().date():
                 raise serializers.ValidationError({"date": "თარიღი არ შეიძლება იყოს წარსულში."})
-
-            #მწვრთნელს არ უნდა ჰქონდეს ვარჯიში იმავე დროს
-            if Training.objects.filter(coach=coach, date=date, start_time=start_time).exists():
-                raise serializers.ValidationError("მწვრთნელს უკვე აქვს ვარჯიში ამ დროს.")
+            # perform_create მწვრთნელად მომხმარებელს წერს
+            request = self.context.get('request')
+            coach = request.user if request else attrs.get('coach')
+        else:
+            coach = attrs.get('coach', instance.coach)
+
+        #მწვრთნელს არ უნდა ჰქონდეს სხვა ვარჯიში, რომელიც დროში ემთხვევა
+        if is_active and coach and None not in (date, start_time, duration):
+            starts_at, ends_at = Training.time_range(date, start_time, duration)
+            overlapping = Training.objects.overlapping(coach, starts_at, ends_at)
+            if instance is not None:
+                overlapping = overlapping.exclude(pk=instance.pk)
+            if overlapping.exists():
+                raise serializers.ValidationError(self.COACH_BUSY_MESSAGE)
 
         return attrs
 
+    def save(self, **kwargs):
+        # PostgreSQL-ის exclusion constraint პარალელური მოთხოვნების შემთხვევაში
+        try:
+            with transaction.atomic():
+                return super().save(**kwargs)
+        except IntegrityError:
+            raise serializers.ValidationError(self.COACH_BUSY_MESSAGE)
+
 
 class TrainingListSerializer(serializers.ModelSerializer):
     sport_name = serializers.CharField(source='sport.name', read_only=True)
     coach_name = serializers.CharField(source='coach.get_full_name', read_only=True)
     enrolled_count = serializers.IntegerField(read_only=True)
     available_spots = serializers.IntegerField(read_only=True)
+    is_enrolled = serializers.SerializerMethodField()
 
     class Meta:
         model = Training
         fields = [
             'id', 'sport_name', 'coach_name', 'title',
             'difficulty', 'date', 'start_time', 'duration',
-            'enrolled_count', 'available_spots'
+            'enrolled_count', 'available_spots', 'is_enrolled'
+        ]
+
+    def get_is_enrolled(self, obj):
+        return is_enrolled_in(self, obj)
+
+def schedule_conflict_error(error):
+    return serializers.ValidationError({
+        'error': 'მწვრთნელს ამ თარიღებში უკვე აქვს ვარჯიში ამ დროს.',
+        'conflicts': [day.isoformat() for day in error.dates]
+    })
+
+
+class TrainingSeriesSerializer(serializers.ModelSerializer):
+    sport_name = serializers.CharField(source='sport.name', read_only=True)
+    coach_name = serializers.CharField(source='coach.get_full_name', read_only=True)
+    weekdays = serializers.ListField(
+        child=serializers.IntegerField(min_value=0, max_value=6),
+        allow_empty=False
+    )
+    exceptions = serializers.ListField(child=serializers.DateField(), required=False)
+    trainings_count = serializers.IntegerField(source='active_trainings_count', read_only=True)
+
+    class Meta:
+        model = TrainingSeries
+        fields = [
+            'id', 'sport', 'sport_name', 'coach', 'coach_name',
+            'title', 'description', 'difficulty', 'start_time', 'duration',
+            'max_participants', 'weekdays', 'start_date', 'end_date', 'exceptions',
+            'trainings_count', 'is_active', 'created_at'
         ]
+        read_only_fields = ['id', 'coach', 'is_active', 'created_at']
+
+    def validate(self, attrs):
+        start_date = attrs['start_date']
+        end_date = attrs['end_date']
+
+        if start_date < timezone.now().date():
+            raise serializers.ValidationError({"start_date": "თარიღი არ შეიძლება იყოს წარსულში."})
+        if end_date < start_date:
+            raise serializers.ValidationError({
+                "end_date": "დასრულების თარიღი უნდა იყოს დაწყების თარიღზე გვიან!"
+            })
+        if (end_date - start_date).days > TrainingSeries.MAX_DAYS:
+            raise serializers.ValidationError({
+                "end_date": f"სერია {TrainingSeries.MAX_DAYS} დღეზე გრძელი ვერ იქნება."
+            })
+
+        # JSONField-ში
+        attrs['weekdays'] = sorted(set(attrs['weekdays']))
+        attrs['exceptions'] = sorted({day.isoformat() for day in attrs.get('exceptions', [])})
+        return attrs
+
+    def create(self, validated_data):
+        # ვარჯიშების შეცდომისას სერიაც არ უნდა შეიქმნას
+        try:
+            with transaction.atomic():
+                series = super().create(validated_data)
+                trainings = series.materialize()
+        except ScheduleConflict as error:
+            raise schedule_conflict_error(error)
+        except IntegrityError:
+            raise serializers.ValidationError(TrainingSerializer.COACH_BUSY_MESSAGE)
+        series.active_trainings_count = len(trainings)
+        return series
+
+
+class TrainingSeriesFollowingSerializer(serializers.Serializer):
+    """ამ და მომდევნო ვარჯიშების ცვლილება (edit-following)"""
+    from_date = serializers.DateField()
+    sport = serializers.PrimaryKeyRelatedField(queryset=Sport.objects.all(), required=False)
+    title = serializers.CharField(max_length=200, required=False)
+    description = serializers.CharField(required=False, allow_blank=True)
+    difficulty = serializers.ChoiceField(choices=Training.DIFFICULTY_CHOICES, required=False)
+    start_time = serializers.TimeField(required=False)
+    duration = serializers.IntegerField(min_value=15, max_value=300, required=False)
+    max_participants = serializers.IntegerField(min_value=1, max_value=50, required=False)
+
 
 class EnrollmentSerializer(serializers.ModelSerializer):
     user_name = serializers.CharField(source='user.get_full_name', read_only=True)
@@ -115,6 +227,23 @@ class EnrollmentSerializer(serializers.ModelSerializer):
         return attrs
 
 
+class BatchEnrollmentSerializer(serializers.Serializer):
+    """POST /api/enrollments/batch/"""
+    trainings = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=50
+    )
+    # True - ან ყველა, ან არცერთი; False - რაც შესაძლებელია
+    all_or_nothing = serializers.BooleanField(default=False)
+    waitlist = serializers.BooleanField(default=True)
+
+
+class AttendanceSerializer(serializers.Serializer):
+    """POST /api/trainings/{training_id}/attendance/ - მოსული წევრების id-ები"""
+    attended = serializers.ListField(child=serializers.IntegerField(min_value=1), max_length=100)
+
+
 class MyEnrollmentSerializer(serializers.ModelSerializer):
     training = TrainingListSerializer(read_only=True)
 
@@ -136,6 +265,12 @@ class MembershipPlanSerializer(serializers.ModelSerializer):
 
     def get_members_count(self, obj):
         #aqtiuri wevrebis raodenoba
+        if hasattr(obj, 'active_members_count'):
+            return obj.active_members_count
+        # საწევროების სიაში view გვერდის პაკეტებს ერთი query-ით ითვლის
+        counts = self.context.get('plan_members_counts')
+        if counts is not None:
+            return counts.get(obj.pk, 0)
         return obj.memberships.filter(is_active=True).count()
 
 
@@ -0,0 +1,40 @@
+#ქეშის ინვალიდაცია მოდელების ცვლილებისას (იხ. sports/cache.py) და ვარჯიშის წაშლის შედეგები
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+
+from .cache import invalidate
+from .models import Sport, Training, Enrollment, MembershipPlan, Membership
+
+
+@receiver([post_save, post_delete], sender=Sport)
+def sport_changed(sender, **kwargs):
+    invalidate('sport')
+
+
+@receiver([post_save, post_delete], sender=Training)
+def training_changed(sender, **kwargs):
+    # სპორტის trainings_count ვარჯიშებზეა დამოკიდებული
+    invalidate('training', 'sport')
+
+
+@receiver(pre_delete, sender=Training)
+def training_deleting(sender, instance, **kwargs):
+    # CASCADE Enrollment.delete()-ს არ იძახებს - კვირის ლიმიტი აქ თავისუფლდება
+    # (წაშლის ტრანზაქციაშია; admin-ის მასობრივი და Sport-ის CASCADE წაშლისასაც)
+    Enrollment.objects.cancel_for_trainings([instance.pk], statuses=Enrollment.QUOTA_STATUSES)
+
+
+@receiver([post_save, post_delete], sender=Enrollment)
+def enrollment_changed(sender, **kwargs):
+    invalidate('enrollment')
+
+
+@receiver([post_save, post_delete], sender=MembershipPlan)
+def membership_plan_changed(sender, **kwargs):
+    invalidate('membership_plan')
+
+
+@receiver([post_save, post_delete], sender=Membership)
+def membership_changed(sender, **kwargs):
+    # პაკეტის members_count საწევროებზეა დამოკიდებული
+    invalidate('membership_plan')
@@ -1,15 +1,41 @@
-from django.test import TestCase
+import base64
+import json
+import threading
+import time as time_module
+from io import StringIO
+from unittest import mock, skipUnless
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.core.management import call_command
+from django.core.cache import cache
 from django.contrib.auth import get_user_model
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
 from django.urls import reverse
 from django.utils import timezone
 from datetime import date, time, timedelta
-from .models import Sport, Training, Enrollment, MembershipPlan, Membership
+from .cache import bump_version, get_versions, invalidate
+from .models import CacheVersion, EnrollmentManager, Sport, Training, TrainingSeries, Enrollment, MembershipPlan, Membership, WeeklyTrainingUsage
 
 User = get_user_model()
 
 
+def give_membership(*users, per_week=5):
+    plan = MembershipPlan.objects.get_or_create(
+        name='Test', defaults={'price': 100, 'duration_days': 30, 'max_trainings_per_week': per_week}
+    )[0]
+    Membership.objects.bulk_create([
+        Membership(
+            user=user,
+            plan=plan,
+            start_date=date.today() - timedelta(days=1),
+            end_date=date.today() + timedelta(days=29)
+        )
+        for user in users
+    ])
+
+
 class SportModelTest(TestCase):
 
     def setUp(self):
@@ -255,3 +281,1163 @@ class SportAPITest(APITestCase):
         data = {'name': 'BJJ', 'description': 'Brazilian Jiu-Jitsu'}
         response = self.client.post(self.list_url, data)
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class EnrollmentAPITest(APITestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.sport = Sport.objects.create(name='MMA')
+        self.coach = User.objects.create_user(
+            username='coach',
+            email='coach@example.com',
+            password='Pass123!',
+            role='coach'
+        )
+        self.member = User.objects.create_user(
+            username='member',
+            email='member@example.com',
+            password='Pass123!'
+        )
+        self.training = Training.objects.create(
+            sport=self.sport,
+            coach=self.coach,
+            title='MMA Basics',
+            date=date.today() + timedelta(days=1),
+            start_time=time(18, 0),
+            duration=90,
+            max_participants=2
+        )
+        give_membership(self.member)
+        self.enroll_url = reverse('sports:training-enroll', kwargs={'training_id': self.training.id})
+        self.cancel_url = reverse('sports:training-cancel', kwargs={'training_id': self.training.id})
+
+    def test_enroll_duplicate(self):
+        self.client.force_authenticate(user=self.member)
+        self.assertEqual(self.client.post(self.enroll_url).status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.client.post(self.enroll_url).status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.training.refresh_from_db()
+        self.assertEqual(self.training.confirmed_count, 1)
+
+    def test_reenroll_after_cancel(self):
+        self.client.force_authenticate(user=self.member)
+
+        first = self.client.post(self.enroll_url)
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.client.post(self.cancel_url).status_code, status.HTTP_200_OK)
+
+        second = self.client.post(self.enroll_url)
+        self.assertEqual(second.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.data['enrollment']['id'], first.data['enrollment']['id'])
+        self.assertEqual(Enrollment.objects.filter(user=self.member, training=self.training).count(), 1)
+
+        self.training.refresh_from_db()
+        self.assertEqual(self.training.confirmed_count, 1)
+
+    def _fill(self):
+        for i in range(self.training.max_participants):
+            user = User.objects.create_user(username=f'seat{i}', password='Pass123!')
+            give_membership(user)
+            Enrollment.objects.enroll(user, self.training)
+
+    def test_full_training_puts_member_on_waitlist(self):
+        self._fill()
+        self.client.force_authenticate(user=self.member)
+
+        response = self.client.post(self.enroll_url)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['enrollment']['status'], 'pending')
+        self.assertEqual(response.data['waitlist_position'], 1)
+
+        self.training.refresh_from_db()
+        self.assertEqual(self.training.confirmed_count, 2)
+
+    def test_cancel_promotes_head_of_waitlist(self):
+        self._fill()
+        second = User.objects.create_user(username='second', password='Pass123!')
+        give_membership(second)
+        first_pending = Enrollment.objects.enroll(self.member, self.training)
+        second_pending = Enrollment.objects.enroll(second, self.training)
+        self.assertEqual(second_pending.waitlist_position, 2)
+
+        self.client.force_authenticate(user=User.objects.get(username='seat0'))
+        # 4 SAVEPOINT + ჩაწერის SELECT/UPDATE + მრიცხველი + რიგის თავი (SELECT და 2 UPDATE) + კვირის მრიცხველი
+        with self.assertNumQueries(11):
+            response = self.client.post(self.cancel_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        first_pending.refresh_from_db()
+        second_pending.refresh_from_db()
+        self.assertEqual(first_pending.status, 'confirmed')
+        self.assertEqual(second_pending.status, 'pending')
+        self.assertEqual(second_pending.waitlist_position, 1)
+
+        self.training.refresh_from_db()
+        self.assertEqual(self.training.confirmed_count, 2)
+
+    def test_completing_does_not_promote_waitlist(self):
+        self._fill()
+        waiting = Enrollment.objects.enroll(self.member, self.training)
+
+        seat = Enrollment.objects.get(user__username='seat0', training=self.training)
+        seat.status = 'completed'
+        seat.save()
+
+        waiting.refresh_from_db()
+        self.assertEqual(waiting.status, 'pending')
+        self.training.refresh_from_db()
+        self.assertEqual(self.training.confirmed_count, 1)
+
+        # თავისუფალი ადგილი რიგს ვერ გაასწრებს
+        newcomer = User.objects.create_user(username='newcomer', password='Pass123!')
+        batch_newcomer = User.objects.create_user(username='batch', password='Pass123!')
+        give_membership(newcomer, batch_newcomer)
+        self.assertEqual(Enrollment.objects.enroll(newcomer, self.training).status, 'pending')
+        [(_, enrollment, _)] = Enrollment.objects.enroll_batch(batch_newcomer, [self.training.id])
+        self.assertEqual(enrollment.status, 'pending')
+
+    def test_capacity_increase_promotes_waitlist(self):
+        self._fill()
+        waiting = Enrollment.objects.enroll(self.member, self.training)
+
+        self.client.force_authenticate(user=self.coach)
+        url = reverse('sports:training-detail', kwargs={'pk': self.training.id})
+        response = self.client.patch(url, {'max_participants': 3}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        waiting.refresh_from_db()
+        self.assertEqual(waiting.status, 'confirmed')
+        self.training.refresh_from_db()
+        self.assertEqual(self.training.confirmed_count, 3)
+
+        newcomer = User.objects.create_user(username='newcomer', password='Pass123!')
+        give_membership(newcomer)
+        self.assertEqual(Enrollment.objects.enroll(newcomer, self.training).status, 'pending')
+
+    def _one_per_week(self):
+        MembershipPlan.objects.filter(name='Test').update(max_trainings_per_week=1)
+        other = Training.objects.create(
+            sport=self.sport, coach=self.coach, title='Morning',
+            date=self.training.date, start_time=time(10, 0), duration=60
+        )
+        self.client.force_authenticate(user=self.member)
+        self.assertEqual(self.client.post(self.enroll_url).status_code, status.HTTP_201_CREATED)
+        return reverse('sports:training-enroll', kwargs={'training_id': other.id})
+
+    def test_deleting_training_releases_weekly_usage(self):
+        other_url = self._one_per_week()
+
+        self.client.force_authenticate(user=self.coach)
+        response = self.client.delete(reverse('sports:training-detail', kwargs={'pk': self.training.id}))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(WeeklyTrainingUsage.objects.get(user=self.member).trainings_count, 0)
+
+        self.client.force_authenticate(user=self.member)
+        self.assertEqual(self.client.post(other_url).status_code, status.HTTP_201_CREATED)
+
+    def test_deactivating_training_cancels_enrollments(self):
+        other_url = self._one_per_week()
+
+        self.client.force_authenticate(user=self.coach)
+        url = reverse('sports:training-detail', kwargs={'pk': self.training.id})
+        self.assertEqual(self.client.patch(url, {'is_active': False}, format='json').status_code, status.HTTP_200_OK)
+        self.assertEqual(Enrollment.objects.get(user=self.member).status, 'cancelled')
+        self.training.refresh_from_db()
+        self.assertEqual(self.training.confirmed_count, 0)
+
+        self.client.force_authenticate(user=self.member)
+        self.assertEqual(self.client.post(other_url).status_code, status.HTTP_201_CREATED)
+
+    def test_enroll_requires_active_membership(self):
+        outsider = User.objects.create_user(username='outsider', password='Pass123!')
+        self.client.force_authenticate(user=outsider)
+        self.assertEqual(self.client.post(self.enroll_url).status_code, status.HTTP_403_FORBIDDEN)
+
+        Membership.objects.create(
+            user=outsider,
+            plan=MembershipPlan.objects.get(name='Test'),
+            start_date=date.today() - timedelta(days=31),
+            end_date=date.today() - timedelta(days=1)
+        )
+        self.assertEqual(self.client.post(self.enroll_url).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_weekly_limit(self):
+        MembershipPlan.objects.filter(name='Test').update(max_trainings_per_week=1)
+        other = Training.objects.create(
+            sport=self.sport,
+            coach=self.coach,
+            title='MMA Sparring',
+            date=self.training.date,
+            start_time=time(20, 0),
+            duration=60,
+            max_participants=10
+        )
+        other_url = reverse('sports:training-enroll', kwargs={'training_id': other.id})
+        self.client.force_authenticate(user=self.member)
+
+        self.assertEqual(self.client.post(self.enroll_url).status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.client.post(other_url).status_code, status.HTTP_400_BAD_REQUEST)
+
+        # გაუქმება ლიმიტს ათავისუფლებს
+        self.assertEqual(self.client.post(self.cancel_url).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.post(other_url).status_code, status.HTTP_201_CREATED)
+
+        usage = WeeklyTrainingUsage.objects.get(user=self.member)
+        self.assertEqual(usage.week_start.weekday(), 0)
+        self.assertEqual(usage.trainings_count, 1)
+
+
+class TrainingCapacityQueryTest(APITestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.sport = Sport.objects.create(name='MMA')
+        self.coach = User.objects.create_user(
+            username='coach',
+            email='coach@example.com',
+            password='Pass123!',
+            role='coach'
+        )
+        self.member = User.objects.create_user(
+            username='member',
+            email='member@example.com',
+            password='Pass123!'
+        )
+        for i in range(5):
+            training = Training.objects.create(
+                sport=self.sport,
+                coach=self.coach,
+                title=f'MMA {i}',
+                date=date.today() + timedelta(days=1),
+                start_time=time(10 + i, 0),
+                duration=60,
+                max_participants=3
+            )
+            Enrollment.objects.create(user=self.member, training=training, status='confirmed')
+
+    def test_with_capacity_annotations(self):
+        training = Training.objects.with_capacity().first()
+        with self.assertNumQueries(0):
+            self.assertEqual(training.enrolled_count, 1)
+            self.assertEqual(training.available_spots, 2)
+            self.assertFalse(training.is_full)
+            self.assertEqual(training.sport.name, 'MMA')
+
+    def test_training_list_constant_queries(self):
+        self.client.force_authenticate(user=self.member)
+        # ქეშის ვერსიები + COUNT პაგინაციისთვის + SELECT + გვერდის ჩაწერები is_enrolled-ისთვის
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('sports:training-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['enrolled_count'], 1)
+        self.assertEqual(response.data['results'][0]['available_spots'], 2)
+        self.assertTrue(all(item['is_enrolled'] for item in response.data['results']))
+
+    def test_my_enrollments_constant_queries(self):
+        self.client.force_authenticate(user=self.member)
+        # ქეშის ვერსიები + 4
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse('sports:my-enrollments'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 5)
+        self.assertTrue(response.data['results'][0]['training']['is_enrolled'])
+
+
+class KeysetPaginationTest(APITestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.sport = Sport.objects.create(name='MMA')
+        self.coach = User.objects.create_user(
+            username='coach',
+            email='coach@example.com',
+            password='Pass123!',
+            role='coach'
+        )
+        self.trainings = [
+            Training.objects.create(
+                sport=self.sport,
+                coach=self.coach,
+                title=f'MMA {i}',
+                date=date.today() + timedelta(days=1 + i // 2),
+                start_time=time(10 + i % 2, 0),
+                duration=60
+            )
+            for i in range(5)
+        ]
+        self.client.force_authenticate(user=self.coach)
+
+    def test_cursor_walks_all_pages_without_count(self):
+        url = reverse('sports:training-list') + '?pagination=cursor&page_size=2'
+        seen = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            seen.extend(item['id'] for item in response.data['results'])
+            url = response.data['next']
+
+        self.assertEqual(seen, [training.id for training in self.trainings])
+
+    def test_invalid_cursor(self):
+        url = reverse('sports:training-list')
+        response = self.client.get(url + '?cursor=broken')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        # სწორი JSON, არასწორი მნიშვნელობები
+        for values in (['nope', '10:00', 1], [{}, 1, 2], [str(date.today()), '10:00', None]):
+            cursor = base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+            response = self.client.get(url, {'cursor': cursor})
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, values)
+
+    def test_page_number_is_default(self):
+        response = self.client.get(reverse('sports:training-list'))
+        self.assertEqual(response.data['count'], 5)
+
+
+class ConfirmedCountTest(TestCase):
+
+    def setUp(self):
+        self.sport = Sport.objects.create(name='MMA')
+        self.coach = User.objects.create_user(
+            username='coach',
+            email='coach@example.com',
+            password='Pass123!',
+            role='coach'
+        )
+        self.member = User.objects.create_user(
+            username='member',
+            email='member@example.com',
+            password='Pass123!'
+        )
+        self.training = Training.objects.create(
+            sport=self.sport,
+            coach=self.coach,
+            title='MMA Basics',
+            date=date.today() + timedelta(days=1),
+            start_time=time(18, 0),
+            duration=90,
+            max_participants=15
+        )
+
+    def test_status_changes_update_counter(self):
+        enrollment = Enrollment.objects.create(user=self.member, training=self.training, status='confirmed')
+        self.training.refresh_from_db()
+        self.assertEqual(self.training.confirmed_count, 1)
+
+        enrollment = Enrollment.objects.get(pk=enrollment.pk)
+        enrollment.status = 'cancelled'
+        enrollment.save()
+        self.training.refresh_from_db()
+        self.assertEqual(self.training.confirmed_count, 0)
+
+        enrollment.status = 'confirmed'
+        enrollment.save()
+        enrollment.delete()
+        self.training.refresh_from_db()
+        self.assertEqual(self.training.confirmed_count, 0)
+
+    def test_reconcile_command(self):
+        Enrollment.objects.create(user=self.member, training=self.training, status='confirmed')
+        Training.objects.filter(pk=self.training.pk).update(confirmed_count=7)
+
+        call_command('reconcile_confirmed_counts', stdout=StringIO())
+
+        self.training.refresh_from_db()
+        self.assertEqual(self.training.confirmed_count, 1)
+
+    def test_weekly_usage_decrement_clamps_and_reconciles(self):
+        Enrollment.objects.create(user=self.member, training=self.training, status='confirmed')
+        WeeklyTrainingUsage.decrement(self.member.pk, self.training.date, 5)
+        usage = WeeklyTrainingUsage.objects.get(user=self.member)
+        self.assertEqual(usage.trainings_count, 0)
+
+        stale_week = WeeklyTrainingUsage.objects.create(
+            user=self.coach, week_start=WeeklyTrainingUsage.week_of(self.training.date), trainings_count=3
+        )
+        call_command('reconcile_weekly_usage', '--batch-size', '1', stdout=StringIO())
+
+        usage.refresh_from_db()
+        stale_week.refresh_from_db()
+        self.assertEqual((usage.trainings_count, stale_week.trainings_count), (1, 0))
+
+
+@skipUnless(connection.vendor == 'postgresql', 'პარალელური ჩაწერის ტესტს PostgreSQL სჭირდება')
+class ConcurrentEnrollmentTest(TransactionTestCase):
+
+    def setUp(self):
+        self.sport = Sport.objects.create(name='MMA')
+        self.coach = User.objects.create_user(
+            username='coach',
+            email='coach@example.com',
+            password='Pass123!',
+            role='coach'
+        )
+        self.training = Training.objects.create(
+            sport=self.sport,
+            coach=self.coach,
+            title='MMA Basics',
+            date=date.today() + timedelta(days=1),
+            start_time=time(18, 0),
+            duration=90,
+            max_participants=20
+        )
+        self.members = [
+            User.objects.create_user(username=f'member{i}', password='Pass123!')
+            for i in range(60)
+        ]
+        give_membership(*self.members)
+
+    def test_parallel_enrollments_never_overbook(self):
+        url = reverse('sports:training-enroll', kwargs={'training_id': self.training.id})
+        barrier = threading.Barrier(len(self.members))
+        results = []
+
+        def enroll(member):
+            client = APIClient()
+            client.force_authenticate(user=member)
+            try:
+                barrier.wait()
+                results.append(client.post(url).status_code)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=enroll, args=(member,)) for member in self.members]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.training.refresh_from_db()
+        self.assertEqual(results.count(status.HTTP_201_CREATED), 60)
+        self.assertEqual(self.training.confirmed_count, 20)
+        self.assertEqual(Enrollment.objects.filter(training=self.training, status='confirmed').count(), 20)
+        self.assertEqual(Enrollment.objects.filter(training=self.training, status='pending').count(), 40)
+
+
+class TrainingSearchTest(APITestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.sport = Sport.objects.create(name='BJJ')
+        self.coach = User.objects.create_user(
+            username='coach',
+            email='coach@example.com',
+            password='Pass123!',
+            role='coach'
+        )
+        for i, title in enumerate(['Guard passing', 'Takedown defense', 'Open mat']):
+            Training.objects.create(
+                sport=self.sport,
+                coach=self.coach,
+                title=title,
+                date=date.today() + timedelta(days=1),
+                start_time=time(10 + i, 0),
+                duration=60
+            )
+        self.client.force_authenticate(user=self.coach)
+
+    def test_search_matches_title(self):
+        response = self.client.get(reverse('sports:training-list') + '?search=guard')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['title'] for item in response.data['results']], ['Guard passing'])
+
+    @skipUnless(connection.vendor == 'postgresql', 'tsvector/pg_trgm მხოლოდ PostgreSQL-ზე')
+    def test_search_is_typo_tolerant_and_ranked(self):
+        response = self.client.get(reverse('sports:training-list') + '?search=takedwn')
+        self.assertEqual(response.data['results'][0]['title'], 'Takedown defense')
+
+
+class CatalogCountsQueryTest(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.admin = User.objects.create_user(
+            username='admin',
+            email='admin@example.com',
+            password='Pass123!',
+            role='admin'
+        )
+        self.plans = [
+            MembershipPlan.objects.create(
+                name=f'Plan {i}',
+                price=100,
+                duration_days=30,
+                max_trainings_per_week=3
+            )
+            for i in range(2)
+        ]
+        for i in range(6):
+            member = User.objects.create_user(username=f'member{i}', password='Pass123!')
+            Membership.objects.create(
+                user=member,
+                plan=self.plans[i % 2],
+                start_date=date.today(),
+                end_date=date.today() + timedelta(days=30),
+                is_active=True
+            )
+        Sport.objects.create(name='MMA')
+        Sport.objects.create(name='BJJ')
+        self.client.force_authenticate(user=self.admin)
+
+    def test_membership_list_constant_queries(self):
+        # COUNT + SELECT (user, plan JOIN) + პაკეტების წევრების GROUP BY
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('sports:membership-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['plan_details']['members_count'], 3)
+
+    def test_plan_and_sport_lists_annotated(self):
+        # ქეშის ვერსიები + COUNT + SELECT
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('sports:plan-list'))
+        self.assertEqual([item['members_count'] for item in response.data['results']], [3, 3])
+
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('sports:sport-list'))
+        self.assertEqual([item['trainings_count'] for item in response.data['results']], [0, 0])
+
+
+class CatalogCacheTest(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.admin = User.objects.create_user(
+            username='admin',
+            email='admin@example.com',
+            password='Pass123!',
+            role='admin'
+        )
+        Sport.objects.create(name='MMA')
+        self.client.force_authenticate(user=self.admin)
+        self.url = reverse('sports:sport-list')
+
+    def test_second_request_is_served_from_cache(self):
+        self.client.get(self.url)
+        # მხოლოდ ვერსიები (ერთი SELECT პირველადი გასაღებით), პასუხი ქეშიდან
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data['count'], 1)
+
+        stats = self.client.get(reverse('sports:cache-stats')).data
+        self.assertEqual(stats['SportListCreateView']['hits'], 1)
+        self.assertEqual(stats['SportListCreateView']['misses'], 1)
+
+    def test_save_invalidates_cache(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            Sport.objects.create(name='BJJ')
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['count'], 2)
+
+    def test_query_params_are_part_of_key(self):
+        Sport.objects.create(name='BJJ')
+        self.client.get(self.url)
+        response = self.client.get(self.url + '?search=BJJ')
+        self.assertEqual(response.data['count'], 1)
+
+
+class ConditionalGetTest(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.sport = Sport.objects.create(name='MMA')
+        self.coach = User.objects.create_user(
+            username='coach',
+            email='coach@example.com',
+            password='Pass123!',
+            role='coach'
+        )
+        self.member = User.objects.create_user(
+            username='member',
+            email='member@example.com',
+            password='Pass123!'
+        )
+        self.training = Training.objects.create(
+            sport=self.sport,
+            coach=self.coach,
+            title='MMA',
+            date=date.today() + timedelta(days=1),
+            start_time=time(10, 0),
+            duration=60,
+            max_participants=5
+        )
+        give_membership(self.member)
+        self.client.force_authenticate(user=self.member)
+        self.url = reverse('sports:training-list')
+
+    def test_matching_etag_returns_304_without_list_queries(self):
+        response = self.client.get(self.url)
+        self.assertIn('Authorization', response['Vary'])
+        etag = response['ETag']
+
+        # მხოლოდ ვერსიები
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_enrollment_changes_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Enrollment.objects.enroll(self.member, self.training)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_is_per_user(self):
+        etag = self.client.get(self.url)['ETag']
+        self.client.force_authenticate(user=self.coach)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def set_version(self, seconds_ago):
+        for scope in ('training', 'enrollment', 'sport'):
+            CacheVersion.objects.update_or_create(
+                scope=scope, defaults={'version': int((time_module.time() - seconds_ago) * 1_000_000)}
+            )
+
+    def test_if_modified_since(self):
+        self.set_version(10)
+        last_modified = self.client.get(self.url)['Last-Modified']
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # ცვლილება ახლა: Last-Modified ზემოთ მრგვალდება, ძველი If-Modified-Since 304-ს აღარ აძლევს
+        self.set_version(0)
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_no_last_modified_within_current_second(self):
+        self.set_version(-0.5)
+        response = self.client.get(self.url)
+        self.assertNotIn('Last-Modified', response)
+        self.assertIn('ETag', response)
+
+
+class TrainingOverlapTest(APITestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.sport = Sport.objects.create(name='MMA')
+        self.coach = User.objects.create_user(
+            username='coach',
+            email='coach@example.com',
+            password='Pass123!',
+            role='coach'
+        )
+        self.day = date.today() + timedelta(days=1)
+        self.training = Training.objects.create(
+            sport=self.sport,
+            coach=self.coach,
+            title='MMA Basics',
+            date=self.day,
+            start_time=time(18, 0),
+            duration=90
+        )
+        self.client.force_authenticate(user=self.coach)
+
+    def payload(self, start_time, duration=60):
+        return {
+            'sport': self.sport.id,
+            'coach': self.coach.id,
+            'title': 'Sparring',
+            'date': str(self.day),
+            'start_time': start_time,
+            'duration': duration
+        }
+
+    def test_time_range_is_derived(self):
+        self.assertEqual(self.training.ends_at - self.training.starts_at, timedelta(minutes=90))
+        self.assertEqual(timezone.localtime(self.training.starts_at).time(), time(18, 0))
+
+    def test_overlapping_create_rejected(self):
+        url = reverse('sports:training-list')
+        response = self.client.post(url, self.payload('18:30'), format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(url, self.payload('19:30'), format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_overlapping_update_rejected(self):
+        later = Training.objects.create(
+            sport=self.sport,
+            coach=self.coach,
+            title='Sparring',
+            date=self.day,
+            start_time=time(20, 0),
+            duration=60
+        )
+        url = reverse('sports:training-detail', kwargs={'pk': later.id})
+
+        response = self.client.patch(url, {'start_time': '19:00'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # საკუთარ თავთან გადაფარვა არ ითვლება
+        response = self.client.patch(url, {'duration': 90}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        later.refresh_from_db()
+        self.assertEqual(later.ends_at - later.starts_at, timedelta(minutes=90))
+
+
+class TrainingSeriesTest(APITestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.sport = Sport.objects.create(name='MMA')
+        self.coach = User.objects.create_user(
+            username='coach',
+            email='coach@example.com',
+            password='Pass123!',
+            role='coach'
+        )
+        self.client.force_authenticate(user=self.coach)
+        # ორშაბათიდან 26 კვირა
+        self.monday = date.today() + timedelta(days=7 - date.today().weekday())
+        self.payload = {
+            'sport': self.sport.id,
+            'title': 'MMA Basics',
+            'start_time': '18:00',
+            'duration': 90,
+            'max_participants': 10,
+            'weekdays': [0, 2],
+            'start_date': str(self.monday),
+            'end_date': str(self.monday + timedelta(weeks=26, days=-1)),
+            'exceptions': [str(self.monday + timedelta(weeks=1))]
+        }
+
+    def create_series(self):
+        response = self.client.post(reverse('sports:series-list'), self.payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return TrainingSeries.objects.get(pk=response.data['id'])
+
+    def test_create_materializes_occurrences_in_few_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('sports:series-list'), self.payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['trainings_count'], 51)
+        self.assertLessEqual(len(queries), 10)
+
+        trainings = Training.objects.filter(series_id=response.data['id'])
+        self.assertEqual(trainings.count(), 51)
+        self.assertFalse(trainings.filter(date=self.monday + timedelta(weeks=1)).exists())
+        self.assertEqual(set(trainings.values_list('coach', flat=True)), {self.coach.id})
+
+    def test_conflicting_series_is_rejected(self):
+        Training.objects.create(
+            sport=self.sport,
+            coach=self.coach,
+            title='Private',
+            date=self.monday + timedelta(weeks=3),
+            start_time=time(19, 0),
+            duration=60
+        )
+        response = self.client.post(reverse('sports:series-list'), self.payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['conflicts'], [str(self.monday + timedelta(weeks=3))])
+        self.assertFalse(TrainingSeries.objects.exists())
+
+    def test_edit_this_and_following(self):
+        series = self.create_series()
+        from_date = self.monday + timedelta(weeks=10)
+        url = reverse('sports:series-edit-following', kwargs={'pk': series.id})
+
+        response = self.client.post(url, {
+            'from_date': str(from_date), 'title': 'MMA Advanced', 'start_time': '19:00'
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        following = series.trainings.filter(date__gte=from_date)
+        self.assertEqual(response.data['updated'], following.count())
+        self.assertEqual(set(following.values_list('title', flat=True)), {'MMA Advanced'})
+        training = following.first()
+        self.assertEqual(training.start_time, time(19, 0))
+        self.assertEqual(timezone.localtime(training.starts_at).time(), time(19, 0))
+        self.assertFalse(series.trainings.filter(date__lt=from_date, title='MMA Advanced').exists())
+
+    def test_cancel_this_and_following(self):
+        series = self.create_series()
+        from_date = self.monday + timedelta(weeks=20)
+        url = reverse('sports:series-cancel-following', kwargs={'pk': series.id})
+
+        response = self.client.post(url, {'from_date': str(from_date)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(series.trainings.filter(date__gte=from_date, is_active=True).exists())
+        self.assertTrue(series.trainings.filter(date__lt=from_date, is_active=True).exists())
+
+        series.refresh_from_db()
+        self.assertEqual(series.end_date, from_date - timedelta(days=1))
+
+    def test_cancelled_slots_can_be_reused(self):
+        series = self.create_series()
+        series.cancel_following(self.monday)
+
+        self.create_series()
+        self.assertEqual(Training.objects.filter(is_active=True).count(), 51)
+
+        Training.objects.filter(is_active=True, date=self.monday).update(is_active=False)
+        response = self.client.post(reverse('sports:training-list'), {
+            'sport': self.sport.id, 'coach': self.coach.id, 'title': 'Single', 'date': str(self.monday),
+            'start_time': '18:00', 'duration': 60, 'max_participants': 10
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+
+    def test_cancel_following_cancels_enrollments(self):
+        series = self.create_series()
+        from_date = self.monday + timedelta(weeks=20)
+        kept, cancelled = series.trainings.get(date=from_date - timedelta(days=5)), series.trainings.get(date=from_date)
+        member = User.objects.create_user(username='member', password='Pass123!')
+        waiting = User.objects.create_user(username='waiting', password='Pass123!')
+        for training in (kept, cancelled):
+            Enrollment.objects.create(user=member, training=training, status='confirmed')
+        Enrollment.objects.create(user=waiting, training=cancelled, status='pending')
+
+        series.cancel_following(from_date)
+
+        cancelled.refresh_from_db()
+        kept.refresh_from_db()
+        self.assertEqual(cancelled.confirmed_count, 0)
+        self.assertEqual(kept.confirmed_count, 1)
+        self.assertEqual(
+            set(Enrollment.objects.filter(training=cancelled).values_list('status', flat=True)), {'cancelled'}
+        )
+        self.assertEqual(Enrollment.objects.get(training=kept).status, 'confirmed')
+        usage = dict(WeeklyTrainingUsage.objects.filter(user=member).values_list('week_start', 'trainings_count'))
+        self.assertEqual(usage, {
+            WeeklyTrainingUsage.week_of(kept.date): 1, WeeklyTrainingUsage.week_of(cancelled.date): 0
+        })
+        self.assertEqual(WeeklyTrainingUsage.objects.get(user=waiting).trainings_count, 0)
+
+
+class BatchEnrollmentTest(APITestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.sport = Sport.objects.create(name='MMA')
+        self.coach = User.objects.create_user(
+            username='coach',
+            email='coach@example.com',
+            password='Pass123!',
+            role='coach'
+        )
+        self.member = User.objects.create_user(
+            username='member',
+            email='member@example.com',
+            password='Pass123!'
+        )
+        give_membership(self.member, per_week=3)
+        monday = date.today() + timedelta(days=7 - date.today().weekday())
+        self.trainings = [
+            Training.objects.create(
+                sport=self.sport,
+                coach=self.coach,
+                title=f'MMA {i}',
+                date=monday + timedelta(days=i),
+                start_time=time(18, 0),
+                duration=60,
+                max_participants=1 if i == 3 else 10
+            )
+            for i in range(5)
+        ]
+        self.url = reverse('sports:enrollment-batch')
+        self.client.force_authenticate(user=self.member)
+
+    def ids(self, *indexes):
+        return [self.trainings[i].id for i in indexes]
+
+    def test_best_effort_returns_per_item_results(self):
+        Enrollment.objects.create(user=self.member, training=self.trainings[0], status='confirmed')
+
+        response = self.client.post(self.url, {'trainings': self.ids(0, 1, 2) + [999]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        results = {item['training']: item for item in response.data['results']}
+        self.assertEqual(results[self.trainings[0].id]['error'], 'თქვენ უკვე ჩაწერილი ხართ')
+        self.assertEqual(results[self.trainings[1].id]['status'], 'confirmed')
+        self.assertEqual(results[self.trainings[2].id]['status'], 'confirmed')
+        self.assertEqual(results[999]['error'], 'ვარჯიში არ მოიძებნა')
+
+        self.trainings[1].refresh_from_db()
+        self.assertEqual(self.trainings[1].confirmed_count, 1)
+        self.assertEqual(WeeklyTrainingUsage.objects.get(user=self.member).trainings_count, 3)
+
+    def test_weekly_limit_and_waitlist(self):
+        other = User.objects.create_user(username='other', password='Pass123!')
+        give_membership(other)
+        Enrollment.objects.enroll(other, self.trainings[3])
+
+        response = self.client.post(self.url, {'trainings': self.ids(3, 1, 2, 4)}, format='json')
+        statuses = [item['status'] for item in response.data['results']]
+        self.assertEqual(statuses, ['pending', 'confirmed', 'confirmed', None])
+        self.assertEqual(response.data['results'][3]['error'], 'კვირის ვარჯიშების ლიმიტი ამოწურულია')
+
+    def test_all_or_nothing(self):
+        Enrollment.objects.create(user=self.member, training=self.trainings[0], status='confirmed')
+
+        response = self.client.post(
+            self.url, {'trainings': self.ids(1, 0), 'all_or_nothing': True}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Enrollment.objects.filter(training=self.trainings[1]).exists())
+
+        response = self.client.post(
+            self.url, {'trainings': self.ids(1, 2), 'all_or_nothing': True}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_concurrent_single_enroll_is_reported(self):
+        reserve_seats = EnrollmentManager._reserve_seats
+
+        def enroll_concurrently(manager, training_ids):
+            # ჩაწერა სხვა მოთხოვნიდან: existing-ის წაკითხვის შემდეგ, INSERT-მდე
+            Enrollment.objects.enroll(self.member, self.trainings[1])
+            return reserve_seats(manager, training_ids)
+
+        with mock.patch.object(EnrollmentManager, '_reserve_seats', autospec=True, side_effect=enroll_concurrently):
+            response = self.client.post(self.url, {'trainings': self.ids(1, 2)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        results = {item['training']: item for item in response.data['results']}
+        self.assertEqual(results[self.trainings[1].id]['error'], 'თქვენ უკვე ჩაწერილი ხართ')
+        self.assertEqual(results[self.trainings[2].id]['status'], 'confirmed')
+
+        self.trainings[1].refresh_from_db()
+        self.assertEqual(self.trainings[1].confirmed_count, 1)
+        self.assertEqual(WeeklyTrainingUsage.objects.get(user=self.member).trainings_count, 2)
+
+    def test_constant_queries(self):
+        with CaptureQueriesContext(connection) as few:
+            self.client.post(self.url, {'trainings': self.ids(0)}, format='json')
+        Enrollment.objects.all().delete()
+        WeeklyTrainingUsage.objects.all().delete()
+        with CaptureQueriesContext(connection) as many:
+            self.client.post(self.url, {'trainings': self.ids(0, 1, 2)}, format='json')
+        self.assertEqual(len(few), len(many))
+
+
+class AttendanceTest(APITestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.sport = Sport.objects.create(name='MMA')
+        self.coach = User.objects.create_user(
+            username='coach',
+            email='coach@example.com',
+            password='Pass123!',
+            role='coach'
+        )
+        self.training = Training.objects.create(
+            sport=self.sport,
+            coach=self.coach,
+            title='MMA Basics',
+            date=date.today(),
+            start_time=time(10, 0),
+            duration=60,
+            max_participants=50
+        )
+        self.members = User.objects.bulk_create([
+            User(username=f'member{i}', password='!') for i in range(50)
+        ])
+        Enrollment.objects.bulk_create([
+            Enrollment(user=member, training=self.training, status='confirmed') for member in self.members
+        ])
+        Training.objects.filter(pk=self.training.pk).update(confirmed_count=50)
+        self.url = reverse('sports:training-attendance', kwargs={'training_id': self.training.id})
+
+    def test_marks_roster_in_constant_queries(self):
+        self.client.force_authenticate(user=self.coach)
+        attended = [member.id for member in self.members[:30]]
+
+        waiting = User.objects.create_user(username='waiting', password='Pass123!')
+        Enrollment.objects.create(user=waiting, training=self.training, status='pending')
+
+        # ვარჯიში + 2 SAVEPOINT + 2 UPDATE + რიგი (ჯგუფები, კვირის მრიცხველი, UPDATE) + ვარჯიში + სია
+        with self.assertNumQueries(10):
+            response = self.client.post(self.url, {'attended': attended}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['roster']), 50)
+
+        enrollments = Enrollment.objects.filter(training=self.training)
+        self.assertEqual(enrollments.filter(status='completed', attended=True).count(), 30)
+        self.assertEqual(enrollments.filter(status='completed', attended=False).count(), 20)
+        self.training.refresh_from_db()
+        self.assertEqual(self.training.confirmed_count, 0)
+        self.assertFalse(self.training.is_active)
+        self.assertEqual(Enrollment.objects.get(user=waiting).status, 'cancelled')
+        self.assertEqual(WeeklyTrainingUsage.objects.get(user=waiting).trainings_count, 0)
+
+    def test_only_training_coach(self):
+        other = User.objects.create_user(username='other', password='Pass123!', role='coach')
+        self.client.force_authenticate(user=other)
+        response = self.client.post(self.url, {'attended': []}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class SweepMembershipsTest(TestCase):
+
+    def setUp(self):
+        self.plan = MembershipPlan.objects.create(
+            name='Bronze', price=100, duration_days=30, max_trainings_per_week=3
+        )
+        self.today = date.today()
+        self.expired = User.objects.create_user(username='expired', password='Pass123!')
+        self.renewing = User.objects.create_user(username='renewing', password='Pass123!')
+        self.valid = User.objects.create_user(username='valid', password='Pass123!')
+        self.never = User.objects.create_user(username='never', password='Pass123!')
+
+        for user, auto_renew in ((self.expired, False), (self.renewing, True)):
+            Membership.objects.create(
+                user=user, plan=self.plan, auto_renew=auto_renew,
+                start_date=self.today - timedelta(days=31),
+                end_date=self.today - timedelta(days=1)
+            )
+        Membership.objects.create(
+            user=self.valid, plan=self.plan,
+            start_date=self.today - timedelta(days=1),
+            end_date=self.today + timedelta(days=29)
+        )
+
+    def sweep(self):
+        call_command('sweep_memberships', '--chunk-size', '1', stdout=StringIO())
+
+    def test_expires_renews_and_syncs_users(self):
+        self.sweep()
+
+        self.assertFalse(Membership.objects.filter(end_date__lt=self.today, is_active=True).exists())
+        renewal = Membership.objects.get(user=self.renewing, is_active=True)
+        self.assertEqual(renewal.start_date, self.today)
+        self.assertTrue(renewal.auto_renew)
+
+        flags = dict(User.objects.values_list('username', 'is_active_member'))
+        self.assertEqual(flags, {'expired': False, 'renewing': True, 'valid': True, 'never': False})
+
+    def test_long_lapsed_renewal_starts_today(self):
+        Membership.objects.filter(user=self.renewing).update(
+            start_date=self.today - timedelta(days=100), end_date=self.today - timedelta(days=70)
+        )
+        self.sweep()
+
+        renewal = Membership.objects.get(user=self.renewing, is_active=True)
+        self.assertEqual((renewal.start_date, renewal.end_date), (self.today, self.today + timedelta(days=30)))
+        self.assertTrue(User.objects.get(pk=self.renewing.pk).is_active_member)
+
+    def test_idempotent(self):
+        self.sweep()
+        self.sweep()
+        self.assertEqual(Membership.objects.filter(user=self.renewing).count(), 2)
+        self.assertEqual(Membership.objects.filter(is_active=True).count(), 2)
+
+
+class CompletePastTrainingsTest(TestCase):
+
+    def setUp(self):
+        self.sport = Sport.objects.create(name='MMA')
+        self.coach = User.objects.create_user(username='coach', password='Pass123!', role='coach')
+        self.member = User.objects.create_user(username='member', password='Pass123!')
+        self.waiting = User.objects.create_user(username='waiting', password='Pass123!')
+        self.past = Training.objects.create(
+            sport=self.sport, coach=self.coach, title='Past',
+            date=date.today() - timedelta(days=1), start_time=time(10, 0), duration=60,
+            max_participants=1
+        )
+        self.future = Training.objects.create(
+            sport=self.sport, coach=self.coach, title='Future',
+            date=date.today() + timedelta(days=1), start_time=time(10, 0), duration=60
+        )
+        for training in (self.past, self.future):
+            Enrollment.objects.create(user=self.member, training=training, status='confirmed')
+        Enrollment.objects.create(user=self.waiting, training=self.past, status='pending')
+
+    def test_closes_only_ended_trainings(self):
+        call_command('complete_past_trainings', '--batch-size', '1', stdout=StringIO())
+
+        self.past.refresh_from_db()
+        self.future.refresh_from_db()
+        self.assertFalse(self.past.is_active)
+        self.assertEqual(self.past.confirmed_count, 0)
+        self.assertTrue(self.future.is_active)
+        self.assertEqual(self.future.confirmed_count, 1)
+
+        statuses = dict(Enrollment.objects.filter(training=self.past).values_list('user__username', 'status'))
+        self.assertEqual(statuses, {'member': 'completed', 'waiting': 'cancelled'})
+        self.assertEqual(Enrollment.objects.get(training=self.future).status, 'confirmed')
+        self.assertEqual(
+            WeeklyTrainingUsage.objects.get(user=self.waiting).trainings_count, 0
+        )
+
+
+class ExportTest(APITestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_user(username='admin', password='Pass123!', role='admin')
+        self.coach = User.objects.create_user(username='coach', password='Pass123!', role='coach')
+        self.other_coach = User.objects.create_user(username='other', password='Pass123!', role='coach')
+        self.members = User.objects.bulk_create([
+            User(username=f'member{i}', password='!', first_name='გიორგი') for i in range(3)
+        ])
+        give_membership(*self.members)
+        sport = Sport.objects.create(name='MMA')
+        for coach in (self.coach, self.other_coach):
+            training = Training.objects.create(
+                sport=sport, coach=coach, title=f'{coach.username} training',
+                date=date.today() + timedelta(days=1), start_time=time(10, 0), duration=60
+            )
+            Enrollment.objects.bulk_create([
+                Enrollment(user=member, training=training, status='confirmed') for member in self.members
+            ])
+
+    def read(self, response):
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_membership_csv_honors_filters(self):
+        Membership.objects.filter(user=self.members[0]).update(is_active=False)
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get(reverse('sports:membership-export'), {'is_active': 'true'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment', response['Content-Disposition'])
+        lines = self.read(response).lstrip('\ufeff').splitlines()
+        self.assertTrue(lines[0].startswith('id,username,email,plan'))
+        self.assertEqual(len(lines), 3)
+
+    def test_coach_exports_only_own_enrollments_as_ndjson(self):
+        self.client.force_authenticate(user=self.coach)
+        response = self.client.get(reverse('sports:enrollment-export'), {'export_format': 'ndjson'})
+
+        rows = [json.loads(line) for line in self.read(response).splitlines()]
+        self.assertEqual(len(rows), 3)
+        self.assertEqual({row['training'] for row in rows}, {'coach training'})
+        self.assertEqual(rows[0]['first_name'], 'გიორგი')
+
+    def test_user_export_admin_only(self):
+        self.client.force_authenticate(user=self.coach)
+        self.assertEqual(
+            self.client.get(reverse('users:user-export')).status_code, status.HTTP_403_FORBIDDEN
+        )
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get(reverse('users:user-export'), {'role': 'coach'})
+        self.assertEqual(len(self.read(response).splitlines()), 3)
+
+
+class CacheVersionTest(TestCase):
+
+    def test_versions_are_shared_through_the_database(self):
+        # სხვა პროცესის (worker, cron) ინვალიდაცია ბაზიდან ჩანს, ქეშის გასუფთავების შემდეგაც
+        before, = get_versions('sport')
+        bump_version('sport')
+        cache.clear()
+        after, = get_versions('sport')
+        self.assertGreater(after, before)
+
+    def test_invalidate_waits_for_commit(self):
+        before, = get_versions('sport')
+        with self.captureOnCommitCallbacks() as callbacks:
+            invalidate('sport')
+            self.assertEqual(get_versions('sport'), [before])
+        callbacks[0]()
+        self.assertGreater(get_versions('sport')[0], before)
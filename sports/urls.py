@@ -9,18 +9,29 @@ from .views import (
     TrainingDetailView,
     UpcomingTrainingsView,
     MyTrainingsView,
+    TrainingSeriesListCreateView,
+    TrainingSeriesDetailView,
+    TrainingSeriesEditFollowingView,
+    TrainingSeriesCancelFollowingView,
 
     #Enrollment Views
     TrainingEnrollView,
     TrainingCancelEnrollmentView,
     MyEnrollmentsView,
+    BatchEnrollView,
     TrainingEnrollmentsView,
+    TrainingAttendanceView,
+    EnrollmentExportView,
 
     #Membership Views
     MembershipPlanListCreateView,
     MembershipPlanDetailView,
     MembershipListCreateView,
     MyMembershipView,
+    MembershipExportView,
+
+    #Cache
+    CacheStatsView,
 )
 app_name = 'sports'
 
@@ -38,9 +49,20 @@ urlpatterns = [
     path('trainings/<int:training_id>/cancel-enrollment/', TrainingCancelEnrollmentView.as_view(),
          name='training-cancel'),
     path('trainings/<int:training_id>/enrollments/', TrainingEnrollmentsView.as_view(), name='training-enrollments'),
+    path('trainings/<int:training_id>/attendance/', TrainingAttendanceView.as_view(), name='training-attendance'),
+
+    #Training series
+    path('training-series/', TrainingSeriesListCreateView.as_view(), name='series-list'),
+    path('training-series/<int:pk>/', TrainingSeriesDetailView.as_view(), name='series-detail'),
+    path('training-series/<int:pk>/edit-following/', TrainingSeriesEditFollowingView.as_view(),
+         name='series-edit-following'),
+    path('training-series/<int:pk>/cancel-following/', TrainingSeriesCancelFollowingView.as_view(),
+         name='series-cancel-following'),
 
     #Enrollments
     path('enrollments/my-enrollments/', MyEnrollmentsView.as_view(), name='my-enrollments'),
+    path('enrollments/batch/', BatchEnrollView.as_view(), name='enrollment-batch'),
+    path('enrollments/export/', EnrollmentExportView.as_view(), name='enrollment-export'),
 
     #Membership plans
     path('membership-plans/', MembershipPlanListCreateView.as_view(), name='plan-list'),
@@ -49,4 +71,8 @@ urlpatterns = [
     #Membership
     path('memberships/', MembershipListCreateView.as_view(), name='membership-list'),
     path('memberships/my-membership/', MyMembershipView.as_view(), name='my-membership'),
+    path('memberships/export/', MembershipExportView.as_view(), name='membership-export'),
+
+    #Cache
+    path('cache-stats/', CacheStatsView.as_view(), name='cache-stats'),
 ]
\ No newline at end of file
@@ -1,31 +1,79 @@
-from rest_framework import generics, status, filters
+from rest_framework import generics, status, filters, serializers
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 from django.utils import timezone
-from .models import Sport, Training, Enrollment, MembershipPlan, Membership
+from django.db import IntegrityError, transaction
+from django.db.models import Prefetch, Count
+from .models import (
+    Sport,
+    Training,
+    TrainingSeries,
+    ScheduleConflict,
+    Enrollment,
+    MembershipPlan,
+    Membership,
+    AlreadyEnrolled,
+    NoActiveMembership,
+    WeeklyLimitReached,
+    BatchEnrollmentFailed
+)
 from .serializers import (
     SportSerializer,
     TrainingSerializer,
     TrainingListSerializer,
+    TrainingSeriesSerializer,
+    TrainingSeriesFollowingSerializer,
+    schedule_conflict_error,
     EnrollmentSerializer,
+    BatchEnrollmentSerializer,
+    AttendanceSerializer,
     MyEnrollmentSerializer,
     MembershipPlanSerializer,
     MembershipSerializer
 )
+from .pagination import KeysetOrPageNumberPagination
+from .cache import CachedResponseMixin, ConditionalGetMixin, get_stats
 from users.permissions import IsAdmin, IsAdminOrCoach
+from users.filters import FullTextSearchFilter
+from users.exports import ExportMixin
+
+
+class EnrolledTrainingsMixin:
+    """is_enrolled-ისთვის მომხმარებლის ჩაწერები ერთი query-ით, მხოლოდ გვერდის ვარჯიშებზე"""
+
+    def get_page_training_ids(self, objects):
+        return [obj.pk for obj in objects]
+
+    def get_serializer(self, *args, **kwargs):
+        if kwargs.get('many') and args and self.request.user.is_authenticated:
+            objects = list(args[0])
+            args = (objects,) + args[1:]
+            context = kwargs.setdefault('context', self.get_serializer_context())
+            context['enrolled_training_ids'] = set(
+                Enrollment.objects.filter(
+                    user=self.request.user,
+                    status='confirmed',
+                    training_id__in=self.get_page_training_ids(objects)
+                ).values_list('training_id', flat=True)
+            )
+        return super().get_serializer(*args, **kwargs)
 
 
-class SportListCreateView(generics.ListCreateAPIView):
+class SportListCreateView(ConditionalGetMixin, CachedResponseMixin, generics.ListCreateAPIView):
     """
     GET /api/sports/ - ყველა სპორტი
     POST /api/sports/ - ახალი სპორტის დამატბა
     """
-    queryset = Sport.objects.filter(is_active=True)
+    queryset = Sport.objects.filter(is_active=True).with_trainings_count()
     serializer_class = SportSerializer
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    cache_scopes = ('sport',)
+    etag_scopes = ('sport',)
+    filter_backends = [filters.OrderingFilter, FullTextSearchFilter]
     search_fields = ['name', 'description']
+    search_vector_field = 'search_vector'
+    search_trigram_fields = ['name']
     ordering_fields = ['name', 'created_at']
 
     def get_permissions(self):
@@ -34,14 +82,15 @@ class SportListCreateView(generics.ListCreateAPIView):
         return [IsAuthenticated()]
 
 
-class SportDetailView(generics.RetrieveUpdateDestroyAPIView):
+class SportDetailView(CachedResponseMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     GET /api/sports/{id}/ - კონკრეტული სპორტი
     PUT /api/sports/{id}/ - განახლება (Admin)
     DELETE /api/sports/{id}/ - წაშლა (admin)
     """
-    queryset = Sport.objects.all()
+    queryset = Sport.objects.with_trainings_count()
     serializer_class = SportSerializer
+    cache_scopes = ('sport',)
 
     def get_permissions(self):
         if self.request.method == 'GET':
@@ -49,17 +98,23 @@ class SportDetailView(generics.RetrieveUpdateDestroyAPIView):
         return [IsAdmin()]
 
 
-class TrainingListCreateView(generics.ListCreateAPIView):
+class TrainingListCreateView(ConditionalGetMixin, EnrolledTrainingsMixin, generics.ListCreateAPIView):
     """
     GET /api/trainings/ - ყველა ვარჯიში
     POST /api/trainings/ - ახალი ვარჯიშის შექმნა (Admin/Coach)
     """
-    queryset = Training.objects.filter(is_active=True)
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    queryset = Training.objects.filter(is_active=True).with_capacity()
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, FullTextSearchFilter]
     filterset_fields = ['sport', 'coach', 'difficulty', 'date']
     search_fields = ['title', 'description']
+    search_vector_field = 'search_vector'
+    # სპორტის სახელი search_vector-შია ('B' წონით) - JOIN-ის OR GIN ინდექსების გაერთიანებას ხელს უშლის
+    search_trigram_fields = ['title']
     ordering_fields = ['date', 'start_time', 'created_at']
     ordering = ['date', 'start_time']
+    pagination_class = KeysetOrPageNumberPagination
+    cursor_ordering = ('date', 'start_time', 'id')
+    etag_scopes = ('training', 'enrollment', 'sport')
 
     def get_serializer_class(self):
         if self.request.method == 'GET':
@@ -81,28 +136,38 @@ class TrainingDetailView(generics.RetrieveUpdateDestroyAPIView):
     PUT /api/trainings/{id}/ - განახლება (Admin/coach)
     DELETE /api/trainings/{id}/ -წაშლა (Admin/Coach)
     """
-    queryset = Training.objects.all()
     serializer_class = TrainingSerializer
 
+    def get_queryset(self):
+        # განახლების შემდეგ ანოტაციები ძველი დარჩებოდა, ამიტომ მხოლოდ GET-ზე
+        if self.request.method == 'GET':
+            return Training.objects.with_capacity()
+        return Training.objects.all()
+
     def get_permissions(self):
         if self.request.method == 'GET':
             return [IsAuthenticated()]
         return [IsAdminOrCoach()]
 
 
-class UpcomingTrainingsView(generics.ListAPIView):
+class UpcomingTrainingsView(ConditionalGetMixin, EnrolledTrainingsMixin, generics.ListAPIView):
     """GET /api/trainings/upcoming/ - მომავალი ვარჯიშები"""
     serializer_class = TrainingListSerializer
     permission_classes = [IsAuthenticated]
+    etag_scopes = ('training', 'enrollment', 'sport')
+
+    def get_etag_extra(self, request):
+        # სია დღის ცვლილებასთან ერთად იცვლება
+        return str(timezone.now().date())
 
     def get_queryset(self):
         return Training.objects.filter(
             is_active=True,
             date__gte=timezone.now().date()
-        ).order_by('date', 'start_time')
+        ).with_capacity().order_by('date', 'start_time')
 
 
-class MyTrainingsView(generics.ListAPIView):
+class MyTrainingsView(EnrolledTrainingsMixin, generics.ListAPIView):
     """GET /api/trainings/my-trainings/ - ჩემი ვარჯიშები (როცა coach ვარ)"""
     serializer_class = TrainingListSerializer
     permission_classes = [IsAdminOrCoach]
@@ -111,11 +176,75 @@ class MyTrainingsView(generics.ListAPIView):
         return Training.objects.filter(
             coach=self.request.user,
             is_active=True
-        ).order_by('-date', '-start_time')
+        ).with_capacity().order_by('-date', '-start_time')
 
 
 #Enrollment views
 
+class TrainingSeriesQuerysetMixin:
+    """მწვრთნელს მხოლოდ საკუთარი სერიები, ადმინს - ყველა"""
+    serializer_class = TrainingSeriesSerializer
+    permission_classes = [IsAdminOrCoach]
+
+    def get_queryset(self):
+        queryset = TrainingSeries.objects.select_related('sport', 'coach').with_trainings_count()
+        if not self.request.user.is_admin:
+            queryset = queryset.filter(coach=self.request.user)
+        return queryset
+
+
+class TrainingSeriesListCreateView(TrainingSeriesQuerysetMixin, generics.ListCreateAPIView):
+    """
+    GET /api/training-series/ - სერიები
+    POST /api/training-series/ - სერიის შექმნა და ვარჯიშების გენერაცია (Admin/Coach)
+    """
+
+    def perform_create(self, serializer):
+        serializer.save(coach=self.request.user)
+
+
+class TrainingSeriesDetailView(TrainingSeriesQuerysetMixin, generics.RetrieveAPIView):
+    """GET /api/training-series/{id}/ - კონკრეტული სერია"""
+
+
+class TrainingSeriesEditFollowingView(TrainingSeriesQuerysetMixin, generics.GenericAPIView):
+    """POST /api/training-series/{id}/edit-following/ - from_date-დან ვარჯიშების ცვლილება"""
+    serializer_class = TrainingSeriesFollowingSerializer
+
+    def post(self, request, pk):
+        series = self.get_object()
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        changes = dict(serializer.validated_data)
+        from_date = changes.pop('from_date')
+
+        try:
+            updated = series.update_following(from_date, **changes)
+        except ScheduleConflict as error:
+            raise schedule_conflict_error(error)
+        except IntegrityError:
+            raise serializers.ValidationError(TrainingSerializer.COACH_BUSY_MESSAGE)
+
+        return Response({
+            'message': 'ვარჯიშები განახლდა',
+            'updated': updated
+        }, status=status.HTTP_200_OK)
+
+
+class TrainingSeriesCancelFollowingView(TrainingSeriesQuerysetMixin, generics.GenericAPIView):
+    """POST /api/training-series/{id}/cancel-following/ - from_date-დან ვარჯიშების გაუქმება"""
+
+    def post(self, request, pk):
+        series = self.get_object()
+        from_date = serializers.DateField().run_validation(request.data.get('from_date'))
+        cancelled = series.cancel_following(from_date)
+
+        return Response({
+            'message': 'ვარჯიშები გაუქმდა',
+            'cancelled': cancelled
+        }, status=status.HTTP_200_OK)
+
+
 class TrainingEnrollView(APIView):
     """POST /api/trainings/training_id/enroll/ -ვარჯიშზე ჩაწერა"""
     permission_classes = [IsAuthenticated]
@@ -129,78 +258,144 @@ class TrainingEnrollView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        # სავსე არის თუ არა
-        if training.is_full:
+        # ადგილის დაჯავშნა და ჩაწერა ერთ ტრანზაქციაში, სავსე ვარჯიშზე - მოლოდინის რიგი
+        try:
+            enrollment = Enrollment.objects.enroll(request.user, training)
+        except AlreadyEnrolled:
             return Response(
-                {'error': 'ვარჯიში სავსეა'},
+                {'error': 'თქვენ უკვე ჩაწერილი ხართ'},
                 status=status.HTTP_400_BAD_REQUEST
             )
-
-        # უკვე ჩაწერილია თუ არა
-        if Enrollment.objects.filter(
-                user=request.user,
-                training=training,
-                status__in=['confirmed', 'pending']
-        ).exists():
+        except NoActiveMembership:
             return Response(
-                {'error': 'თქვენ უკვე ჩაწერილი ხართ'},
+                {'error': 'აქტიური საწევრო არ გაქვთ'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        except WeeklyLimitReached:
+            return Response(
+                {'error': 'კვირის ვარჯიშების ლიმიტი ამოწურულია'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        #ჩაწერის შექმნა
-        enrollment = Enrollment.objects.create(
-            user=request.user,
-            training=training,
-            status='confirmed'
-        )
-
         serializer = EnrollmentSerializer(enrollment)
+        if enrollment.status == 'pending':
+            return Response({
+                'message': 'ვარჯიში სავსეა, ჩაიწერეთ მოლოდინის რიგში',
+                'waitlist_position': enrollment.waitlist_position,
+                'enrollment': serializer.data
+            }, status=status.HTTP_201_CREATED)
+
         return Response({
             'message': 'წარმატებით ჩაიწერეთ ვარჯიშზე',
             'enrollment': serializer.data
         }, status=status.HTTP_201_CREATED)
 
 
-class TrainingCancelEnrollmentView(APIView):
-    """POST /api/trainings/{training_id}/cancel-enrollment/ - ჩაწერის გაუქმება"""
+class BatchEnrollView(APIView):
+    """POST /api/enrollments/batch/ - რამდენიმე ვარჯიშზე ჩაწერა ერთი მოთხოვნით"""
     permission_classes = [IsAuthenticated]
 
-    def post(self, request, training_id):
+    error_messages = {
+        'not_found': 'ვარჯიში არ მოიძებნა',
+        'already_enrolled': 'თქვენ უკვე ჩაწერილი ხართ',
+        'no_membership': 'აქტიური საწევრო არ გაქვთ',
+        'weekly_limit': 'კვირის ვარჯიშების ლიმიტი ამოწურულია',
+        'full': 'ვარჯიში სავსეა',
+    }
+
+    def post(self, request):
+        serializer = BatchEnrollmentSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
         try:
-            enrollment = Enrollment.objects.get(
-                user=request.user,
-                training_id=training_id,
-                status__in=['confirmed', 'pending']
+            results = Enrollment.objects.enroll_batch(
+                request.user,
+                serializer.validated_data['trainings'],
+                all_or_nothing=serializer.validated_data['all_or_nothing'],
+                waitlist=serializer.validated_data['waitlist']
             )
-        except Enrollment.DoesNotExist:
+        except BatchEnrollmentFailed as error:
+            return Response({
+                'error': 'ჩაწერა ვერ მოხერხდა, არცერთი ვარჯიში არ დაემატა',
+                'results': self.format_results(error.results)
+            }, status=status.HTTP_400_BAD_REQUEST)
+        except WeeklyLimitReached:
             return Response(
-                {'error': 'ჩაწერა არ მოიძებნა'},
-                status=status.HTTP_404_NOT_FOUND
+                {'error': 'კვირის ვარჯიშების ლიმიტი ამოწურულია'},
+                status=status.HTTP_400_BAD_REQUEST
             )
 
-        enrollment.status = 'cancelled'
-        enrollment.save()
+        enrolled = sum(1 for _, enrollment, _ in results if enrollment is not None)
+        return Response({
+            'message': f'ჩაიწერეთ {enrolled} ვარჯიშზე',
+            'results': self.format_results(results)
+        }, status=status.HTTP_201_CREATED if enrolled else status.HTTP_400_BAD_REQUEST)
+
+    def format_results(self, results):
+        return [
+            {
+                'training': training_id,
+                'enrollment': enrollment.pk if enrollment else None,
+                'status': enrollment.status if enrollment else None,
+                'error': self.error_messages.get(error)
+            }
+            for training_id, enrollment, error in results
+        ]
+
+
+class TrainingCancelEnrollmentView(APIView):
+    """POST /api/trainings/{training_id}/cancel-enrollment/ - ჩაწერის გაუქმება"""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, training_id):
+        # row lock: ერთი და იგივე ჩაწერის ორმაგმა გაუქმებამ ორჯერ არ გაათავისუფლოს ადგილი
+        with transaction.atomic():
+            try:
+                enrollment = Enrollment.objects.select_related('training').select_for_update(of=('self',)).get(
+                    user=request.user,
+                    training_id=training_id,
+                    status__in=['confirmed', 'pending']
+                )
+            except Enrollment.DoesNotExist:
+                return Response(
+                    {'error': 'ჩაწერა არ მოიძებნა'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+
+            # confirmed-ის გაუქმებისას save() რიგის თავს ადგილზე გადაიყვანს
+            enrollment.status = 'cancelled'
+            enrollment.save()
 
         return Response({
             'message': 'ჩაწერა გაუქმდა'
         }, status=status.HTTP_200_OK)
 
 
-class MyEnrollmentsView(generics.ListAPIView):
+class MyEnrollmentsView(ConditionalGetMixin, EnrolledTrainingsMixin, generics.ListAPIView):
     """GET /api/enrollments/my-enrollments/ - ჩემი ჩაწერები"""
     serializer_class = MyEnrollmentSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetOrPageNumberPagination
+    cursor_ordering = ('-enrolled_at', 'id')
+    etag_scopes = ('enrollment', 'training', 'sport')
+
+    def get_page_training_ids(self, objects):
+        return [enrollment.training_id for enrollment in objects]
 
     def get_queryset(self):
         return Enrollment.objects.filter(
             user=self.request.user
-        ).select_related('training', 'training__sport', 'training__coach')
+        ).prefetch_related(
+            Prefetch('training', queryset=Training.objects.with_capacity())
+        )
 
 
 class TrainingEnrollmentsView(generics.ListAPIView):
     """GET /api/trainings/{training_id}/enrollments/ - ვარჯიშის ჩაწერები (Coach/Admin)"""
     serializer_class = EnrollmentSerializer
     permission_classes = [IsAdminOrCoach]
+    pagination_class = KeysetOrPageNumberPagination
+    cursor_ordering = ('-enrolled_at', 'id')
 
     def get_queryset(self):
         training_id = self.kwargs.get('training_id')
@@ -209,15 +404,81 @@ class TrainingEnrollmentsView(generics.ListAPIView):
         ).select_related('user', 'training')
 
 
+class EnrollmentExportView(ExportMixin, generics.ListAPIView):
+    """
+    GET /api/enrollments/export/?export_format=csv|ndjson - ჩაწერების ექსპორტი
+    Admin - ყველა, Coach - მხოლოდ საკუთარი ვარჯიშების
+    """
+    permission_classes = [IsAdminOrCoach]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = ['training', 'training__sport', 'training__date', 'status', 'attended']
+    ordering_fields = ['enrolled_at']
+    ordering = ['-enrolled_at']
+    export_name = 'enrollments'
+    export_columns = [
+        ('id', 'id'),
+        ('username', 'user__username'),
+        ('first_name', 'user__first_name'),
+        ('last_name', 'user__last_name'),
+        ('training_id', 'training_id'),
+        ('training', 'training__title'),
+        ('date', 'training__date'),
+        ('start_time', 'training__start_time'),
+        ('status', 'status'),
+        ('attended', 'attended'),
+        ('enrolled_at', 'enrolled_at'),
+    ]
+
+    def get_queryset(self):
+        queryset = Enrollment.objects.select_related('user', 'training')
+        if self.request.user.role != 'admin':
+            queryset = queryset.filter(training__coach=self.request.user)
+        return queryset
+
+
+class TrainingAttendanceView(APIView):
+    """POST /api/trainings/{training_id}/attendance/ - დასწრების აღნიშვნა (ვარჯიშის მწვრთნელი/Admin)"""
+    permission_classes = [IsAdminOrCoach]
+
+    def post(self, request, training_id):
+        try:
+            training = Training.objects.get(id=training_id)
+        except Training.DoesNotExist:
+            return Response(
+                {'error': 'ვარჯიში არ მოიძებნა'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        if not request.user.is_admin and training.coach_id != request.user.id:
+            return Response(
+                {'error': 'დასწრებას მხოლოდ ვარჯიშის მწვრთნელი აღნიშნავს'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        serializer = AttendanceSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        training.mark_attendance(serializer.validated_data['attended'])
+
+        roster = Enrollment.objects.filter(
+            training=training, status='completed'
+        ).select_related('user', 'training').order_by('enrolled_at', 'id')
+        return Response({
+            'message': 'დასწრება აღინიშნა',
+            'roster': EnrollmentSerializer(roster, many=True).data
+        }, status=status.HTTP_200_OK)
+
+
 #Membership Views
 
-class MembershipPlanListCreateView(generics.ListCreateAPIView):
+class MembershipPlanListCreateView(ConditionalGetMixin, CachedResponseMixin, generics.ListCreateAPIView):
     """
     GET /api/membership-plans/ - ყველა პაკეტი
     POST /api/membership-plans/ -ახალი პაკეტის დამატება (Admin)
     """
-    queryset = MembershipPlan.objects.filter(is_active=True)
+    queryset = MembershipPlan.objects.filter(is_active=True).with_members_count()
     serializer_class = MembershipPlanSerializer
+    cache_scopes = ('membership_plan',)
+    etag_scopes = ('membership_plan',)
 
     def get_permissions(self):
         if self.request.method == 'POST':
@@ -225,14 +486,15 @@ class MembershipPlanListCreateView(generics.ListCreateAPIView):
         return [IsAuthenticated()]
 
 
-class MembershipPlanDetailView(generics.RetrieveUpdateDestroyAPIView):
+class MembershipPlanDetailView(CachedResponseMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     GET /api/membership-plans/{id}/ - კონკრეტული პაკეტი
     PUT /api/membership-plans/{id}/ - განახლება (Admin)
     DELETE /api/membership-plans/{id}/ - წაშლა (Admin)
     """
-    queryset = MembershipPlan.objects.all()
+    queryset = MembershipPlan.objects.with_members_count()
     serializer_class = MembershipPlanSerializer
+    cache_scopes = ('membership_plan',)
 
     def get_permissions(self):
         if self.request.method == 'GET':
@@ -245,12 +507,45 @@ class MembershipListCreateView(generics.ListCreateAPIView):
     GET /api/memberships/ - ყველა საწევრო (Admin)
     POST /api/memberships/ - ახალი საწევროს შექმნა (Admin)
     """
-    queryset = Membership.objects.all()
+    queryset = Membership.objects.select_related('user', 'plan')
     serializer_class = MembershipSerializer
     permission_classes = [IsAdmin]
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['user', 'plan', 'is_active']
     ordering_fields = ['start_date', 'end_date']
+    pagination_class = KeysetOrPageNumberPagination
+    cursor_ordering = ('-start_date', 'id')
+
+    def get_serializer(self, *args, **kwargs):
+        # plan_details.members_count: გვერდის პაკეტებისთვის ერთი GROUP BY query
+        if kwargs.get('many') and args:
+            memberships = list(args[0])
+            args = (memberships,) + args[1:]
+            context = kwargs.setdefault('context', self.get_serializer_context())
+            context['plan_members_counts'] = dict(
+                Membership.objects.filter(
+                    is_active=True,
+                    plan_id__in={membership.plan_id for membership in memberships}
+                ).order_by().values('plan').annotate(total=Count('pk')).values_list('plan', 'total')
+            )
+        return super().get_serializer(*args, **kwargs)
+
+
+class MembershipExportView(ExportMixin, MembershipListCreateView):
+    """GET /api/memberships/export/?export_format=csv|ndjson - საწევროების ექსპორტი, იგივე ფილტრებით (Admin)"""
+    export_name = 'memberships'
+    export_columns = [
+        ('id', 'id'),
+        ('username', 'user__username'),
+        ('email', 'user__email'),
+        ('plan', 'plan__name'),
+        ('price', 'plan__price'),
+        ('start_date', 'start_date'),
+        ('end_date', 'end_date'),
+        ('is_active', 'is_active'),
+        ('auto_renew', 'auto_renew'),
+        ('created_at', 'created_at'),
+    ]
 
 
 class MyMembershipView(APIView):
@@ -270,3 +565,12 @@ class MyMembershipView(APIView):
                 {'message': 'თქვენ არ გაქვთ აქტიური საწევრო'},
                 status=status.HTTP_404_NOT_FOUND
             )
+
+
+
+class CacheStatsView(APIView):
+    """GET /api/cache-stats/ - ქეშის hit/miss სტატისტიკა endpoint-ების მიხედვით (Admin)"""
+    permission_classes = [IsAdmin]
+
+    def get(self, request):
+        return Response(get_stats())
@@ -1,6 +1,51 @@
-from django.contrib import admin
+import csv
+import io
+
+from django import forms
+from django.conf import settings
+from django.contrib import admin, messages
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import User, PasswordResetToken
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
+from sports.models import MembershipPlan
+from .models import User, PasswordResetToken, RevokedToken, EmailOutbox
+from .views import UserExportView
+from .exports import export_actions
+from .imports import import_members
+
+
+class MemberImportForm(forms.Form):
+    file = forms.FileField(label='CSV ფაილი', help_text='username,email[,first_name,last_name,phone,password,plan,start_date]')
+    plan = forms.ModelChoiceField(
+        queryset=MembershipPlan.objects.filter(is_active=True),
+        required=False,
+        label='პაკეტი',
+        help_text='სტრიქონებისთვის, სადაც plan სვეტი ცარიელია'
+    )
+    dry_run = forms.BooleanField(required=False, label='მხოლოდ შემოწმება')
+
+    def clean(self):
+        cleaned_data = super().clean()
+        upload = cleaned_data.get('file')
+        if upload is None or cleaned_data.get('dry_run'):
+            return cleaned_data
+        # პაროლები request-ში იჰეშება - დიდი ფაილი worker-ის timeout-ს გადააჭარბებს
+        limit = settings.MEMBER_IMPORT_ADMIN_MAX_ROWS
+        text = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+        try:
+            rows = sum(1 for _ in csv.DictReader(text))
+        except (UnicodeDecodeError, csv.Error):
+            rows = 0
+        finally:
+            text.detach()
+            upload.file.seek(0)
+        if rows > limit:
+            raise forms.ValidationError(
+                f"ფაილში {rows} სტრიქონია, admin-იდან მაქსიმუმ {limit}. "
+                f"დიდი ფაილისთვის გამოიყენეთ ბრძანება: python manage.py import_members <ფაილი>"
+            )
+        return cleaned_data
 
 
 @admin.register(User)
@@ -18,6 +63,7 @@ class UserAdmin(BaseUserAdmin):
     list_display_links = ['username', 'email']
     list_editable = ['is_active_member']
     list_per_page = 25
+    actions = export_actions(UserExportView.export_columns, 'users')
 
     fieldsets = (
         ('ძირითადი ინფორმაცია', {
@@ -46,16 +92,85 @@ class UserAdmin(BaseUserAdmin):
 
     readonly_fields = ['date_joined', 'last_login', 'membership_start']
 
+    def get_urls(self):
+        return [
+            path('import/', self.admin_site.admin_view(self.import_view), name='users_user_import'),
+        ] + super().get_urls()
+
+    def import_view(self, request):
+        #CSV-ის ატვირთვა: იგივე იმპორტი, რაც import_members ბრძანებაში
+        if not self.has_add_permission(request):
+            return redirect('admin:users_user_changelist')
+
+        form = MemberImportForm(request.POST or None, request.FILES or None)
+        report = None
+        if request.method == 'POST' and form.is_valid():
+            report = import_members(
+                form.cleaned_data['file'].file,
+                default_plan=form.cleaned_data['plan'],
+                dry_run=form.cleaned_data['dry_run'],
+                # web worker-ში პროცესების pool-ს არ ვქმნით; დიდი ფაილებისთვის import_members ბრძანება
+                processes=1
+            )
+            level = messages.WARNING if report['errors'] else messages.SUCCESS
+            self.message_user(
+                request,
+                f"სტრიქონები: {report['rows']}, შეიქმნა: {report['created']}, საწევრო: {report['memberships']}, "
+                f"შეცდომა: {len(report['errors'])} ({report['seconds']:.1f}s)",
+                level
+            )
+            if not report['errors']:
+                return redirect('admin:users_user_changelist')
+
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'წევრების იმპორტი',
+            'form': form,
+            'report': report,
+        }
+        return TemplateResponse(request, 'admin/users/user/import_members.html', context)
+
 #პაროლის აღდგენის ტოკენები
 @admin.register(PasswordResetToken)
 class PasswordResetTokenAdmin(admin.ModelAdmin):
 
-    list_display = ['user', 'token', 'created_at', 'expires_at', 'is_used']
+    list_display = ['user', 'created_at', 'expires_at', 'is_used']
     list_filter = ['is_used', 'created_at', 'expires_at']
-    search_fields = ['user__username', 'user__email', 'token']
-    readonly_fields = ['user', 'token', 'created_at', 'expires_at']
+    search_fields = ['user__username', 'user__email']
+    readonly_fields = ['user', 'token_hash', 'created_at', 'expires_at']
+    ordering = ['-created_at']
+    list_per_page = 25
+
+    def has_add_permission(self, request):
+        return False
+
+
+#გაუქმებული JWT-ები (logout, rotation)
+@admin.register(RevokedToken)
+class RevokedTokenAdmin(admin.ModelAdmin):
+
+    list_display = ['jti', 'token_type', 'revoked_at', 'expires_at']
+    list_filter = ['token_type', 'revoked_at']
+    search_fields = ['jti']
+    readonly_fields = ['jti', 'token_type', 'revoked_at', 'expires_at']
+    ordering = ['-revoked_at']
+    list_per_page = 25
+
+    def has_add_permission(self, request):
+        return False
+
+
+#წერილების რიგი (send_outbox)
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+
+    list_display = ['to_email', 'subject', 'template', 'status', 'attempts', 'next_attempt_at', 'sent_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['to_email', 'subject']
+    readonly_fields = ['to_email', 'subject', 'body', 'template', 'user', 'attempts', 'last_error', 'created_at', 'sent_at']
     ordering = ['-created_at']
     list_per_page = 25
 
     def has_add_permission(self, request):
-        return False
\ No newline at end of file
+        return False
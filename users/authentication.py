@@ -0,0 +1,80 @@
+#JWT ავტორიზაცია მომხმარებლის ქეშით: ყოველ მოთხოვნაზე User SELECT-ის ნაცვლად ქეში (მოკლე ვადით)
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import router, transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+USER_KEY = 'auth-user:{user_id}'
+#ქეშში არ ინახება: პაროლის ჰეში (მის ნაცვლად md5, როგორც ტოკენის claim-ში) და search_vector
+UNCACHED_FIELDS = ('password', 'search_vector')
+#პროცესის ქეშში ინვალიდაცია სხვა worker-ებს/cron-ს არ ეხება - გამოუსადეგარია
+PER_PROCESS_BACKENDS = (LocMemCache, DummyCache)
+
+
+def user_cache_enabled():
+    return settings.AUTH_USER_CACHE_TIMEOUT > 0 and not isinstance(caches['default'], PER_PROCESS_BACKENDS)
+
+
+def invalidate_users(*user_ids):
+    """
+    წაშლა ახლავე და commit-ის შემდეგაც: commit-მდე პარალელურმა
+    მოთხოვნამ ძველი მომხმარებელი ქეშში თავიდან რომ არ ჩაწეროს.
+    """
+    keys = [USER_KEY.format(user_id=user_id) for user_id in user_ids]
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication, რომელიც მომხმარებელს ქეშიდან კითხულობს (AUTH_USER_CACHE_TIMEOUT წამი).
+    მხოლოდ საერთო ქეშით (ფაილი, memcached, redis...) - locmem-ის დროს ყოველთვის ბაზიდან.
+    ქეშში ველების მნიშვნელობებია და არა User ობიექტი; პაროლი deferred-ია (საჭიროებისას ბაზიდან).
+    ქეში იშლება User-ის შენახვა/წაშლისას (users/signals.py) - როლი, is_active, პაროლი.
+    is_active და CHECK_REVOKE_TOKEN-ის შემოწმება ყოველ მოთხოვნაზე რჩება, როგორც JWTAuthentication-ში.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        key = USER_KEY.format(user_id=user_id)
+        fields = self.cached_fields()
+        enabled = user_cache_enabled()
+        entry = cache.get(key) if enabled else None
+        if entry is None:
+            row = self.user_model.objects.filter(
+                **{api_settings.USER_ID_FIELD: user_id}
+            ).values_list('password', *fields).first()
+            if row is None:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            entry = (list(row[1:]), get_md5_hash_password(row[0]))
+            if enabled:
+                cache.set(key, entry, settings.AUTH_USER_CACHE_TIMEOUT)
+
+        values, password_hash = entry
+        user = self.user_model.from_db(router.db_for_read(self.user_model), fields, values)
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != password_hash:
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
+
+    def cached_fields(self):
+        #concrete_fields-ის რიგით - from_db() დანარჩენებს deferred-ად ტოვებს
+        return [
+            field.attname for field in self.user_model._meta.concrete_fields
+            if field.name not in UNCACHED_FIELDS
+        ]
@@ -0,0 +1,86 @@
+#CSV / NDJSON ექსპორტი StreamingHttpResponse-ით: მეხსიერება მწკრივების რაოდენობაზე არ არის დამოკიდებული
+import csv
+import json
+
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+}
+
+
+class Echo:
+    #csv.writer-ისთვის: ჩაწერილ სტრიქონს პირდაპირ აბრუნებს
+    def write(self, value):
+        return value
+
+
+def iter_rows(queryset, columns, export_format, chunk_size=2000):
+    """
+    columns: [(სათაური, ველი), ...] - ველი შეიძლება იყოს JOIN-იც (user__username).
+    values_list().iterator() - PostgreSQL-ზე server-side cursor, ORM ობიექტების გარეშე.
+    autocommit-ში Django კურსორს WITH HOLD-ით ხსნის და PostgreSQL მთელ შედეგს პირველ
+    FETCH-მდე ამზადებს, ამიტომ გენერატორი ტრანზაქციის შიგნით მუშაობს - მწკრივები ნაკადად მოდის.
+    """
+    headers = [header for header, _ in columns]
+    with transaction.atomic(using=queryset.db):
+        rows = queryset.values_list(*[field for _, field in columns]).iterator(chunk_size=chunk_size)
+
+        if export_format == 'ndjson':
+            for row in rows:
+                yield json.dumps(dict(zip(headers, row)), ensure_ascii=False, default=str) + '\n'
+            return
+
+        writer = csv.writer(Echo())
+        # Excel-ისთვის UTF-8 BOM (ქართული ტექსტი)
+        yield '\ufeff' + writer.writerow(headers)
+        for row in rows:
+            yield writer.writerow(row)
+
+
+def streaming_export(queryset, columns, export_format, name, chunk_size=2000):
+    response = StreamingHttpResponse(
+        iter_rows(queryset, columns, export_format, chunk_size),
+        content_type=CONTENT_TYPES[export_format]
+    )
+    filename = f"{name}-{timezone.now():%Y%m%d-%H%M}.{export_format}"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+class ExportMixin:
+    """
+    list view-ის ექსპორტი: იგივე get_queryset() და filter_backends (ფილტრები, ძებნა, დალაგება),
+    პაგინაციისა და სერიალიზაციის გარეშე. ?export_format=csv|ndjson
+    (?format= DRF-ის renderer-ის არჩევისთვისაა დაკავებული).
+    """
+    export_columns = []
+    export_name = 'export'
+    export_chunk_size = 2000
+    http_method_names = ['get', 'head', 'options']
+
+    def get(self, request, *args, **kwargs):
+        export_format = request.query_params.get('export_format', 'csv')
+        if export_format not in CONTENT_TYPES:
+            export_format = 'csv'
+        queryset = self.filter_queryset(self.get_queryset())
+        return streaming_export(
+            queryset, self.export_columns, export_format, self.export_name, self.export_chunk_size
+        )
+
+
+def export_actions(columns, name):
+    """admin-ის actions: მონიშნული ჩანაწერების CSV / NDJSON ექსპორტი"""
+
+    def export_csv(modeladmin, request, queryset):
+        return streaming_export(queryset, columns, 'csv', name)
+
+    def export_ndjson(modeladmin, request, queryset):
+        return streaming_export(queryset, columns, 'ndjson', name)
+
+    export_csv.short_description = 'ექსპორტი CSV'
+    export_ndjson.short_description = 'ექსპორტი NDJSON'
+    return [export_csv, export_ndjson]
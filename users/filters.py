@@ -0,0 +1,43 @@
+#ძებნა: PostgreSQL-ზე full-text + trigram, სხვა ბაზებზე ჩვეულებრივი SearchFilter
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramWordSimilarity
+from django.db import connections
+from django.db.models import F, Q
+from django.db.models.functions import Greatest
+from rest_framework import filters
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """
+    view-ზე search_vector_field (tsvector სვეტი GIN ინდექსით) და
+    search_trigram_fields (pg_trgm ინდექსიანი ველები ნაწილობრივი/უზუსტო დამთხვევისთვის).
+    მხოლოდ იმავე ცხრილის სვეტები: OR-ში JOIN-იანი პირობა BitmapOr-ს გამორიცხავს.
+    შედეგები relevance-ით ლაგდება, თუ ?ordering= არ არის მითითებული.
+    SQLite-ზე ან ამ ატრიბუტების გარეშე - ჩვეულებრივი search_fields/ILIKE ქცევა.
+    """
+    # ქართულისთვის PostgreSQL-ს ლექსიკონი არ აქვს, ამიტომ 'simple'
+    search_config = 'simple'
+
+    def filter_queryset(self, request, queryset, view):
+        vector_field = getattr(view, 'search_vector_field', None)
+        terms = self.get_search_terms(request)
+        if not terms or not vector_field or connections[queryset.db].vendor != 'postgresql':
+            return super().filter_queryset(request, queryset, view)
+
+        text = ' '.join(terms)
+        query = SearchQuery(text, config=self.search_config, search_type='websearch')
+        condition = Q(**{vector_field: query})
+        rank = SearchRank(F(vector_field), query)
+
+        similarities = []
+        for field in getattr(view, 'search_trigram_fields', []):
+            condition |= Q(**{f'{field}__trigram_word_similar': text})
+            similarities.append(TrigramWordSimilarity(text, field))
+        if len(similarities) == 1:
+            rank = rank + similarities[0]
+        elif similarities:
+            rank = rank + Greatest(*similarities)
+
+        queryset = queryset.annotate(search_rank=rank).filter(condition)
+        if request.query_params.get('ordering'):
+            return queryset
+        return queryset.order_by('-search_rank', 'pk')
@@ -0,0 +1,191 @@
+#წევრების მასობრივი იმპორტი CSV-დან (import_members ბრძანება და UserAdmin-ის ატვირთვა)
+import csv
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models.functions import Lower
+
+from sports.cache import invalidate
+from sports.models import Membership, MembershipPlan
+from .models import User
+
+COLUMNS = ['username', 'email', 'first_name', 'last_name', 'phone', 'password', 'plan', 'start_date']
+REQUIRED_COLUMNS = ['username', 'email']
+
+
+def _init_worker():
+    # spawn-ით გაშვებულ პროცესებს (macOS/Windows) settings თავიდან სჭირდება, fork-ის დროს უკვე მზადაა
+    django.setup()
+
+
+def hash_passwords(passwords, pool=None, processes=1):
+    """PBKDF2 CPU-ზეა დამოკიდებული - pool-ის პროცესებში ნაწილდება. ცარიელი პაროლი -> unusable"""
+    passwords = [password or None for password in passwords]
+    if pool is None:
+        return [make_password(password) for password in passwords]
+    chunksize = max(1, len(passwords) // (processes * 4))
+    return list(pool.map(make_password, passwords, chunksize=chunksize))
+
+
+class MemberImporter:
+    """
+    CSV: username,email[,first_name,last_name,phone,password,plan,start_date]
+    ვალიდაცია და დუბლიკატების შემოწმება ბაჩებად (username__in / email__in), ჰეშირება პროცესების pool-ში,
+    User და Membership - bulk_create. ყოველი ბაჩი ცალკე ტრანზაქციაა.
+    """
+
+    def __init__(self, batch_size=1000, processes=None, default_plan=None, dry_run=False):
+        self.batch_size = batch_size
+        self.processes = processes if processes is not None else os.cpu_count()
+        self.default_plan = default_plan
+        self.dry_run = dry_run
+        self.plans = {plan.name: plan for plan in MembershipPlan.objects.filter(is_active=True)}
+        self.seen_usernames = set()
+        self.seen_emails = set()
+        self.report = {'rows': 0, 'created': 0, 'memberships': 0, 'errors': [], 'seconds': 0}
+
+    def run(self, file):
+        started = time.perf_counter()
+        reader = csv.DictReader(file)
+        missing = [column for column in REQUIRED_COLUMNS if column not in (reader.fieldnames or [])]
+        if missing:
+            self.report['errors'].append((1, f"აკლია სვეტები: {', '.join(missing)}"))
+            return self.report
+
+        pool = ProcessPoolExecutor(self.processes, initializer=_init_worker) if self.processes > 1 else None
+        try:
+            batch = []
+            # პირველი სტრიქონი სათაურია
+            for line, row in enumerate(reader, start=2):
+                self.report['rows'] += 1
+                batch.append((line, row))
+                if len(batch) >= self.batch_size:
+                    self.import_batch(batch, pool)
+                    batch = []
+            if batch:
+                self.import_batch(batch, pool)
+        finally:
+            if pool:
+                pool.shutdown()
+
+        if self.report['memberships']:
+            invalidate('membership_plan')
+        self.report['seconds'] = time.perf_counter() - started
+        return self.report
+
+    def import_batch(self, batch, pool):
+        rows = []
+        for line, row in batch:
+            cleaned, error = self.clean_row(row)
+            if error:
+                self.report['errors'].append((line, error))
+            else:
+                rows.append((line, cleaned))
+
+        # ბაზაში არსებული - ორი query მთელ ბაჩზე
+        taken_usernames = set(User.objects.filter(
+            username__in=[row['username'] for _, row in rows]
+        ).values_list('username', flat=True))
+        taken_emails = set(User.objects.annotate(email_lower=Lower('email')).filter(
+            email_lower__in=[row['email'] for _, row in rows]
+        ).values_list('email_lower', flat=True))
+
+        valid = []
+        for line, row in rows:
+            if row['username'] in taken_usernames:
+                self.report['errors'].append((line, f"მომხმარებელი '{row['username']}' უკვე არსებობს."))
+            elif row['email'] in taken_emails:
+                self.report['errors'].append((line, f"ელ-ფოსტა '{row['email']}' უკვე გამოყენებულია."))
+            else:
+                valid.append(row)
+
+        if not valid:
+            return
+        if self.dry_run:
+            self.report['created'] += len(valid)
+            return
+
+        passwords = hash_passwords([row.pop('password') for row in valid], pool, self.processes)
+        users = [
+            User(
+                password=password,
+                role='member',
+                is_active_member=row['plan'] is not None,
+                **{field: row[field] for field in ('username', 'email', 'first_name', 'last_name', 'phone')}
+            )
+            for row, password in zip(valid, passwords)
+        ]
+
+        with transaction.atomic():
+            User.objects.bulk_create(users)
+            memberships = [
+                Membership(
+                    user=user,
+                    plan=row['plan'],
+                    start_date=row['start_date'],
+                    end_date=row['start_date'] + timedelta(days=row['plan'].duration_days)
+                )
+                for user, row in zip(users, valid) if row['plan']
+            ]
+            Membership.objects.bulk_create(memberships)
+
+        self.report['created'] += len(users)
+        self.report['memberships'] += len(memberships)
+
+    def clean_row(self, row):
+        """(cleaned, None) ან (None, შეცდომა). მხოლოდ ფაილის შიგნით - ბაზას არ მიმართავს"""
+        row = {column: (row.get(column) or '').strip() for column in COLUMNS}
+        row['email'] = row['email'].lower()
+
+        for column in REQUIRED_COLUMNS:
+            if not row[column]:
+                return None, f"სავალდებულო ველი ცარიელია: {column}"
+        if len(row['username']) > 150 or len(row['phone']) > 15:
+            return None, 'ველი ძალიან გრძელია.'
+        try:
+            validate_email(row['email'])
+        except ValidationError:
+            return None, f"არასწორი ელ-ფოსტა: {row['email']}"
+
+        if row['username'] in self.seen_usernames:
+            return None, f"მომხმარებელი '{row['username']}' ფაილში მეორდება."
+        if row['email'] in self.seen_emails:
+            return None, f"ელ-ფოსტა '{row['email']}' ფაილში მეორდება."
+
+        if row['password']:
+            try:
+                validate_password(row['password'])
+            except ValidationError as error:
+                return None, ' '.join(error.messages)
+
+        plan_name = row['plan']
+        row['plan'] = self.plans.get(plan_name) if plan_name else self.default_plan
+        if plan_name and row['plan'] is None:
+            return None, f"პაკეტი '{plan_name}' ვერ მოიძებნა."
+        try:
+            row['start_date'] = date.fromisoformat(row['start_date']) if row['start_date'] else date.today()
+        except ValueError:
+            return None, f"არასწორი თარიღი: {row['start_date']}"
+
+        self.seen_usernames.add(row['username'])
+        self.seen_emails.add(row['email'])
+        return row, None
+
+
+def import_members(file, **options):
+    """file - ბინარული ნაკადი (ატვირთული ან გახსნილი ფაილი), UTF-8 BOM-ით ან მის გარეშე"""
+    text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    try:
+        return MemberImporter(**options).run(text)
+    finally:
+        # ატვირთულ ფაილს Django თავად დახურავს
+        text.detach()
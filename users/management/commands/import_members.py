@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from sports.models import MembershipPlan
+from users.imports import import_members
+
+
+class Command(BaseCommand):
+    help = (
+        'წევრების იმპორტი CSV-დან: username,email[,first_name,last_name,phone,password,plan,start_date]. '
+        'პაროლები პროცესების pool-ში იჰეშება, ჩაწერა - bulk_create ბაჩებად.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV ფაილი (UTF-8)')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--processes', type=int, help='ჰეშირების პროცესები, ნაგულისხმევად CPU-ების რაოდენობა')
+        parser.add_argument('--plan', help='პაკეტის სახელი სტრიქონებისთვის, სადაც plan სვეტი ცარიელია')
+        parser.add_argument('--dry-run', action='store_true', help='მხოლოდ ვალიდაცია, ჩაწერის გარეშე')
+
+    def handle(self, *args, **options):
+        default_plan = None
+        if options['plan']:
+            default_plan = MembershipPlan.objects.filter(name=options['plan'], is_active=True).first()
+            if default_plan is None:
+                raise CommandError(f"პაკეტი '{options['plan']}' ვერ მოიძებნა.")
+
+        with open(options['path'], 'rb') as file:
+            report = import_members(
+                file,
+                batch_size=options['batch_size'],
+                processes=options['processes'],
+                default_plan=default_plan,
+                dry_run=options['dry_run']
+            )
+
+        for line, error in report['errors']:
+            self.stderr.write(f'სტრიქონი {line}: {error}')
+
+        prefix = '[dry-run] ' if options['dry_run'] else ''
+        rate = report['rows'] / report['seconds'] if report['seconds'] else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}სტრიქონები: {report['rows']}, შეიქმნა: {report['created']}, "
+            f"საწევრო: {report['memberships']}, შეცდომა: {len(report['errors'])} "
+            f"({report['seconds']:.1f}s, {rate:.0f} სტრიქონი/წმ)"
+        ))
@@ -0,0 +1,28 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from users.models import EmailOutbox
+
+
+class Command(BaseCommand):
+    help = 'გაგზავნილი და ვერ გაგზავნილი წერილების წაშლა EmailOutbox-იდან ბაჩებად. cron-იდან გასაშვებად.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30, help='რამდენ დღეზე ძველი წერილები წაიშალოს')
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        stale = EmailOutbox.objects.filter(
+            status__in=['sent', 'failed'],
+            created_at__lte=timezone.now() - timedelta(days=options['days'])
+        )
+        deleted = 0
+        while True:
+            ids = list(stale.order_by().values_list('pk', flat=True)[:options['batch_size']])
+            if not ids:
+                break
+            deleted += EmailOutbox.objects.filter(pk__in=ids).delete()[0]
+
+        self.stdout.write(self.style.SUCCESS(f'წაიშალა {deleted} წერილი'))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from users.models import PasswordResetToken
+
+
+class Command(BaseCommand):
+    help = 'ვადაგასული და გამოყენებული პაროლის აღდგენის ტოკენების წაშლა ბაჩებად. cron-იდან გასაშვებად.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        stale = PasswordResetToken.objects.filter(Q(expires_at__lte=timezone.now()) | Q(is_used=True))
+        deleted = 0
+        while True:
+            ids = list(stale.order_by().values_list('pk', flat=True)[:options['batch_size']])
+            if not ids:
+                break
+            deleted += PasswordResetToken.objects.filter(pk__in=ids).delete()[0]
+
+        self.stdout.write(self.style.SUCCESS(f'წაიშალა {deleted} ტოკენი'))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from users.models import RevokedToken
+
+
+class Command(BaseCommand):
+    help = (
+        'ვადაგასული გაუქმებული ტოკენების წაშლა ბაჩებად (ვადაგასულ JWT-ს verify() ისედაც უარყოფს). '
+        'cron-იდან გასაშვებად.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        expired = RevokedToken.objects.filter(expires_at__lte=timezone.now())
+        deleted = 0
+        while True:
+            # expires_at-ის ინდექსით (order_by() - Meta.ordering-ის სორტირების გარეშე); DELETE ... LIMIT ყველა ბაზას არ აქვს - pk-ების სიით
+            ids = list(expired.order_by().values_list('pk', flat=True)[:options['batch_size']])
+            if not ids:
+                break
+            deleted += RevokedToken.objects.filter(pk__in=ids).delete()[0]
+
+        self.stdout.write(self.style.SUCCESS(f'წაიშალა {deleted} ვადაგასული ტოკენი'))
@@ -0,0 +1,108 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from users.models import EmailOutbox
+
+#აღებული წერილის ვადა: ამ დროში გაგზავნის შედეგი უნდა ჩაიწეროს
+CLAIM_LEASE = timedelta(minutes=10)
+
+
+class Command(BaseCommand):
+    help = (
+        'EmailOutbox-ის გასაგზავნი წერილების გაგზავნა ბაჩებად, ერთი SMTP კავშირით. '
+        'შეცდომისას - ხელახალი მცდელობა მზარდი დაყოვნებით (1, 2, 4, ... წუთი), max-attempts-ის შემდეგ failed.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--max-attempts', type=int, default=5)
+        parser.add_argument('--loop', action='store_true', help='რიგის მუდმივი დამუშავება (worker-ად)')
+        parser.add_argument('--interval', type=float, default=5, help='--loop: პაუზა ცარიელი რიგისას (წამი)')
+
+    def handle(self, *args, **options):
+        totals = {'sent': 0, 'retry': 0, 'failed': 0}
+        while True:
+            processed = self.send_batch(options['batch_size'], options['max_attempts'], totals)
+            if not options['loop']:
+                if processed < options['batch_size']:
+                    break
+            elif not processed:
+                time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"გაიგზავნა {totals['sent']}, გადაიდო {totals['retry']}, ვერ გაიგზავნა {totals['failed']}"
+        ))
+
+    def send_batch(self, batch_size, max_attempts, totals):
+        messages = self.claim(batch_size)
+        if not messages:
+            return 0
+
+        # SMTP ტრანზაქციისა და row lock-ების გარეშე
+        now = timezone.now()
+        connection = get_connection()
+        try:
+            connection.open()
+        except Exception as error:
+            for message in messages:
+                self.failed(message, error, max_attempts, now, totals)
+        else:
+            try:
+                for message in messages:
+                    try:
+                        EmailMessage(
+                            subject=message.subject,
+                            body=message.render(),
+                            from_email=settings.DEFAULT_FROM_EMAIL,
+                            to=[message.to_email],
+                            connection=connection
+                        ).send()
+                    except Exception as error:
+                        self.failed(message, error, max_attempts, now, totals)
+                    else:
+                        message.status = 'sent'
+                        message.sent_at = timezone.now()
+                        totals['sent'] += 1
+            finally:
+                connection.close()
+
+        EmailOutbox.objects.bulk_update(messages, ['status', 'next_attempt_at', 'last_error', 'sent_at'])
+        return len(messages)
+
+    def claim(self, batch_size):
+        """
+        მოკლე ტრანზაქცია: წერილები CLAIM_LEASE-ით გადაიდება და მცდელობა ითვლება.
+        სხვა worker-ი მათ ვეღარ აიღებს; worker-ის გათიშვისას lease-ის შემდეგ ისევ რიგშია.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            # skip_locked: რამდენიმე worker-ი ერთსა და იმავე წერილს არ აიღებს
+            messages = list(EmailOutbox.objects.select_for_update(skip_locked=True, of=('self',)).select_related(
+                'user'
+            ).filter(
+                status='pending', next_attempt_at__lte=now
+            ).order_by('next_attempt_at')[:batch_size])
+            if messages:
+                EmailOutbox.objects.filter(pk__in=[message.pk for message in messages]).update(
+                    next_attempt_at=now + CLAIM_LEASE, attempts=F('attempts') + 1
+                )
+        for message in messages:
+            message.attempts += 1
+            message.next_attempt_at = now + CLAIM_LEASE
+        return messages
+
+    def failed(self, message, error, max_attempts, now, totals):
+        message.last_error = f'{type(error).__name__}: {error}'
+        if message.attempts >= max_attempts:
+            message.status = 'failed'
+            totals['failed'] += 1
+        else:
+            message.next_attempt_at = now + timedelta(minutes=2 ** (message.attempts - 1))
+            totals['retry'] += 1
@@ -0,0 +1,71 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:13
+
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+# 'simple' კონფიგურაცია: ქართულისთვის PostgreSQL-ს ლექსიკონი არ აქვს
+POSTGRES_FORWARDS = [
+    """
+    CREATE OR REPLACE FUNCTION users_user_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('simple', coalesce(NEW.username, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(NEW.first_name, '') || ' ' || coalesce(NEW.last_name, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(NEW.email, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql;
+    """,
+    """
+    CREATE TRIGGER users_user_search_vector_trigger
+    BEFORE INSERT OR UPDATE ON users_user
+    FOR EACH ROW EXECUTE FUNCTION users_user_search_vector_update();
+    """,
+    "UPDATE users_user SET id = id;",
+    "CREATE INDEX users_user_search_vector_gin ON users_user USING gin (search_vector);",
+    "CREATE INDEX users_user_username_trgm ON users_user USING gin (username gin_trgm_ops);",
+    "CREATE INDEX users_user_first_name_trgm ON users_user USING gin (first_name gin_trgm_ops);",
+    "CREATE INDEX users_user_last_name_trgm ON users_user USING gin (last_name gin_trgm_ops);",
+    "CREATE INDEX users_user_email_trgm ON users_user USING gin (email gin_trgm_ops);",
+]
+
+POSTGRES_BACKWARDS = [
+    "DROP TRIGGER IF EXISTS users_user_search_vector_trigger ON users_user;",
+    "DROP FUNCTION IF EXISTS users_user_search_vector_update();",
+    "DROP INDEX IF EXISTS users_user_search_vector_gin;",
+    "DROP INDEX IF EXISTS users_user_username_trgm;",
+    "DROP INDEX IF EXISTS users_user_first_name_trgm;",
+    "DROP INDEX IF EXISTS users_user_last_name_trgm;",
+    "DROP INDEX IF EXISTS users_user_email_trgm;",
+]
+
+
+def postgres_forwards(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for statement in POSTGRES_FORWARDS:
+            schema_editor.execute(statement)
+
+
+def postgres_backwards(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for statement in POSTGRES_BACKWARDS:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='user',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(postgres_forwards, postgres_backwards),
+    ]
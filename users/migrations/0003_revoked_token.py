@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_user_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RevokedToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('jti', models.CharField(max_length=255, unique=True, verbose_name='jti')),
+                ('token_type', models.CharField(max_length=20, verbose_name='ტიპი')),
+                ('expires_at', models.DateTimeField(db_index=True, verbose_name='ვადის გასვლა')),
+                ('revoked_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='გაუქმდა')),
+            ],
+            options={
+                'verbose_name': 'გაუქმებული ტოკენი',
+                'verbose_name_plural': 'გაუქმებული ტოკენები',
+                'ordering': ['-revoked_at'],
+            },
+        ),
+    ]
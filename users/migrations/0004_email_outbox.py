@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:51
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_revoked_token'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('to_email', models.EmailField(max_length=254, verbose_name='მიმღები')),
+                ('subject', models.CharField(max_length=255, verbose_name='თემა')),
+                ('body', models.TextField(verbose_name='ტექსტი')),
+                ('status', models.CharField(choices=[('pending', 'გასაგზავნი'), ('sent', 'გაგზავნილი'), ('failed', 'ვერ გაიგზავნა')], default='pending', max_length=10, verbose_name='სტატუსი')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='მცდელობები')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='შემდეგი მცდელობა')),
+                ('last_error', models.TextField(blank=True, verbose_name='ბოლო შეცდომა')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='გაიგზავნა')),
+            ],
+            options={
+                'verbose_name': 'წერილი',
+                'verbose_name_plural': 'წერილების რიგი',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(condition=models.Q(('status', 'pending')), fields=['next_attempt_at'], name='outbox_pending_idx')],
+            },
+        ),
+    ]
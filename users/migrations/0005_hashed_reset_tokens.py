@@ -0,0 +1,48 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:10
+
+import hashlib
+
+from django.db import migrations, models
+
+
+def hash_existing_tokens(apps, schema_editor):
+    # უკვე გაგზავნილი ბმულები ვადის გასვლამდე ისევ მუშაობს
+    PasswordResetToken = apps.get_model('users', 'PasswordResetToken')
+    batch = []
+    for reset_token in PasswordResetToken.objects.only('token').iterator():
+        reset_token.token_hash = hashlib.sha256(reset_token.token.encode()).hexdigest()
+        batch.append(reset_token)
+        if len(batch) >= 1000:
+            PasswordResetToken.objects.bulk_update(batch, ['token_hash'])
+            batch = []
+    PasswordResetToken.objects.bulk_update(batch, ['token_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_email_outbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='passwordresettoken',
+            name='token_hash',
+            field=models.CharField(max_length=64, null=True, verbose_name='ტოკენის ჰეში'),
+        ),
+        migrations.RunPython(hash_existing_tokens, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='passwordresettoken',
+            name='token',
+        ),
+        migrations.AlterField(
+            model_name='passwordresettoken',
+            name='token_hash',
+            field=models.CharField(max_length=64, unique=True, verbose_name='ტოკენის ჰეში'),
+        ),
+        migrations.AlterField(
+            model_name='passwordresettoken',
+            name='expires_at',
+            field=models.DateTimeField(db_index=True, verbose_name='ვადის გასვლა'),
+        ),
+    ]
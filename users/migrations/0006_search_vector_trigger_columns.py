@@ -0,0 +1,46 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:00
+
+from django.db import migrations
+
+
+# ვექტორი მხოლოდ საძიებო სვეტების ცვლილებაზე: last_login-ის და სხვა UPDATE-ებზე trigger აღარ ეშვება
+POSTGRES_FORWARDS = [
+    "DROP TRIGGER IF EXISTS users_user_search_vector_trigger ON users_user;",
+    """
+    CREATE TRIGGER users_user_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF username, first_name, last_name, email ON users_user
+    FOR EACH ROW EXECUTE FUNCTION users_user_search_vector_update();
+    """,
+]
+
+POSTGRES_BACKWARDS = [
+    "DROP TRIGGER IF EXISTS users_user_search_vector_trigger ON users_user;",
+    """
+    CREATE TRIGGER users_user_search_vector_trigger
+    BEFORE INSERT OR UPDATE ON users_user
+    FOR EACH ROW EXECUTE FUNCTION users_user_search_vector_update();
+    """,
+]
+
+
+def postgres_forwards(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for statement in POSTGRES_FORWARDS:
+            schema_editor.execute(statement)
+
+
+def postgres_backwards(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for statement in POSTGRES_BACKWARDS:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_hashed_reset_tokens'),
+    ]
+
+    operations = [
+        migrations.RunPython(postgres_forwards, postgres_backwards),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:16
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def clear_sent_bodies(apps, schema_editor):
+    # უკვე გაგზავნილ/ვერ გაგზავნილ წერილებში აღდგენის ბმულები აღარ უნდა დარჩეს
+    EmailOutbox = apps.get_model('users', 'EmailOutbox')
+    EmailOutbox.objects.filter(status__in=['sent', 'failed']).update(body='')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_search_vector_trigger_columns'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='emailoutbox',
+            name='template',
+            field=models.CharField(blank=True, choices=[('password_reset', 'პაროლის აღდგენა')], max_length=30, verbose_name='შაბლონი'),
+        ),
+        migrations.AddField(
+            model_name='emailoutbox',
+            name='user',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='outbox_emails', to=settings.AUTH_USER_MODEL, verbose_name='მომხმარებელი'),
+        ),
+        migrations.AlterField(
+            model_name='emailoutbox',
+            name='body',
+            field=models.TextField(blank=True, verbose_name='ტექსტი'),
+        ),
+        migrations.RunPython(clear_sent_bodies, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,12 @@
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.tokens import default_token_generator
+from django.contrib.postgres.search import SearchVectorField
 from django.utils import timezone
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
+import hashlib
 import secrets
 
 
@@ -33,6 +39,8 @@ class User(AbstractUser):
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # PostgreSQL-ზე trigger ავსებს (username, სახელი, გვარი, email), SQLite-ზე ცარიელია
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         verbose_name = "წევრი",
@@ -60,6 +68,10 @@ class User(AbstractUser):
 
 #პაროლის აღდგენის შესაძლებლობა
 class PasswordResetToken(models.Model):
+    """
+    ბაზაში მხოლოდ ტოკენის sha256 ინახება - ნედლი ტოკენი მხოლოდ წერილში მიდის.
+    PASSWORD_RESET_STATELESS=True - ხელმოწერილი ტოკენები (Django-ს PasswordResetTokenGenerator), ცხრილის გარეშე.
+    """
     user = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -67,11 +79,11 @@ class PasswordResetToken(models.Model):
         verbose_name = 'მომხმარებელი'
     )
 
-    token = models.CharField(max_length=100, unique=True, verbose_name='ტოკენი')
+    token_hash = models.CharField(max_length=64, unique=True, verbose_name='ტოკენის ჰეში')
     created_at = models.DateTimeField(auto_now_add=True)
 
     is_used = models.BooleanField(default=False, verbose_name='გამოყენებული')
-    expires_at = models.DateTimeField(verbose_name='ვადის გასვლა')
+    expires_at = models.DateTimeField(db_index=True, verbose_name='ვადის გასვლა')
 
 
     class Meta:
@@ -84,11 +96,44 @@ class PasswordResetToken(models.Model):
         return f"Reset token for {self.user.username}"
 
 
+    @staticmethod
+    def hash_token(token):
+        return hashlib.sha256(token.encode()).hexdigest()
+
     @classmethod
     def create_token(cls, user):
+        #მომხმარებლის ძველი გამოუყენებელი ტოკენები ერთი UPDATE-ით უქმდება
+        cls.objects.filter(user=user, is_used=False, expires_at__gt=timezone.now()).update(is_used=True)
         token = secrets.token_urlsafe(32)
         expires_at = timezone.now() + timezone.timedelta(hours=1)
-        return cls.objects.create(user=user, token=token, expires_at=expires_at)
+        reset_token = cls.objects.create(user=user, token_hash=cls.hash_token(token), expires_at=expires_at)
+        # ნედლი ტოკენი მხოლოდ ამ ობიექტზეა, ბაზაში არ ინახება
+        reset_token.token = token
+        return reset_token
+
+    @classmethod
+    def get_by_token(cls, token):
+        return cls.objects.select_related('user').get(token_hash=cls.hash_token(token))
+
+    @classmethod
+    def issue(cls, user):
+        """ბმულისთვის ტოკენი - ცხრილში ან ხელმოწერილი (PASSWORD_RESET_STATELESS)"""
+        if settings.PASSWORD_RESET_STATELESS:
+            return f"{urlsafe_base64_encode(force_bytes(user.pk))}.{default_token_generator.make_token(user)}"
+        return cls.create_token(user).token
+
+    @staticmethod
+    def check_stateless(token):
+        """
+        ხელმოწერილი ტოკენის მომხმარებელი ან None. ტოკენი პაროლის ჰეშსა და last_login-ზეა მიბმული,
+        ამიტომ პაროლის შეცვლის შემდეგ აღარ მუშაობს; ვადა - PASSWORD_RESET_TIMEOUT.
+        """
+        try:
+            uidb64, token = token.split('.', 1)
+            user = User.objects.get(pk=urlsafe_base64_decode(uidb64).decode())
+        except (ValueError, User.DoesNotExist):
+            return None
+        return user if default_token_generator.check_token(user, token) else None
 
 
     def is_valid(self):
@@ -96,5 +141,92 @@ class PasswordResetToken(models.Model):
 
     #tu gamoyenebulia monishnavs
     def mark_as_used(self):
+        """პირობითი UPDATE: ერთდროული მოთხოვნებიდან ტოკენს მხოლოდ ერთი იყენებს (False - უკვე გამოყენებულია)"""
+        marked = PasswordResetToken.objects.filter(pk=self.pk, is_used=False).update(is_used=True)
         self.is_used = True
-        self.save()
+        return bool(marked)
+
+#გაუქმებული JWT-ები (logout, rotation) - jti-ების სია ვადის გასვლამდე
+class RevokedToken(models.Model):
+    jti = models.CharField(max_length=255, unique=True, verbose_name='jti')
+    token_type = models.CharField(max_length=20, verbose_name='ტიპი')
+    expires_at = models.DateTimeField(db_index=True, verbose_name='ვადის გასვლა')
+    revoked_at = models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='გაუქმდა')
+
+    class Meta:
+        verbose_name = 'გაუქმებული ტოკენი'
+        verbose_name_plural = 'გაუქმებული ტოკენები'
+        ordering = ['-revoked_at']
+
+    def __str__(self):
+        return f"{self.token_type} {self.jti}"
+
+
+def password_reset_body(user, token):
+    reset_link = f"http://localhost:8000/reset-password/{token}"
+    return (
+        f'გამარჯობა {user.first_name}!\n\n'
+        f'პაროლის აღდგენის ლინკი:\n{reset_link}\n\n'
+        f'ეს ლინკი ვალიდურია 1 საათის განმავლობაში.'
+    )
+
+
+#გასაგზავნი წერილები: request-ი მხოლოდ სტრიქონს წერს, აგზავნის send_outbox ბრძანება
+class EmailOutbox(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'გასაგზავნი'),
+        ('sent', 'გაგზავნილი'),
+        ('failed', 'ვერ გაიგზავნა'),
+    ]
+    #წერილები, რომელთა ტექსტი გაგზავნისას იქმნება (ტოკენი ბაზაში არ ინახება)
+    TEMPLATE_CHOICES = [
+        ('password_reset', 'პაროლის აღდგენა'),
+    ]
+
+    to_email = models.EmailField(verbose_name='მიმღები')
+    subject = models.CharField(max_length=255, verbose_name='თემა')
+    body = models.TextField(blank=True, verbose_name='ტექსტი')
+    template = models.CharField(max_length=30, choices=TEMPLATE_CHOICES, blank=True, verbose_name='შაბლონი')
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='outbox_emails',
+        verbose_name='მომხმარებელი'
+    )
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending', verbose_name='სტატუსი')
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name='მცდელობები')
+    next_attempt_at = models.DateTimeField(default=timezone.now, verbose_name='შემდეგი მცდელობა')
+    last_error = models.TextField(blank=True, verbose_name='ბოლო შეცდომა')
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True, verbose_name='გაიგზავნა')
+
+    class Meta:
+        verbose_name = 'წერილი'
+        verbose_name_plural = 'წერილების რიგი'
+        ordering = ['-created_at']
+        indexes = [
+            # send_outbox: status='pending' AND next_attempt_at <= now ORDER BY next_attempt_at
+            models.Index(
+                fields=['next_attempt_at'],
+                name='outbox_pending_idx',
+                condition=models.Q(status='pending')
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.to_email}: {self.subject}"
+
+    @classmethod
+    def enqueue(cls, to_email, subject, body='', template='', user=None):
+        return cls.objects.create(to_email=to_email, subject=subject, body=body, template=template, user=user)
+
+    def render(self):
+        """
+        წერილის ტექსტი. password_reset-ის ტოკენი გაგზავნის მომენტში იქმნება
+        (ძველს აუქმებს) და მხოლოდ წერილში მიდის.
+        """
+        if self.template == 'password_reset':
+            return password_reset_body(self.user, PasswordResetToken.issue(self.user))
+        return self.body
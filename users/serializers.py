@@ -2,9 +2,13 @@
 #User Serializers - მონაცემების ვალიდაციები და JSON გარდაქმნა
 
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
+from rest_framework_simplejwt import serializers as jwt_serializers
+from rest_framework_simplejwt.settings import api_settings
 from .models import User, PasswordResetToken
+from .tokens import RefreshToken
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -150,10 +154,19 @@ class PasswordResetConfirmSerializer(serializers.Serializer):
         if attrs['password'] != attrs['password_confirm']:
             raise serializers.ValidationError({"password": "პაროლები არ ემთხვევა."})
 
+        if settings.PASSWORD_RESET_STATELESS:
+            user = PasswordResetToken.check_stateless(attrs['token'])
+            if user is None:
+                raise serializers.ValidationError({"token": "ტოკენი არავალიდურია ან ვადაგასულია."})
+            attrs['user'] = user
+            attrs['reset_token'] = None
+            return attrs
+
         try:
-            reset_token = PasswordResetToken.objects.get(token=attrs['token'])
+            reset_token = PasswordResetToken.get_by_token(attrs['token'])
             if not reset_token.is_valid():
                 raise serializers.ValidationError({"token": "ტოკენი არავალიდურია ან ვადაგასულია."})
+            attrs['user'] = reset_token.user
             attrs['reset_token'] = reset_token
         except PasswordResetToken.DoesNotExist:
             raise serializers.ValidationError({"token": "ტოკენი არ არსებობს."})
@@ -185,4 +198,23 @@ class PasswordChangeSerializer(serializers.Serializer):
         user = self.context['request'].user
         user.set_password(self.validated_data['new_password'])
         user.save()
-        return user
\ No newline at end of file
+        return user
+
+
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    """rotation-ის დროს ძველი refresh ტოკენი RevokedToken-ში იწერება (blacklist-ის ნაცვლად)"""
+    token_class = RefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        data = {'access': str(refresh.access_token)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                refresh.revoke()
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data['refresh'] = str(refresh)
+
+        return data
@@ -0,0 +1,12 @@
+#ავტორიზაციის ქეშის ინვალიდაცია (იხ. users/authentication.py)
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .authentication import invalidate_users
+from .models import User
+
+
+@receiver([post_save, post_delete], sender=User)
+def user_changed(sender, instance, **kwargs):
+    # როლი, is_active, პაროლი (set_password + save) - ყველა save()-ით იცვლება
+    invalidate_users(instance.pk)
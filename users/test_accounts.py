@@ -0,0 +1,305 @@
+"""
+users/test_accounts.py - იმპორტი, JWT ავთენტიკაცია, ტოკენების გაუქმება, ელ-ფოსტის რიგი, პაროლის აღდგენა
+"""
+import os
+import shutil
+import tempfile
+from datetime import date, timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from sports.models import MembershipPlan
+from .authentication import USER_KEY
+from .management.commands.send_outbox import Command as SendOutboxCommand
+from .models import User, RevokedToken, EmailOutbox, PasswordResetToken
+from .tokens import RefreshToken
+
+
+class ImportMembersTest(TestCase):
+    CSV = (
+        'username,email,first_name,last_name,password,plan\n'
+        'nika,nika@example.com,ნიკა,ბერიძე,Strong-Pass-91,Test\n'
+        'ana,ANA@example.com,ანა,,,\n'
+        'nika,other@example.com,,,,\n'
+        'taken,taken@example.com,,,,\n'
+        'bad,not-an-email,,,,\n'
+        'luka,luka@example.com,,,,Unknown\n'
+    )
+
+    def setUp(self):
+        User.objects.create_user(username='taken', email='x@example.com', password='Pass123!')
+        MembershipPlan.objects.create(name='Test', price=100, duration_days=30, max_trainings_per_week=3)
+
+    def run_import(self, *args):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, encoding='utf-8') as file:
+            file.write(self.CSV)
+        self.addCleanup(os.remove, file.name)
+        stdout, stderr = StringIO(), StringIO()
+        call_command('import_members', file.name, '--processes', '1', *args, stdout=stdout, stderr=stderr)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_imports_valid_rows_and_reports_errors(self):
+        # პაკეტები + 2 შემოწმება + SAVEPOINT/INSERT/INSERT/RELEASE
+        with self.assertNumQueries(7):
+            stdout, stderr = self.run_import()
+
+        self.assertIn('შეიქმნა: 2', stdout)
+        self.assertEqual(stderr.count('სტრიქონი'), 4)
+        nika = User.objects.get(username='nika')
+        self.assertTrue(nika.check_password('Strong-Pass-91'))
+        self.assertEqual(nika.memberships.get().end_date, date.today() + timedelta(days=30))
+        ana = User.objects.get(username='ana')
+        self.assertFalse(ana.has_usable_password())
+        self.assertFalse(ana.memberships.exists())
+
+    def test_dry_run_writes_nothing(self):
+        stdout, _ = self.run_import('--dry-run')
+        self.assertIn('[dry-run]', stdout)
+        self.assertFalse(User.objects.filter(username='nika').exists())
+
+    def test_admin_upload(self):
+        admin_user = User.objects.create_superuser(username='root', email='root@example.com', password='Pass123!')
+        self.client.force_login(admin_user)
+        upload = SimpleUploadedFile('members.csv', self.CSV.encode('utf-8-sig'), content_type='text/csv')
+
+        # web worker-ში პროცესების pool არ იქმნება
+        with mock.patch('users.imports.ProcessPoolExecutor') as pool:
+            response = self.client.post(reverse('admin:users_user_import'), {'file': upload})
+        pool.assert_not_called()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['report']['errors']), 4)
+        self.assertTrue(User.objects.filter(username='ana').exists())
+
+    @override_settings(MEMBER_IMPORT_ADMIN_MAX_ROWS=3)
+    def test_admin_upload_row_limit(self):
+        admin_user = User.objects.create_superuser(username='root', email='root@example.com', password='Pass123!')
+        self.client.force_login(admin_user)
+        url = reverse('admin:users_user_import')
+
+        upload = SimpleUploadedFile('members.csv', self.CSV.encode('utf-8'), content_type='text/csv')
+        response = self.client.post(url, {'file': upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('import_members', str(response.context['form'].non_field_errors()))
+        self.assertFalse(User.objects.filter(username='ana').exists())
+
+        # შემოწმება ჰეშირების გარეშეა - ზღვარი არ ეხება
+        upload = SimpleUploadedFile('members.csv', self.CSV.encode('utf-8'), content_type='text/csv')
+        response = self.client.post(url, {'file': upload, 'dry_run': True})
+        self.assertEqual(response.context['report']['created'], 2)
+
+
+class CachedJWTAuthenticationTest(APITestCase):
+
+    def setUp(self):
+        # ქეში მხოლოდ საერთო backend-ით მუშაობს
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        shared = self.settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': directory
+        }})
+        shared.enable()
+        self.addCleanup(shared.disable)
+        self.user = User.objects.create_user(username='member', password='Pass123!')
+        access = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        self.url = reverse('users:current-user')
+
+    def test_user_is_resolved_from_cache(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data['username'], 'member')
+
+    def test_cache_holds_no_password_hash(self):
+        self.client.get(self.url)
+        cached = cache.get(USER_KEY.format(user_id=self.user.pk))
+        self.assertNotIn(self.user.password, repr(cached))
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_per_process_cache_is_not_used(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(1):
+            self.client.get(self.url)
+
+    def test_role_change_and_deactivation_invalidate(self):
+        self.client.get(self.url)
+
+        user = User.objects.get(pk=self.user.pk)
+        user.role = 'coach'
+        user.save()
+        self.assertEqual(self.client.get(self.url).data['role'], 'coach')
+
+        user.is_active = False
+        user.save()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_password_change_invalidates(self):
+        self.client.get(self.url)
+        response = self.client.post(reverse('users:change-password'), {
+            'old_password': 'Pass123!', 'new_password': 'Newer-Pass-42', 'new_password_confirm': 'Newer-Pass-42'
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(1):
+            self.client.get(self.url)
+
+
+class TokenRevocationTest(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='member', password='Pass123!')
+        self.refresh = RefreshToken.for_user(self.user)
+        self.access = str(self.refresh.access_token)
+
+    def test_logout_revokes_refresh_and_access(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.access}')
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('users:logout'), {'refresh': str(self.refresh)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(RevokedToken.objects.count(), 2)
+
+        self.assertEqual(self.client.get(reverse('users:current-user')).status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.client.post(reverse('users:token-refresh'), {'refresh': str(self.refresh)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_rotation_revokes_old_refresh_token(self):
+        url = reverse('users:token-refresh')
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, {'refresh': str(self.refresh)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('refresh', response.data)
+        rotated = response.data['refresh']
+        self.assertEqual(self.client.post(url, {'refresh': str(self.refresh)}, format='json').status_code, 401)
+
+        # შემოწმება მეხსიერებიდან, ბაზაში მხოლოდ ძველი ტოკენის გაუქმება (INSERT)
+        with self.assertNumQueries(1):
+            response = self.client.post(url, {'refresh': rotated}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_purge_removes_expired(self):
+        RevokedToken.objects.create(jti='old', token_type='refresh', expires_at=timezone.now() - timedelta(days=1))
+        RevokedToken.objects.create(jti='new', token_type='refresh', expires_at=timezone.now() + timedelta(days=1))
+        call_command('purge_revoked_tokens', '--batch-size', '1', stdout=StringIO())
+        self.assertEqual(list(RevokedToken.objects.values_list('jti', flat=True)), ['new'])
+
+
+class EmailOutboxTest(APITestCase):
+
+    def setUp(self):
+        User.objects.create_user(username='member', email='member@example.com', password='Pass123!')
+
+    def test_reset_request_only_enqueues(self):
+        response = self.client.post(reverse('users:password-reset'), {'email': 'member@example.com'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(mail.outbox), 0)
+
+        # ტოკენი ჯერ არ არსებობს - იქმნება გაგზავნისას და მხოლოდ წერილში მიდის
+        self.assertEqual(EmailOutbox.objects.get().body, '')
+        self.assertFalse(PasswordResetToken.objects.exists())
+
+        call_command('send_outbox', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['member@example.com'])
+        token = mail.outbox[0].body.split('reset-password/')[1].split()[0]
+        message = EmailOutbox.objects.get()
+        self.assertEqual((message.status, message.body), ('sent', ''))
+
+        response = self.client.post(reverse('users:password-reset-confirm'), {
+            'token': token, 'password': 'Newer-Pass-42', 'password_confirm': 'Newer-Pass-42'
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @override_settings(
+        EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend', EMAIL_HOST='127.0.0.1', EMAIL_PORT=1
+    )
+    def test_smtp_failure_is_retried_with_backoff(self):
+        message = EmailOutbox.enqueue('member@example.com', 'თემა', 'ტექსტი')
+
+        call_command('send_outbox', '--max-attempts', '2', stdout=StringIO())
+        message.refresh_from_db()
+        self.assertEqual((message.status, message.attempts), ('pending', 1))
+        self.assertGreater(message.next_attempt_at, timezone.now())
+        self.assertTrue(message.last_error)
+
+        EmailOutbox.objects.filter(pk=message.pk).update(next_attempt_at=timezone.now())
+        call_command('send_outbox', '--max-attempts', '2', stdout=StringIO())
+        message.refresh_from_db()
+        self.assertEqual((message.status, message.attempts), ('failed', 2))
+
+    def test_claimed_message_is_leased(self):
+        message = EmailOutbox.enqueue('member@example.com', 'თემა', 'ტექსტი')
+        # სხვა worker-მა აიღო და ჯერ აგზავნის
+        self.assertEqual(SendOutboxCommand().claim(10), [message])
+
+        call_command('send_outbox', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 0)
+        message.refresh_from_db()
+        self.assertEqual((message.status, message.attempts), ('pending', 1))
+        self.assertGreater(message.next_attempt_at, timezone.now())
+
+    def test_purge_deletes_old_sent_and_failed(self):
+        old = timezone.now() - timedelta(days=31)
+        for status_value in ('sent', 'failed', 'pending'):
+            message = EmailOutbox.enqueue('member@example.com', 'თემა', 'ტექსტი')
+            EmailOutbox.objects.filter(pk=message.pk).update(status=status_value, created_at=old)
+        EmailOutbox.enqueue('member@example.com', 'თემა', 'ტექსტი')
+
+        call_command('purge_outbox', '--batch-size', '1', stdout=StringIO())
+        self.assertEqual(list(EmailOutbox.objects.values_list('status', flat=True)), ['pending', 'pending'])
+
+
+class PasswordResetTokenTest(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='member', email='member@example.com', password='Pass123!')
+        self.url = reverse('users:password-reset-confirm')
+
+    def confirm(self, token):
+        return self.client.post(self.url, {
+            'token': token, 'password': 'Newer-Pass-42', 'password_confirm': 'Newer-Pass-42'
+        }, format='json')
+
+    def test_token_is_stored_hashed_and_single_use(self):
+        old = PasswordResetToken.create_token(self.user)
+        reset_token = PasswordResetToken.create_token(self.user)
+
+        stored = PasswordResetToken.objects.get(pk=reset_token.pk)
+        self.assertNotEqual(stored.token_hash, reset_token.token)
+        self.assertFalse(PasswordResetToken.objects.filter(token_hash=reset_token.token).exists())
+        # ახალი ტოკენი ძველს აუქმებს
+        self.assertEqual(self.confirm(old.token).status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.assertEqual(self.confirm(reset_token.token).status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('Newer-Pass-42'))
+        self.assertEqual(self.confirm(reset_token.token).status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(PASSWORD_RESET_STATELESS=True)
+    def test_stateless_tokens(self):
+        token = PasswordResetToken.issue(self.user)
+        self.assertFalse(PasswordResetToken.objects.exists())
+        self.assertEqual(self.confirm('bad.token').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.confirm(token).status_code, status.HTTP_200_OK)
+        # პაროლი შეიცვალა - ტოკენი აღარ მუშაობს
+        self.assertEqual(self.confirm(token).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_purge_deletes_expired_and_used(self):
+        expired = PasswordResetToken.create_token(self.user)
+        PasswordResetToken.objects.filter(pk=expired.pk).update(expires_at=timezone.now() - timedelta(hours=1))
+        used = PasswordResetToken.create_token(self.user)
+        used.mark_as_used()
+        active = PasswordResetToken.create_token(self.user)
+
+        call_command('purge_reset_tokens', '--batch-size', '1', stdout=StringIO())
+        self.assertEqual(list(PasswordResetToken.objects.values_list('pk', flat=True)), [active.pk])
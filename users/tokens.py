@@ -0,0 +1,102 @@
+#JWT-ების გაუქმება: jti ბაზაში (RevokedToken), შემოწმება - worker-ის მეხსიერებაში არსებული სიმრავლით
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt import tokens
+
+from .models import RevokedToken
+
+VERSION_KEY = 'revoked-tokens:version'
+# ერთდროული ტრანზაქციები revoked_at-ის მიხედვით არათანმიმდევრულად ჩნდება - ინკრემენტული წაკითხვა გადაფარვით
+SYNC_OVERLAP = timedelta(seconds=30)
+# ვადაგასული jti-ების მოსაშორებლად სიმრავლე მთლიანად თავიდან იტვირთება
+FULL_RELOAD_INTERVAL = 3600
+
+
+class RevokedTokenStore:
+    """
+    worker-ის (პროცესის) მეხსიერებაში გაუქმებული jti-ების სიმრავლე.
+    შემოწმება ბაზის გარეშეა; სინქრონიზაცია, როცა საერთო ქეშში ვერსია შეიცვალა
+    ან გავიდა TOKEN_REVOCATION_SYNC_INTERVAL წამი (locmem ქეშის დროს სხვა worker-ების ცვლილებებისთვის).
+    """
+
+    def __init__(self):
+        self.jtis = set()
+        self.version = None
+        self.synced_at = 0
+        self.loaded_at = 0
+        self.synced_until = None
+        self.lock = threading.Lock()
+
+    def contains(self, jti):
+        self.sync()
+        return jti in self.jtis
+
+    def add(self, jti):
+        self.jtis.add(jti)
+
+    def sync(self):
+        version = cache.get(VERSION_KEY)
+        if version == self.version and time.monotonic() - self.synced_at < settings.TOKEN_REVOCATION_SYNC_INTERVAL:
+            return
+        with self.lock:
+            now = timezone.now()
+            monotonic = time.monotonic()
+            if self.synced_until is None or monotonic - self.loaded_at > FULL_RELOAD_INTERVAL:
+                self.jtis = set(
+                    RevokedToken.objects.filter(expires_at__gt=now).order_by().values_list('jti', flat=True)
+                )
+                self.loaded_at = monotonic
+            else:
+                self.jtis.update(RevokedToken.objects.filter(
+                    revoked_at__gte=self.synced_until - SYNC_OVERLAP
+                ).order_by().values_list('jti', flat=True))
+            self.version = version
+            self.synced_at = monotonic
+            self.synced_until = now
+
+
+revoked_tokens = RevokedTokenStore()
+
+
+def bump_version():
+    cache.set(VERSION_KEY, time.time(), None)
+
+
+class RevocableTokenMixin:
+    """simplejwt-ის BlacklistMixin-ის ნაცვლად (token_blacklist აპი არ გამოიყენება)"""
+
+    def verify(self, *args, **kwargs):
+        super().verify(*args, **kwargs)
+        if revoked_tokens.contains(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+    def revoke(self):
+        jti = self.payload[api_settings.JTI_CLAIM]
+        RevokedToken.objects.bulk_create([RevokedToken(
+            jti=jti,
+            token_type=self.token_type,
+            expires_at=datetime.fromtimestamp(self.payload['exp'], tz=dt_timezone.utc)
+        )], ignore_conflicts=True)
+
+        def revoked():
+            revoked_tokens.add(jti)
+            bump_version()
+
+        transaction.on_commit(revoked)
+
+
+class AccessToken(RevocableTokenMixin, tokens.AccessToken):
+    pass
+
+
+class RefreshToken(RevocableTokenMixin, tokens.RefreshToken):
+    access_token_class = AccessToken
@@ -5,6 +5,7 @@ from .views import (
     UserLoginView,
     UserLogoutView,
     UserListView,
+    UserExportView,
     UserDetailView,
     CurrentUserView,
     PasswordResetRequestView,
@@ -28,6 +29,7 @@ urlpatterns = [
 
     #მომხმარებლებისთვის
     path('users/', UserListView.as_view(), name='user-list'),
+    path('users/export/', UserExportView.as_view(), name='user-export'),
     path('users/me/', CurrentUserView.as_view(), name='current-user'),
     path('users/<int:pk>/', UserDetailView.as_view(), name='user-detail'),
 
@@ -1,10 +1,8 @@
 from rest_framework import status, generics, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
-from django.core.mail import send_mail
-from django.conf import settings
-from .models import User, PasswordResetToken
+from .tokens import RefreshToken
+from .models import User, EmailOutbox
 from .serializers import (
     UserRegistrationSerializer,
     UserLoginSerializer,
@@ -15,6 +13,7 @@ from .serializers import (
     PasswordChangeSerializer
 )
 from .permissions import IsAdmin, IsOwnerOrAdmin
+from .exports import ExportMixin
 
 
 #momxmareblis registracia
@@ -77,7 +76,10 @@ class UserLogoutView(APIView):
             refresh_token = request.data.get('refresh')
             if refresh_token:
                 token = RefreshToken(refresh_token)
-                token.blacklist()
+                token.revoke()
+            # მიმდინარე access ტოკენიც - ვადის გასვლამდე აღარ იმუშავებს
+            if hasattr(request.auth, 'revoke'):
+                request.auth.revoke()
 
             return Response({
                 'message': 'წარმატებით გახვედით სისტემიდან'
@@ -95,9 +97,28 @@ class UserListView(generics.ListAPIView):
     permission_classes = [IsAdmin]
     filterset_fields = ['role', 'is_active_member']
     search_fields = ['username', 'first_name', 'last_name', 'email']
+    search_vector_field = 'search_vector'
+    search_trigram_fields = ['username', 'first_name', 'last_name', 'email']
     ordering_fields = ['date_joined', 'username']
 
 
+class UserExportView(ExportMixin, UserListView):
+    """GET /api/auth/users/export/?export_format=csv|ndjson - მომხმარებლების ექსპორტი, იგივე ფილტრებით (Admin)"""
+    export_name = 'users'
+    export_columns = [
+        ('id', 'id'),
+        ('username', 'username'),
+        ('email', 'email'),
+        ('first_name', 'first_name'),
+        ('last_name', 'last_name'),
+        ('role', 'role'),
+        ('phone', 'phone'),
+        ('is_active_member', 'is_active_member'),
+        ('membership_start', 'membership_start'),
+        ('date_joined', 'date_joined'),
+    ]
+
+
 class UserDetailView(generics.RetrieveUpdateDestroyAPIView):
 
     queryset = User.objects.all()
@@ -140,20 +161,13 @@ class PasswordResetRequestView(APIView):
             email = serializer.validated_data['email']
             user = User.objects.get(email=email)
 
-
-            reset_token = PasswordResetToken.create_token(user)
-
-
-            reset_link = f"http://localhost:8000/reset-password/{reset_token.token}"
-
-            send_mail(
+            # SMTP request-ში აღარ არის: წერილი რიგში, აგზავნის send_outbox.
+            # ტოკენი და ტექსტი გაგზავნისას იქმნება (EmailOutbox.render), ბაზაში ნედლი ტოკენი არ ინახება
+            EmailOutbox.enqueue(
+                to_email=email,
                 subject='პაროლის აღდგენა - MMA Club',
-                message=f'გამარჯობა {user.first_name}!\n\n'
-                        f'პაროლის აღდგენის ლინკი:\n{reset_link}\n\n'
-                        f'ეს ლინკი ვალიდურია 1 საათის განმავლობაში.',
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[email],
-                fail_silently=False,
+                template='password_reset',
+                user=user
             )
 
             return Response({
@@ -174,14 +188,16 @@ class PasswordResetConfirmView(APIView):
             reset_token = serializer.validated_data['reset_token']
             new_password = serializer.validated_data['password']
 
+            # ხელმოწერილი ტოკენი (reset_token=None) პაროლის შეცვლით თავად უქმდება
+            if reset_token and not reset_token.mark_as_used():
+                return Response({
+                    'token': ['ტოკენი არავალიდურია ან ვადაგასულია.']
+                }, status=status.HTTP_400_BAD_REQUEST)
 
-            user = reset_token.user
+            user = serializer.validated_data['user']
             user.set_password(new_password)
             user.save()
 
-
-            reset_token.mark_as_used()
-
             return Response({
                 'message': 'პაროლი წარმატებით შეიცვალა'
             }, status=status.HTTP_200_OK)